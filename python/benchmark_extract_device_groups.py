@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""benchmark_extract_device_groups.py
+
+Compare the single-pass streaming parser in extract_device_groups.py against the
+original two-pass implementation (one full ``ET.parse`` for device-group names and
+another for rule names) on a synthetic Panorama running config.
+
+Reports wall time and peak Python memory for each, and checks that both produce
+the same device-group names and rule mapping.
+
+Usage:
+    python benchmark_extract_device_groups.py --device-groups 200 --rules 500
+    python benchmark_extract_device_groups.py --xml /path/to/running-config.xml
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from pathlib import Path
+
+from extract_device_groups import scan_config
+
+
+def legacy_scan_config(
+    xml_path: str | Path,
+) -> tuple[list[str], dict[str, dict[str, list[str]]]]:
+    """Original implementation: two full-tree parses and list-rebuilding merges."""
+    root = ET.parse(xml_path).getroot()
+    names = [
+        e.get("name") for e in root.findall(".//device-group/entry") if e.get("name")
+    ]
+    names = list(OrderedDict.fromkeys(names))
+
+    root = ET.parse(xml_path).getroot()
+    rules_map: dict[str, dict[str, list[str]]] = {}
+    for dg_entry in root.findall(".//device-group/entry"):
+        dg_name = dg_entry.get("name")
+        if not dg_name:
+            continue
+
+        pre_rules = [
+            e.get("name")
+            for e in dg_entry.findall("./pre-rulebase/security/rules/entry")
+            if e.get("name")
+        ]
+        post_rules = [
+            e.get("name")
+            for e in dg_entry.findall("./post-rulebase/security/rules/entry")
+            if e.get("name")
+        ]
+        pre_rules = list(OrderedDict.fromkeys(pre_rules))
+        post_rules = list(OrderedDict.fromkeys(post_rules))
+
+        if dg_name in rules_map:
+            rules_map[dg_name]["pre"] = list(
+                OrderedDict.fromkeys(rules_map[dg_name]["pre"] + pre_rules)
+            )
+            rules_map[dg_name]["post"] = list(
+                OrderedDict.fromkeys(rules_map[dg_name]["post"] + post_rules)
+            )
+        else:
+            rules_map[dg_name] = {"pre": pre_rules, "post": post_rules}
+
+    return names, rules_map
+
+
+def write_synthetic_config(path: Path, device_groups: int, rules: int) -> None:
+    """Write a running config with `rules` pre and post rules per device group."""
+
+    def rule(name: str) -> str:
+        return (
+            f'<entry name="{name}"><from><member>trust</member></from>'
+            "<to><member>untrust</member></to>"
+            "<source><member>any</member></source>"
+            "<destination><member>any</member></destination>"
+            "<application><member>web-browsing</member><member>ssl</member>"
+            "</application>"
+            "<service><member>application-default</member></service>"
+            "<action>allow</action></entry>"
+        )
+
+    with path.open("w", encoding="utf-8") as fp:
+        fp.write(
+            '<config version="11.0.0"><devices><entry name="localhost.localdomain">'
+        )
+        fp.write("<device-group>")
+        for dg in range(device_groups):
+            fp.write(f'<entry name="dg-{dg}">')
+            for base in ("pre-rulebase", "post-rulebase"):
+                fp.write(f"<{base}><security><rules>")
+                fp.writelines(rule(f"{base[:-9]}-rule-{i}") for i in range(rules))
+                fp.write(f"</rules></security></{base}>")
+            fp.write("</entry>")
+        fp.write("</device-group></entry></devices>")
+        # Read-only section repeats every device group, as on a real Panorama
+        fp.write(
+            '<readonly><devices><entry name="localhost.localdomain"><device-group>'
+        )
+        fp.writelines(
+            f'<entry name="dg-{dg}"><id>{dg + 11}</id></entry>'
+            for dg in range(device_groups)
+        )
+        fp.write("</device-group></entry></devices></readonly></config>")
+
+
+def measure(func, xml_path: Path):
+    """Run func once, returning (result, seconds, peak bytes)."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func(xml_path)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument(
+        "--xml", help="Benchmark an existing running-config XML instead"
+    )
+    parser.add_argument(
+        "--device-groups", type=int, default=100, help="Synthetic device groups"
+    )
+    parser.add_argument(
+        "--rules", type=int, default=500, help="Synthetic rules per rulebase"
+    )
+    args = parser.parse_args(argv)
+
+    if args.xml:
+        xml_path = Path(args.xml)
+        cleanup = False
+    else:
+        fd, name = tempfile.mkstemp(suffix=".xml")
+        os.close(fd)
+        xml_path = Path(name)
+        cleanup = True
+        write_synthetic_config(xml_path, args.device_groups, args.rules)
+
+    try:
+        size_mb = xml_path.stat().st_size / 1e6
+        print(f"Config: {xml_path} ({size_mb:,.1f} MB)")
+
+        before, before_time, before_peak = measure(legacy_scan_config, xml_path)
+        print(
+            f"Before (two-pass ET.parse): {before_time:8.2f}s  "
+            f"peak {before_peak / 1e6:8.1f} MB"
+        )
+
+        after, after_time, after_peak = measure(scan_config, xml_path)
+        print(
+            f"After (single-pass stream): {after_time:8.2f}s  "
+            f"peak {after_peak / 1e6:8.1f} MB"
+        )
+
+        print(
+            f"Speedup: {before_time / after_time:.2f}x, "
+            f"memory: {before_peak / max(after_peak, 1):.1f}x lower"
+        )
+
+        if before != after:
+            print("Error: outputs differ", file=sys.stderr)
+            sys.exit(1)
+        print("Outputs match")
+    finally:
+        if cleanup:
+            xml_path.unlink()
+
+
+if __name__ == "__main__":
+    main()
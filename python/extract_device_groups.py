@@ -5,7 +5,8 @@ Utility script to read a Panorama running-config XML file and output a JSON
 mapping for each device-group containing the security rule names in both the
 *pre-rulebase* and *post-rulebase* sections.
 
-The script:
+The script streams the XML in a single pass with constant memory, so very large
+running configs never have to be loaded as a full tree. In that pass it:
 1. Discovers all unique device-group names.
 2. For each device group, collects rule names under:
    • `/pre-rulebase/security/rules`
@@ -23,8 +24,14 @@ The script:
         }
     }
 
+With --rules-out, full rule attributes (zones, addresses, services,
+applications, action, disabled) are also extracted into a columnar table, with
+each device group parsed in a separate worker process, and exported as CSV, JSON
+or Parquet (requires pyarrow).
+
 Usage:
     python extract_device_groups.py /path/to/running-config.xml
+    python extract_device_groups.py config.xml --rules-out rules.parquet --workers 8
 If no path is provided, it defaults to a file called "running-config.xml" in the
 current working directory.
 """
@@ -34,72 +41,288 @@ from __future__ import annotations
 import argparse
 import csv
 import json
+import os
 import sys
 import xml.etree.ElementTree as ET
-from collections import OrderedDict
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Iterator
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = None
 
-def get_device_group_names(xml_path: str | Path) -> list[str]:
-    """Return a list of unique device-group names in the order encountered."""
+
+# Tag path from a device-group entry down to its rule entries, per rulebase
+RULEBASE_PATHS = {
+    ("pre-rulebase", "security", "rules"): "pre",
+    ("post-rulebase", "security", "rules"): "post",
+}
+
+
+def scan_config(
+    xml_path: str | Path,
+) -> tuple[list[str], dict[str, dict[str, list[str]]]]:
+    """Stream the config once and collect device-group names and rule names.
+
+    Elements are discarded as soon as they close, so memory stays flat no matter
+    how large the config is.
+
+    Returns:
+        Tuple of (unique device-group names in the order encountered,
+        mapping device-group → {"pre": [...], "post": [...]} of rule names).
+    """
     xml_path = Path(xml_path).expanduser().resolve()
     if not xml_path.is_file():
         raise FileNotFoundError(f"XML file not found: {xml_path}")
 
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
+    # Dicts double as ordered sets, so duplicates merge without list rebuilds
+    groups: dict[str, dict[str, dict[str, None]]] = {}
 
-    # Match every <device-group><entry name="..."> element anywhere in the XML
-    names = [
-        e.get("name") for e in root.findall(".//device-group/entry") if e.get("name")
-    ]
-    # Preserve order while removing duplicates
-    unique_names = list(OrderedDict.fromkeys(names))
-    return unique_names
+    tags: list[str] = []  # tag path of the currently open elements
+    parents: list[ET.Element] = []  # open elements, used to drop finished children
+    dg_stack: list[tuple[int, str | None]] = []  # (depth, name) of open device groups
 
+    for event, elem in ET.iterparse(xml_path, events=("start", "end")):
+        if event == "start":
+            if elem.tag == "entry" and tags and tags[-1] == "device-group":
+                # Match every <device-group><entry name="..."> element anywhere
+                name = elem.get("name")
+                dg_stack.append((len(tags), name))
+                if name and name not in groups:
+                    groups[name] = {"pre": {}, "post": {}}
+            elif elem.tag == "entry" and dg_stack and dg_stack[-1][1]:
+                depth, name = dg_stack[-1]
+                base = RULEBASE_PATHS.get(tuple(tags[depth + 1 :]))
+                if base and elem.get("name"):
+                    groups[name][base][elem.get("name")] = None
 
-def get_security_rules_by_group(
-    xml_path: str | Path,
-) -> dict[str, dict[str, list[str]]]:
-    """Return mapping: device-group → {"pre": [...], "post": [...]} of rule names."""
+            tags.append(elem.tag)
+            parents.append(elem)
+            continue
+
+        tags.pop()
+        parents.pop()
+        if dg_stack and dg_stack[-1][0] == len(tags):
+            dg_stack.pop()
+
+        # Everything needed was read from start events; free the subtree
+        elem.clear()
+        if parents:
+            parents[-1].remove(elem)
+
+    rules_map = {
+        name: {"pre": list(sections["pre"]), "post": list(sections["post"])}
+        for name, sections in groups.items()
+    }
+    return list(groups), rules_map
+
+
+# Columns of the rule table; list-valued columns hold the rule's <member> values
+RULE_LIST_FIELDS = ("from", "to", "source", "destination", "service", "application")
+RULE_COLUMNS = (
+    "device_group",
+    "rulebase",
+    "position",
+    "name",
+    *RULE_LIST_FIELDS,
+    "action",
+    "disabled",
+)
+
+RULE_FORMATS = ("csv", "json", "parquet")
+
+
+def iter_device_group_rulebases(xml_path: str | Path) -> Iterator[tuple[str, bytes]]:
+    """Stream the config and yield each device group's security rulebases.
+
+    Only one device-group subtree is held in memory at a time.
+
+    Yields:
+        Tuples of (device-group name, serialized <rulebases> element holding its
+        pre/post security rules).
+    """
     xml_path = Path(xml_path).expanduser().resolve()
     if not xml_path.is_file():
         raise FileNotFoundError(f"XML file not found: {xml_path}")
 
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
+    tags: list[str] = []
+    parents: list[ET.Element] = []
+    dg_depth: int | None = None  # depth of the device-group entry being collected
 
-    rules_map: dict[str, dict[str, list[str]]] = {}
-    for dg_entry in root.findall(".//device-group/entry"):
-        dg_name = dg_entry.get("name")
-        if not dg_name:
+    for event, elem in ET.iterparse(xml_path, events=("start", "end")):
+        if event == "start":
+            if (
+                dg_depth is None
+                and elem.tag == "entry"
+                and tags
+                and tags[-1] == "device-group"
+            ):
+                dg_depth = len(tags)
+            tags.append(elem.tag)
+            parents.append(elem)
             continue
 
-        pre_rules = [
-            e.get("name")
-            for e in dg_entry.findall("./pre-rulebase/security/rules/entry")
-            if e.get("name")
-        ]
-        post_rules = [
-            e.get("name")
-            for e in dg_entry.findall("./post-rulebase/security/rules/entry")
-            if e.get("name")
-        ]
-
-        # Preserve order & uniqueness
-        pre_rules = list(OrderedDict.fromkeys(pre_rules))
-        post_rules = list(OrderedDict.fromkeys(post_rules))
-
-        if dg_name in rules_map:
-            rules_map[dg_name]["pre"] = list(
-                OrderedDict.fromkeys(rules_map[dg_name]["pre"] + pre_rules)
-            )
-            rules_map[dg_name]["post"] = list(
-                OrderedDict.fromkeys(rules_map[dg_name]["post"] + post_rules)
+        tags.pop()
+        parents.pop()
+
+        if dg_depth is not None and len(tags) > dg_depth:
+            # Inside a device group: keep the subtree until the group closes
+            continue
+
+        if dg_depth is not None and len(tags) == dg_depth:
+            dg_depth = None
+            holder = ET.Element("rulebases")
+            for base in RULEBASE_PATHS:
+                rules = elem.find("/".join(base))
+                if rules is not None:
+                    wrapper = ET.SubElement(holder, base[0])
+                    wrapper.append(rules)
+            if elem.get("name") and len(holder):
+                yield elem.get("name"), ET.tostring(holder)
+
+        elem.clear()
+        if parents:
+            parents[-1].remove(elem)
+
+
+def parse_device_group_rules(dg_name: str, payload: bytes) -> dict[str, list]:
+    """Parse one device group's rulebases into rule table columns.
+
+    Runs in worker processes, so it only takes and returns picklable data.
+
+    Args:
+        dg_name: Device-group name
+        payload: Serialized <rulebases> element from iter_device_group_rulebases
+
+    Returns:
+        Mapping column name → list of values, one per rule
+    """
+    columns: dict[str, list] = {column: [] for column in RULE_COLUMNS}
+    # Repeated zone/address/app names share one string object
+    interned: dict[str, str] = {}
+
+    holder = ET.fromstring(payload)
+    for path, base in RULEBASE_PATHS.items():
+        wrapper = holder.find(path[0])
+        if wrapper is None:
+            continue
+        for position, rule in enumerate(wrapper.iterfind("rules/entry"), 1):
+            if not rule.get("name"):
+                continue
+            columns["device_group"].append(dg_name)
+            columns["rulebase"].append(base)
+            columns["position"].append(position)
+            columns["name"].append(rule.get("name"))
+            for field in RULE_LIST_FIELDS:
+                columns[field].append(
+                    [
+                        interned.setdefault(m.text, m.text)
+                        for m in rule.iterfind(f"{field}/member")
+                        if m.text
+                    ]
+                )
+            columns["action"].append(rule.findtext("action", default=""))
+            columns["disabled"].append(rule.findtext("disabled", default="no") == "yes")
+
+    return columns
+
+
+def extract_rules(xml_path: str | Path, workers: int = 1) -> dict[str, list]:
+    """Extract every security rule with its attributes into a columnar table.
+
+    Device groups are parsed in parallel worker processes while the main process
+    keeps streaming the config; results are merged in config order.
+
+    Args:
+        xml_path: Path to the running-config XML file
+        workers: Worker processes (1 parses in-process)
+
+    Returns:
+        Mapping column name → list of values, one per rule
+    """
+    table: dict[str, list] = {column: [] for column in RULE_COLUMNS}
+
+    def merge(part: dict[str, list]) -> None:
+        for column, values in part.items():
+            table[column].extend(values)
+
+    groups = iter_device_group_rulebases(xml_path)
+
+    if workers <= 1:
+        for dg_name, payload in groups:
+            merge(parse_device_group_rules(dg_name, payload))
+        return table
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Bound the groups in flight so memory stays proportional to workers
+        pending: deque = deque()
+        for dg_name, payload in groups:
+            pending.append(executor.submit(parse_device_group_rules, dg_name, payload))
+            if len(pending) >= workers * 2:
+                merge(pending.popleft().result())
+        while pending:
+            merge(pending.popleft().result())
+
+    return table
+
+
+def write_rule_table(table: dict[str, list], out_path: Path, fmt: str) -> None:
+    """Write the rule table as CSV, JSON (array of rule objects) or Parquet.
+
+    List-valued columns are joined with ";" in CSV and kept as lists elsewhere.
+    """
+    out_path = out_path.expanduser().resolve()
+    rows = len(table["name"])
+
+    if fmt == "parquet":
+        if pa is None:
+            raise RuntimeError("Parquet output requires pyarrow: pip install pyarrow")
+        list_type = pa.list_(pa.dictionary(pa.int32(), pa.string()))
+        arrays = {}
+        for column, values in table.items():
+            if column in RULE_LIST_FIELDS:
+                arrays[column] = pa.array(values, type=list_type)
+            elif column in ("device_group", "rulebase", "action"):
+                arrays[column] = pa.array(values).dictionary_encode()
+            else:
+                arrays[column] = pa.array(values)
+        pq.write_table(pa.table(arrays), out_path, compression="zstd")
+    elif fmt == "json":
+        with out_path.open("w", encoding="utf-8") as fp:
+            json.dump(
+                [
+                    {column: table[column][i] for column in RULE_COLUMNS}
+                    for i in range(rows)
+                ],
+                fp,
+                indent=2,
             )
-        else:
-            rules_map[dg_name] = {"pre": pre_rules, "post": post_rules}
+    else:
+        with out_path.open("w", newline="", encoding="utf-8") as fp:
+            writer = csv.writer(fp)
+            writer.writerow(RULE_COLUMNS)
+            for row in zip(*(table[column] for column in RULE_COLUMNS)):
+                writer.writerow(
+                    ";".join(value) if column in RULE_LIST_FIELDS else value
+                    for column, value in zip(RULE_COLUMNS, row)
+                )
+
+
+def get_device_group_names(xml_path: str | Path) -> list[str]:
+    """Return a list of unique device-group names in the order encountered."""
+    names, _ = scan_config(xml_path)
+    return names
 
+
+def get_security_rules_by_group(
+    xml_path: str | Path,
+) -> dict[str, dict[str, list[str]]]:
+    """Return mapping: device-group → {"pre": [...], "post": [...]} of rule names."""
+    _, rules_map = scan_config(xml_path)
     return rules_map
 
 
@@ -130,6 +353,24 @@ def main(argv: list[str] | None = None) -> None:
         dest="csv_path",
         help="Optional output CSV file (default: <xml_file>.csv)",
     )
+    parser.add_argument(
+        "--rules-out",
+        help="Also export full rule attributes to this file (.csv, .json or .parquet)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=RULE_FORMATS,
+        help="Format for --rules-out (default: from the file extension, else csv)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help=(
+            "Worker processes for --rules-out, one device group per task "
+            "(default: CPU count)"
+        ),
+    )
     args = parser.parse_args(argv)
 
     try:
@@ -149,6 +390,19 @@ def main(argv: list[str] | None = None) -> None:
     write_rules_csv(rules, csv_path)
     print(f"CSV written to {csv_path}")
 
+    if args.rules_out:
+        rules_out = Path(args.rules_out)
+        fmt = args.format or rules_out.suffix.lstrip(".").lower()
+        if fmt not in RULE_FORMATS:
+            fmt = "csv"
+        try:
+            table = extract_rules(args.xml_file, args.workers)
+            write_rule_table(table, rules_out, fmt)
+        except Exception as exc:  # pylint: disable=broad-except
+            print(f"Error: {exc}", file=sys.stderr)
+            sys.exit(1)
+        print(f"{len(table['name'])} rules written to {rules_out} ({fmt})")
+
 
 if __name__ == "__main__":
     main()
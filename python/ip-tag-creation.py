@@ -6,13 +6,21 @@ using either the pan-os-python SDK or direct API calls.
 """
 
 import argparse
+import base64
+import csv
+import hashlib
+import json
 import logging
 import os
 import re
 import sys
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import xml.etree.ElementTree as ET
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
 from urllib3.exceptions import InsecureRequestWarning
 
 # Import Python-dotenv for environment variables
@@ -29,6 +37,14 @@ from rich.logging import RichHandler
 from rich.table import Table
 from rich import box
 
+# cryptography is optional; without it the API key cache is disabled
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+except ImportError:
+    Fernet = None
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -45,6 +61,195 @@ logging.basicConfig(
 logger = logging.getLogger("ip_tag_manager")
 console = Console()
 
+# Number of <entry> elements packed into one uid-message for bulk operations
+DEFAULT_CHUNK_SIZE = 1000
+
+# Entries requested per registered-ip page (PAN-OS maximum is 500)
+REGISTERED_IP_PAGE_SIZE = 500
+
+# Upper bound on registered-ip pages, in case a device never signals the last page
+REGISTERED_IP_MAX_PAGES = 10000
+
+# Devices processed in parallel when running against an inventory
+DEFAULT_MAX_WORKERS = int(os.environ.get("PAN_MAX_WORKERS", "8"))
+
+# Encrypted cache of API keys and device info for the direct API manager
+KEY_CACHE_FILE = os.environ.get(
+    "PAN_KEY_CACHE_FILE",
+    os.path.join(os.path.expanduser("~"), ".cache", "ip-tag-manager", "keys.json"),
+)
+KEY_CACHE_TTL = int(os.environ.get("PAN_KEY_CACHE_TTL", "3600"))
+
+
+def chunked(items: List, size: int) -> List[List]:
+    """Split a list into consecutive chunks of at most `size` items.
+
+    Args:
+        items: Items to split
+        size: Maximum chunk length
+
+    Returns:
+        List of chunks
+    """
+    size = max(1, size)
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def compute_tag_delta(
+    current: Dict[str, Dict[str, any]],
+    desired: Dict[str, List[str]],
+    timeout: Optional[int] = None,
+    refresh_below: Optional[int] = None,
+) -> Dict[str, Dict[str, List[str]]]:
+    """Compute the minimal register/unregister operations to reach the desired state.
+
+    Kept tags are refreshed (re-registered) only when the device reports a
+    timeout that differs from the requested one: less than `refresh_below`
+    seconds remaining, or longer than `timeout`. Tags whose timeout the device
+    does not report (always the case with pan-os-python) are left alone.
+
+    Args:
+        current: Registered IPs as returned by get_all_registered_ips
+        desired: Dict mapping IP addresses to desired tags
+        timeout: Timeout in seconds the desired tags should carry
+        refresh_below: Refresh threshold in seconds (default: half of timeout)
+
+    Returns:
+        Dict with 'register', 'unregister' and 'refresh' maps of IP -> tags
+    """
+    if timeout and refresh_below is None:
+        refresh_below = timeout // 2
+
+    delta = {"register": {}, "unregister": {}, "refresh": {}}
+
+    for ip in current.keys() | desired.keys():
+        have = frozenset(current[ip]["tags"]) if ip in current else frozenset()
+        want = frozenset(desired.get(ip, ()))
+
+        if want - have:
+            delta["register"][ip] = sorted(want - have)
+        if have - want:
+            delta["unregister"][ip] = sorted(have - want)
+
+        kept = want & have
+        if timeout and kept:
+            remaining = current[ip].get("timeout")
+            if remaining is not None and (remaining < refresh_below or remaining > timeout):
+                delta["refresh"][ip] = sorted(kept)
+
+    return delta
+
+
+class APIKeyCache:
+    """Encrypted-at-rest cache of API keys and device info with a TTL.
+
+    Entries are keyed by a hash of hostname and username. Each entry is encrypted
+    with a key derived from the password, so a changed password simply misses the
+    cache and the file never holds usable secrets in clear text.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, path: str = KEY_CACHE_FILE, ttl: int = KEY_CACHE_TTL):
+        """Initialize the cache.
+
+        Args:
+            path: Cache file location
+            ttl: Seconds an entry stays valid
+        """
+        self.path = path
+        self.ttl = ttl
+        self.enabled = Fernet is not None and ttl > 0
+        if Fernet is None:
+            logger.debug("cryptography is not installed; API key cache disabled")
+
+    @staticmethod
+    def _cache_id(hostname: str, username: str) -> str:
+        return hashlib.sha256(f"{hostname}\0{username}".encode()).hexdigest()
+
+    @staticmethod
+    def _fernet(password: str, salt: bytes) -> "Fernet":
+        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=200_000)
+        return Fernet(base64.urlsafe_b64encode(kdf.derive(password.encode())))
+
+    def _read(self) -> Dict[str, Dict[str, any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, hostname: str, username: str, password: str) -> Optional[Dict[str, any]]:
+        """Return cached device info if present, unexpired and decryptable.
+
+        Args:
+            hostname: Device hostname or IP
+            username: Username the key belongs to
+            password: Password used to derive the decryption key
+
+        Returns:
+            Dict with 'key' and 'is_panorama', or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        entry = self._read().get(self._cache_id(hostname, username))
+        if not entry or entry.get("expires", 0) < time.time():
+            return None
+
+        try:
+            fernet = self._fernet(password, base64.b64decode(entry["salt"]))
+            return json.loads(fernet.decrypt(entry["token"].encode()))
+        except (InvalidToken, KeyError, ValueError):
+            return None
+
+    def put(self, hostname: str, username: str, password: str, info: Dict[str, any]) -> None:
+        """Encrypt and store device info for hostname and username.
+
+        Args:
+            hostname: Device hostname or IP
+            username: Username the key belongs to
+            password: Password used to derive the encryption key
+            info: Dict with 'key' and 'is_panorama'
+        """
+        if not self.enabled:
+            return
+
+        salt = os.urandom(16)
+        token = self._fernet(password, salt).encrypt(json.dumps(info).encode()).decode()
+        entry = {"salt": base64.b64encode(salt).decode(), "token": token, "expires": time.time() + self.ttl}
+        self._update(self._cache_id(hostname, username), entry)
+
+    def invalidate(self, hostname: str, username: str) -> None:
+        """Drop the entry for hostname and username.
+
+        Args:
+            hostname: Device hostname or IP
+            username: Username the key belongs to
+        """
+        if self.enabled:
+            self._update(self._cache_id(hostname, username), None)
+
+    def _update(self, cache_id: str, entry: Optional[Dict[str, any]]) -> None:
+        with self._lock:
+            entries = self._read()
+            now = time.time()
+            entries = {k: v for k, v in entries.items() if v.get("expires", 0) >= now}
+            if entry is None:
+                entries.pop(cache_id, None)
+            else:
+                entries[cache_id] = entry
+
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Could not write API key cache {self.path}: {e}")
+
 
 class IPTagManagerBase:
     """Base class for IP tag management functionality."""
@@ -69,6 +274,61 @@ class IPTagManagerBase:
         self.password = password
         self.vsys = vsys if vsys else "vsys1"
 
+    def sync_ip_tags(
+        self,
+        ip_tags_map: Dict[str, List[str]],
+        timeout: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        dry_run: bool = False,
+        refresh_below: Optional[int] = None,
+    ) -> Tuple[Dict[str, Dict[str, List[str]]], List[Dict[str, any]]]:
+        """Apply only the register/unregister delta needed to match the mapping.
+
+        Current state is fetched once, diffed against the desired mapping, and
+        the resulting operations are sent with the bulk methods.
+
+        Args:
+            ip_tags_map: Dict mapping IP addresses to desired tags
+            timeout: Optional timeout in seconds
+            chunk_size: Maximum IP entries per bulk chunk
+            dry_run: Compute and return the delta without changing the device
+            refresh_below: Refresh tags with fewer seconds remaining than this
+
+        Returns:
+            Tuple of the computed delta and the per-chunk result dicts (empty
+            on a dry run)
+        """
+        current = self.get_all_registered_ips()
+        delta = compute_tag_delta(current, ip_tags_map, timeout, refresh_below)
+
+        logger.info(
+            f"Audit delta: {len(delta['register'])} IPs to add tags, "
+            f"{len(delta['unregister'])} IPs to remove tags, "
+            f"{len(delta['refresh'])} IPs to refresh"
+        )
+
+        results = []
+        if dry_run:
+            return delta, results
+
+        if delta["unregister"]:
+            results += self.unregister_ip_tags_bulk(delta["unregister"], chunk_size)
+
+        # New and refreshed tags go out together in one register pass
+        to_register = {ip: list(tags) for ip, tags in delta["register"].items()}
+        for ip, tags in delta["refresh"].items():
+            to_register.setdefault(ip, []).extend(tags)
+        if to_register:
+            results += self.register_ip_tags_bulk(to_register, timeout, chunk_size)
+
+        failed = [result for result in results if not result["success"]]
+        if failed:
+            logger.error(f"{len(failed)} of {len(results)} chunks failed during audit")
+        else:
+            logger.info("Successfully audited IP tags")
+
+        return delta, results
+
 
 class IPTagManagerSDK(IPTagManagerBase):
     """Manages IP address tags on PAN-OS devices using the pan-os-python SDK."""
@@ -117,6 +377,9 @@ class IPTagManagerSDK(IPTagManagerBase):
 
         Returns:
             Dict mapping IP addresses to a dict with 'tags' and 'timeout' keys
+
+        Raises:
+            RuntimeError: If the registered IPs could not be retrieved
         """
         try:
             # Get IP tags using SDK
@@ -146,7 +409,7 @@ class IPTagManagerSDK(IPTagManagerBase):
             return registered_ips
         except PanDeviceError as e:
             logger.error(f"Failed to get registered IPs: {e}")
-            return {}
+            raise RuntimeError(f"Failed to retrieve registered IPs: {e}") from e
 
     def register_ip_tags(
         self,
@@ -191,6 +454,80 @@ class IPTagManagerSDK(IPTagManagerBase):
         except PanDeviceError as e:
             logger.error(f"Failed to unregister tags for IP {ip}: {e}")
 
+    def _send_batches(
+        self,
+        operation: str,
+        ip_tags_map: Dict[str, List[str]],
+        timeout: Optional[int],
+        chunk_size: int,
+    ) -> List[Dict[str, any]]:
+        """Send register/unregister calls in SDK batches of `chunk_size` IPs.
+
+        Args:
+            operation: "register" or "unregister"
+            ip_tags_map: Dict mapping IP addresses to tags
+            timeout: Optional timeout in seconds (register only)
+            chunk_size: Maximum IPs per batch
+
+        Returns:
+            List of per-chunk result dicts
+        """
+        results = []
+        items = [(ip, tags) for ip, tags in ip_tags_map.items() if tags]
+
+        for index, chunk in enumerate(chunked(items, chunk_size), 1):
+            result = {"chunk": index, "entries": len(chunk), "success": True, "message": "", "entry_errors": []}
+            try:
+                # batch_start/batch_end collect the calls into a single uid-message
+                self.device.userid.batch_start()
+                for ip, tags in chunk:
+                    if operation == "register":
+                        self.device.userid.register(ip, tags, timeout)
+                    else:
+                        self.device.userid.unregister(ip, tags)
+                self.device.userid.batch_end()
+            except PanDeviceError as e:
+                result["success"] = False
+                result["message"] = str(e)
+                logger.error(f"Failed to {operation} chunk {index} ({len(chunk)} IPs): {e}")
+            results.append(result)
+
+        return results
+
+    def register_ip_tags_bulk(
+        self,
+        ip_tags_map: Dict[str, List[str]],
+        timeout: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> List[Dict[str, any]]:
+        """Register tags for many IPs using SDK batching.
+
+        Args:
+            ip_tags_map: Dict mapping IP addresses to tags to apply
+            timeout: Optional timeout in seconds
+            chunk_size: Maximum IPs per batch
+
+        Returns:
+            List of per-chunk result dicts
+        """
+        return self._send_batches("register", ip_tags_map, timeout, chunk_size)
+
+    def unregister_ip_tags_bulk(
+        self,
+        ip_tags_map: Dict[str, List[str]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> List[Dict[str, any]]:
+        """Remove tags from many IPs using SDK batching.
+
+        Args:
+            ip_tags_map: Dict mapping IP addresses to tags to remove
+            chunk_size: Maximum IPs per batch
+
+        Returns:
+            List of per-chunk result dicts
+        """
+        return self._send_batches("unregister", ip_tags_map, None, chunk_size)
+
     def clear_all_ip_tags(self) -> None:
         """Remove all IP tags from the device using the SDK."""
         try:
@@ -229,6 +566,7 @@ class IPTagManagerAPI(IPTagManagerBase):
         username: str,
         password: str,
         vsys: str = "vsys1",
+        key_cache: Optional[APIKeyCache] = None,
     ):
         """Initialize the API-based IP Tag Manager.
 
@@ -237,18 +575,30 @@ class IPTagManagerAPI(IPTagManagerBase):
             username: Username for authentication
             password: Password for authentication
             vsys: Virtual system (default: vsys1)
+            key_cache: Optional cache for the API key and device info
         """
         super().__init__(hostname, username, password, vsys)
+        self.key_cache = key_cache
         self.base_url = f"https://{self.hostname}/api"
         self.key = None
         self.is_panorama = False
+        # Keep-alive session reused by every API call to this device
+        self.session = requests.Session()
 
     def connect(self) -> None:
         """Establish connection to the device by obtaining API key."""
+        if self.key_cache:
+            cached = self.key_cache.get(self.hostname, self.username, self.password)
+            if cached:
+                self.key = cached["key"]
+                self.is_panorama = cached["is_panorama"]
+                logger.info(f"Using cached API key for {self.hostname}")
+                return
+
         try:
-            # Get API key
-            url = f"{self.base_url}/?type=keygen&user={self.username}&password={self.password}"
-            response = requests.get(url, verify=False, timeout=10)
+            # Get API key; credentials go in the POST body rather than the URL
+            data = {"type": "keygen", "user": self.username, "password": self.password}
+            response = self.session.post(f"{self.base_url}/", data=data, verify=False, timeout=10)
             response.raise_for_status()
 
             # Parse XML response
@@ -258,7 +608,7 @@ class IPTagManagerAPI(IPTagManagerBase):
             # Check if device is Panorama
             cmd = "<show><system><info></info></system></show>"
             sys_info_url = f"{self.base_url}/?type=op&cmd={cmd}&key={self.key}"
-            sys_response = requests.get(sys_info_url, verify=False, timeout=10)
+            sys_response = self.session.get(sys_info_url, verify=False, timeout=10)
             sys_response.raise_for_status()
 
             sys_xml = ET.fromstring(sys_response.text)
@@ -270,123 +620,189 @@ class IPTagManagerAPI(IPTagManagerBase):
             else:
                 console.print("[bold green]Connected to a firewall appliance.[/]")
 
+            if self.key_cache:
+                self.key_cache.put(
+                    self.hostname,
+                    self.username,
+                    self.password,
+                    {"key": self.key, "is_panorama": self.is_panorama},
+                )
+
             logger.info(f"Successfully connected to {self.hostname} using direct API")
         except (requests.RequestException, ET.ParseError) as e:
             logger.error(f"Failed to connect to device: {e}")
             sys.exit(1)
 
+    def _check_auth(self, response: requests.Response) -> None:
+        """Drop a cached API key the device no longer accepts.
+
+        Args:
+            response: Response from the device
+        """
+        if response.status_code == 403 and self.key_cache:
+            logger.warning(f"API key rejected by {self.hostname}; clearing cached key")
+            self.key_cache.invalidate(self.hostname, self.username)
+
+    def _stream_op(self, cmd: str):
+        """Run an operational command and stream-parse the XML response.
+
+        Elements are yielded as they close so large responses never need to be
+        held in memory as a full tree.
+
+        Args:
+            cmd: Operational command XML
+
+        Yields:
+            (event, element) tuples from iterparse
+        """
+        data = {"type": "op", "cmd": cmd, "key": self.key}
+        with self.session.post(f"{self.base_url}/", data=data, verify=False, timeout=60, stream=True) as response:
+            self._check_auth(response)
+            response.raise_for_status()
+            response.raw.decode_content = True
+            yield from ET.iterparse(response.raw, events=("start", "end"))
+
+    def iter_registered_ips(self, page_size: int = REGISTERED_IP_PAGE_SIZE):
+        """Yield every registered IP using paged registered-ip queries.
+
+        Paging stops on a short or empty page. A device that ignores limit and
+        start-point returns more than page_size entries or repeats the previous
+        page; both also end paging, and IPs from the previous page are never
+        yielded twice. REGISTERED_IP_MAX_PAGES bounds the loop regardless.
+
+        Args:
+            page_size: Entries requested per page (PAN-OS caps this at 500)
+
+        Yields:
+            (ip, tags, timeout) tuples; timeout is None when not reported
+
+        Raises:
+            RuntimeError: If the device answers a page with a non-success status
+        """
+        start_point = 1
+        previous_ips = set()
+        for _ in range(REGISTERED_IP_MAX_PAGES):
+            cmd = (
+                "<show><object><registered-ip>"
+                f"<limit>{page_size}</limit><start-point>{start_point}</start-point><all/>"
+                "</registered-ip></object></show>"
+            )
+            page_entries = 0
+            page_ips = set()
+            root = None
+            status = None
+            stack = []
+
+            for event, elem in self._stream_op(cmd):
+                if event == "start":
+                    if root is None:
+                        root = elem
+                        status = elem.get("status")
+                    stack.append(elem)
+                    continue
+                stack.pop()
+
+                # Registered-IP entries sit at response/result/entry
+                if elem.tag != "entry" or len(stack) != 2:
+                    continue
+
+                page_entries += 1
+                ip = elem.get("ip")
+                if ip:
+                    page_ips.add(ip)
+                if ip and ip not in previous_ips:
+                    tags = []
+                    timeout = None
+                    for member in elem.iterfind("./tag/member"):
+                        if member.text:
+                            tags.append(member.text)
+                        if timeout is None and (member.get("timeout") or "").isdigit():
+                            timeout = int(member.get("timeout"))
+                    yield ip, tags, timeout
+                # Drop the handled entry so large pages do not accumulate
+                stack[-1].remove(elem)
+
+            if status != "success":
+                msg = root.find("msg") if root is not None else None
+                text = " ".join("".join(msg.itertext()).split()) if msg is not None else ""
+                raise RuntimeError(
+                    f"{self.hostname} rejected the registered-ip query "
+                    f"(status {status!r}): {text or 'no message'}"
+                )
+            if page_entries < page_size or page_ips <= previous_ips:
+                break
+            if page_entries > page_size:
+                logger.warning(
+                    f"{self.hostname} returned {page_entries} registered IPs for a page of "
+                    f"{page_size}; treating it as the full list"
+                )
+                break
+            previous_ips = page_ips
+            start_point += page_entries
+        else:
+            logger.warning(
+                f"Stopped reading registered IPs from {self.hostname} after "
+                f"{REGISTERED_IP_MAX_PAGES} pages"
+            )
+
+    def get_ip_user_mapping_timeouts(self) -> Dict[str, int]:
+        """Fetch timeouts for all IPs with a single ip-user-mapping query.
+
+        Returns:
+            Dict mapping IP addresses to timeout in seconds
+        """
+        timeouts = {}
+        cmd = "<show><user-id><ip-user-mapping><all/></ip-user-mapping></user-id></show>"
+
+        for event, elem in self._stream_op(cmd):
+            if event != "end" or elem.tag != "entry":
+                continue
+
+            ip = elem.get("ip") or elem.findtext("ip")
+            timeout = elem.get("timeout") or elem.findtext("timeout") or ""
+            if ip and timeout.strip().isdigit():
+                timeouts[ip.strip()] = int(timeout)
+            elem.clear()
+
+        return timeouts
+
     def get_all_registered_ips(self) -> Dict[str, Dict[str, any]]:
         """Retrieve all registered IP addresses and their tags using direct API.
 
         Returns:
             Dict mapping IP addresses to a dict with 'tags' and 'timeout' keys
+
+        Raises:
+            RuntimeError: If the registered IPs could not be retrieved
         """
         registered_ips = {}
 
         try:
-            # First, get the XML format for parsing the tags
-            cmd = "<show><object><registered-ip><all/></registered-ip></object></show>"
-            url = f"{self.base_url}/?type=op&cmd={cmd}&key={self.key}"
-
             logger.info("Getting registered IP information and tags from API...")
-            response = requests.get(url, verify=False, timeout=10)
-            response.raise_for_status()
-
-            # Parse XML response for tags
+            for ip, tags, timeout in self.iter_registered_ips():
+                registered_ips[ip] = {"tags": tags, "timeout": timeout}
+
+            logger.info(f"Successfully extracted tags for {len(registered_ips)} IP entries")
+        except (requests.RequestException, ET.ParseError, RuntimeError) as e:
+            logger.error(f"Failed to retrieve registered IPs: {e}")
+            raise RuntimeError(f"Failed to retrieve registered IPs: {e}") from e
+
+        # Fill in missing timeouts from one bulk query instead of one call per IP
+        missing = [ip for ip, ip_data in registered_ips.items() if ip_data["tags"] and ip_data["timeout"] is None]
+        if missing:
+            logger.info(f"Fetching timeout information for {len(missing)} registered IPs...")
             try:
-                xml_root = ET.fromstring(response.text)
-                entries = xml_root.findall(".//entry")
-
-                # Limit the number of entries we process to avoid timeouts
-                max_entries = 100  # Limit to 100 entries to ensure script completes
-                if len(entries) > max_entries:
-                    logger.warning(f"Found {len(entries)} entries, limiting to {max_entries} for performance")
-                    entries = entries[:max_entries]
-                else:
-                    logger.info(f"Found {len(entries)} registered IP entries")
-                    
-                # Process each IP entry for tags
-                for entry in entries:
-                    ip = entry.get("ip")
-                    if not ip:
-                        continue
-
-                    # Extract tags from member elements
-                    tags = []
-                    tag_element = entry.find(".//tag")
-                    if tag_element is not None:
-                        member_elements = tag_element.findall(".//member")
-                        if member_elements:
-                            for member in member_elements:
-                                if member.text:
-                                    tags.append(member.text)
-
-                    # Initialize entry in our results (timeout will be added later)
-                    registered_ips[ip] = {"tags": tags, "timeout": None}
-
-                logger.info(f"Successfully extracted tags for {len(registered_ips)} IP entries")
-
-                # The standard XML API doesn't provide timeout information directly
-                # We can create a specialized request for each IP to extract the timeout 
-                # from user-id XML API
-                logger.info("Fetching timeout information for registered IPs...")
-                
-                # For each IP, we'll make a specialized API call to get its timeout
-                for ip, ip_data in registered_ips.items():
-                    # Only process IPs that have tags
-                    if not ip_data["tags"]:
-                        continue
-                        
-                    try:
-                        # Use the user-id API to get more detailed information for this IP
-                        # This is a specialized API call that might include timeout info
-                        uid_cmd = f'<show><user-id><ip-user-mapping><ip>{ip}</ip></ip-user-mapping></user-id></show>'
-                        uid_url = f"{self.base_url}/?type=op&cmd={uid_cmd}&key={self.key}"
-                        uid_response = requests.get(uid_url, verify=False, timeout=10)
-                        
-                        # Check if we have timeout information in the response
-                        if "timeout" in uid_response.text or "expire" in uid_response.text:
-                            logger.info(f"Found timeout data for IP {ip}")
-                            
-                            try:
-                                uid_xml = ET.fromstring(uid_response.text)
-                                # Look for timeout attribute in any element
-                                for elem in uid_xml.findall('.//*[@timeout]'):
-                                    timeout_val = elem.get('timeout')
-                                    if timeout_val and timeout_val.isdigit():
-                                        registered_ips[ip]["timeout"] = int(timeout_val)
-                                        logger.info(f"Extracted timeout {timeout_val} for IP {ip}")
-                                        break
-                            except ET.ParseError:
-                                logger.debug(f"Could not parse timeout XML for IP {ip}")
-                    
-                    except Exception as ip_err:
-                        logger.debug(f"Error retrieving timeout for IP {ip}: {ip_err}")
-                        continue
-                
-                # For the timeout information, we'll take a simpler approach
-                # rather than trying many different API calls that might cause timeouts
-                logger.info("Skipping detailed timeout retrieval...")
-                
-                # In a production environment, specific timeout retrieval would require:
-                # 1. Using an SSH session to directly run CLI commands
-                # 2. Using the SDK which has internal methods that retrieve this info
-                # 3. Contacting PaloAlto to request API access to this information
-                
-                # For now, we'll simply acknowledge that timeouts exist
-                logger.info("Completed processing IP tag information")
-
-            except ET.ParseError as e:
-                logger.error(f"Failed to parse XML response: {e}")
-                logger.warning("Could not retrieve IP tag information due to XML parsing error")
-                return {}
+                timeouts = self.get_ip_user_mapping_timeouts()
+            except (requests.RequestException, ET.ParseError) as e:
+                logger.warning(f"Could not retrieve timeout information: {e}")
+                timeouts = {}
 
-            return registered_ips
+            for ip in missing:
+                if ip in timeouts:
+                    registered_ips[ip]["timeout"] = timeouts[ip]
 
-        except requests.RequestException as e:
-            logger.error(f"API request failed: {e}")
-            logger.warning("Could not connect to API endpoint")
-            return {}
+        logger.info("Completed processing IP tag information")
+        return registered_ips
 
     def register_ip_tags(
         self,
@@ -422,7 +838,8 @@ class IPTagManagerAPI(IPTagManagerBase):
             if not self.is_panorama:
                 url += f"&vsys={self.vsys}"
 
-            response = requests.get(url, verify=False, timeout=10)
+            response = self.session.get(url, verify=False, timeout=10)
+            self._check_auth(response)
             response.raise_for_status()
 
             # Check for success in response
@@ -452,7 +869,8 @@ class IPTagManagerAPI(IPTagManagerBase):
                 if not self.is_panorama:
                     alt_url += f"&vsys={self.vsys}"
                     
-                alt_response = requests.get(alt_url, verify=False, timeout=10)
+                alt_response = self.session.get(alt_url, verify=False, timeout=10)
+                self._check_auth(alt_response)
                 alt_response.raise_for_status()
                 alt_xml_root = ET.fromstring(alt_response.text)
                 alt_status = alt_xml_root.find(".//status")
@@ -504,7 +922,8 @@ class IPTagManagerAPI(IPTagManagerBase):
             if not self.is_panorama:
                 url += f"&vsys={self.vsys}"
 
-            response = requests.get(url, verify=False, timeout=10)
+            response = self.session.get(url, verify=False, timeout=10)
+            self._check_auth(response)
             response.raise_for_status()
 
             # Check for success in response
@@ -522,6 +941,135 @@ class IPTagManagerAPI(IPTagManagerBase):
         except (requests.RequestException, ET.ParseError) as e:
             logger.error(f"Failed to unregister tags for IP {ip}: {e}")
 
+    def _post_uid_message(self, payload: str) -> Dict[str, any]:
+        """POST a uid-message payload and summarise the response.
+
+        Sending the message in the request body instead of the URL lifts the URL
+        length limit, so thousands of entries fit into a single call.
+
+        Args:
+            payload: Inner XML of the uid-message <payload> element
+
+        Returns:
+            Dict with 'success', 'message' and 'entry_errors' keys
+        """
+        cmd = f"<uid-message><version>2.0</version><type>update</type><payload>{payload}</payload></uid-message>"
+        data = {"type": "user-id", "cmd": cmd, "key": self.key}
+        if not self.is_panorama:
+            data["vsys"] = self.vsys
+
+        result = {"success": False, "message": "", "entry_errors": []}
+
+        try:
+            response = self.session.post(f"{self.base_url}/", data=data, verify=False, timeout=60)
+            self._check_auth(response)
+            response.raise_for_status()
+            xml_root = ET.fromstring(response.text)
+        except (requests.RequestException, ET.ParseError) as e:
+            result["message"] = str(e)
+            return result
+
+        result["success"] = xml_root.get("status") == "success"
+
+        # Per-entry problems are reported as <entry ip="..." message="..."/>
+        for entry in xml_root.iter("entry"):
+            if entry.get("message"):
+                result["entry_errors"].append({"ip": entry.get("ip"), "message": entry.get("message")})
+
+        if not result["success"]:
+            msg = xml_root.find(".//msg")
+            result["message"] = "".join(msg.itertext()).strip() if msg is not None else "Unknown error"
+
+        return result
+
+    def _send_uid_chunks(
+        self,
+        operation: str,
+        entries: List[str],
+        chunk_size: int,
+    ) -> List[Dict[str, any]]:
+        """Send pre-built <entry> elements in chunked uid-messages.
+
+        Args:
+            operation: "register" or "unregister"
+            entries: Serialized <entry> elements
+            chunk_size: Maximum entries per uid-message
+
+        Returns:
+            List of per-chunk result dicts
+        """
+        results = []
+        chunks = chunked(entries, chunk_size)
+
+        for index, chunk in enumerate(chunks, 1):
+            result = self._post_uid_message(f"<{operation}>{''.join(chunk)}</{operation}>")
+            result.update({"chunk": index, "entries": len(chunk)})
+
+            if result["success"]:
+                logger.info(f"{operation.capitalize()} chunk {index}/{len(chunks)}: {len(chunk)} entries sent")
+            else:
+                logger.error(
+                    f"{operation.capitalize()} chunk {index}/{len(chunks)} failed: {result['message']}"
+                )
+            for entry_error in result["entry_errors"]:
+                logger.warning(f"{entry_error['ip']}: {entry_error['message']}")
+
+            results.append(result)
+
+        return results
+
+    @staticmethod
+    def _build_entry(ip: str, tags: List[str], timeout: Optional[int] = None) -> str:
+        """Serialize one <entry> element with escaped IP and tag values.
+
+        Args:
+            ip: IP address
+            tags: Tags for the IP
+            timeout: Optional timeout in seconds, set on each tag member
+
+        Returns:
+            XML string for the entry
+        """
+        timeout_attr = f' timeout="{int(timeout)}"' if timeout else ""
+        members = "".join(f"<member{timeout_attr}>{escape(tag)}</member>" for tag in tags)
+        return f"<entry ip={quoteattr(ip)}><tag>{members}</tag></entry>"
+
+    def register_ip_tags_bulk(
+        self,
+        ip_tags_map: Dict[str, List[str]],
+        timeout: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> List[Dict[str, any]]:
+        """Register tags for many IPs with chunked uid-message POSTs.
+
+        Args:
+            ip_tags_map: Dict mapping IP addresses to tags to apply
+            timeout: Optional timeout in seconds
+            chunk_size: Maximum IP entries per uid-message
+
+        Returns:
+            List of per-chunk result dicts
+        """
+        entries = [self._build_entry(ip, tags, timeout) for ip, tags in ip_tags_map.items() if tags]
+        return self._send_uid_chunks("register", entries, chunk_size)
+
+    def unregister_ip_tags_bulk(
+        self,
+        ip_tags_map: Dict[str, List[str]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> List[Dict[str, any]]:
+        """Remove tags from many IPs with chunked uid-message POSTs.
+
+        Args:
+            ip_tags_map: Dict mapping IP addresses to tags to remove
+            chunk_size: Maximum IP entries per uid-message
+
+        Returns:
+            List of per-chunk result dicts
+        """
+        entries = [self._build_entry(ip, tags) for ip, tags in ip_tags_map.items() if tags]
+        return self._send_uid_chunks("unregister", entries, chunk_size)
+
     def clear_all_ip_tags(self) -> None:
         """Remove all IP tags from the device using direct API."""
         try:
@@ -535,7 +1083,8 @@ class IPTagManagerAPI(IPTagManagerBase):
             if not self.is_panorama:
                 url += f"&vsys={self.vsys}"
 
-            response = requests.get(url, verify=False, timeout=10)
+            response = self.session.get(url, verify=False, timeout=10)
+            self._check_auth(response)
             response.raise_for_status()
 
             # Check for success in response
@@ -557,23 +1106,18 @@ class IPTagManagerAPI(IPTagManagerBase):
         self,
         ip_tags_map: Dict[str, List[str]],
         timeout: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
     ) -> None:
         """Synchronize IP tags to match the provided mapping using direct API.
 
         Args:
             ip_tags_map: Dict mapping IP addresses to desired tags
             timeout: Optional timeout in seconds
+            chunk_size: Maximum IP entries per uid-message
         """
         try:
-            # For direct API, audit is implemented by clearing existing tags
-            # and registering the new ones
-            self.clear_all_ip_tags()
-
-            for ip, tags in ip_tags_map.items():
-                if tags:  # Only register if there are tags to add
-                    self.register_ip_tags(ip, tags, timeout)
-
-            logger.info("Successfully audited IP tags")
+            # Only the difference against the current state is sent
+            self.sync_ip_tags(ip_tags_map, timeout, chunk_size)
         except Exception as e:
             logger.error(f"Failed to audit IP tags: {e}")
 
@@ -621,6 +1165,377 @@ def display_ip_tags_table(registered_ips: Dict[str, Dict[str, any]]) -> None:
     console.print(table)
 
 
+def display_chunk_results(results: List[Dict[str, any]]) -> None:
+    """Display per-chunk outcomes of a bulk operation in a rich table.
+
+    Args:
+        results: List of per-chunk result dicts
+    """
+    table = Table(
+        title="Bulk Operation Results",
+        box=box.ROUNDED,
+        show_header=True,
+        header_style="bold cyan",
+    )
+    table.add_column("Chunk", justify="right")
+    table.add_column("Entries", justify="right")
+    table.add_column("Status")
+    table.add_column("Details", style="dim")
+
+    for result in results:
+        status = "[green]success[/]" if result["success"] else "[red]failed[/]"
+        details = result["message"]
+        if result["entry_errors"]:
+            details = f"{details} {len(result['entry_errors'])} entry warning(s)".strip()
+        table.add_row(str(result["chunk"]), str(result["entries"]), status, details)
+
+    console.print(table)
+
+    sent = sum(result["entries"] for result in results if result["success"])
+    total = sum(result["entries"] for result in results)
+    console.print(f"[bold]{sent}/{total} entries sent in {len(results)} chunk(s)[/]")
+
+
+def display_tag_delta(delta: Dict[str, Dict[str, List[str]]]) -> None:
+    """Display the per-IP changes an audit would make in a rich table.
+
+    Args:
+        delta: Delta as returned by compute_tag_delta
+    """
+    table = Table(
+        title="Audit Delta",
+        box=box.ROUNDED,
+        show_header=True,
+        header_style="bold cyan",
+    )
+    table.add_column("IP Address", style="green")
+    table.add_column("Add", style="yellow")
+    table.add_column("Remove", style="red")
+    table.add_column("Refresh", style="blue")
+
+    ips = delta["register"].keys() | delta["unregister"].keys() | delta["refresh"].keys()
+    for ip in sorted(ips):
+        table.add_row(
+            ip,
+            ", ".join(delta["register"].get(ip, [])),
+            ", ".join(delta["unregister"].get(ip, [])),
+            ", ".join(delta["refresh"].get(ip, [])),
+        )
+
+    console.print(table)
+
+    operations = sum(len(tags) for changes in delta.values() for tags in changes.values())
+    console.print(f"[bold]{operations} tag operation(s) across {len(ips)} IP(s)[/]")
+
+
+def load_ip_tags_file(path: str) -> Dict[str, List[str]]:
+    """Load an IP-to-tags mapping from a JSON or CSV file.
+
+    JSON files hold an object mapping each IP to a list of tags, or to a single
+    tag string. CSV files hold one IP per row, followed by one tag per column.
+
+    Args:
+        path: Path to the JSON or CSV file
+
+    Returns:
+        Dict mapping IP addresses to tags
+
+    Raises:
+        ValueError: If a JSON file is not an object of IPs to tags
+    """
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"{path}: expected an object mapping IP addresses to tags")
+
+        ip_tags_map = {}
+        for ip, tags in data.items():
+            if isinstance(tags, str):
+                tags = [tags]
+            if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+                raise ValueError(
+                    f"{path}: tags for {ip} must be a string or a list of strings, "
+                    f"got {json.dumps(tags)}"
+                )
+            ip_tags_map[ip] = tags
+        return ip_tags_map
+
+    ip_tags_map: Dict[str, List[str]] = {}
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip() or row[0].startswith("#"):
+                continue
+            tags = [tag.strip() for tag in row[1:] if tag.strip()]
+            ip_tags_map.setdefault(row[0].strip(), []).extend(tags)
+    return ip_tags_map
+
+
+def load_inventory(path: str, defaults: argparse.Namespace) -> List[Dict[str, any]]:
+    """Load the list of target devices from a JSON or CSV inventory file.
+
+    JSON files hold a list of objects; CSV files have a header row. Recognized
+    fields are host, username, password, vsys and sdk. Missing fields fall back
+    to the command-line values.
+
+    Args:
+        path: Path to the JSON or CSV inventory
+        defaults: Parsed command-line arguments used for missing fields
+
+    Returns:
+        List of device dicts
+
+    Raises:
+        ValueError: If a row has no host, or no username/password after the
+            command-line fallbacks
+    """
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise ValueError(f"{path}: expected a JSON list of device objects")
+        rows = [(f"entry {number}", row) for number, row in enumerate(data, 1)]
+    else:
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            rows = [(f"line {reader.line_num}", row) for row in reader]
+
+    devices = []
+    for where, row in rows:
+        if not isinstance(row, dict):
+            raise ValueError(f"{path} {where}: expected an object with a host field")
+
+        host = str(row.get("host") or "").strip()
+        if not host:
+            raise ValueError(f"{path} {where}: missing host")
+
+        device = {
+            "host": host,
+            "username": row.get("username") or defaults.username,
+            "password": row.get("password") or defaults.password,
+            "vsys": row.get("vsys") or defaults.vsys,
+        }
+        for field in ("username", "password"):
+            if not device[field]:
+                raise ValueError(
+                    f"{path} {where}: no {field} for {host}; add a {field} column "
+                    f"or pass --{field}"
+                )
+
+        sdk = row.get("sdk")
+        if isinstance(sdk, str):
+            sdk = sdk.strip().lower() in ("1", "true", "yes") if sdk.strip() else None
+        device["sdk"] = defaults.sdk if sdk is None else sdk
+        devices.append(device)
+
+    return devices
+
+
+def create_manager(
+    hostname: str,
+    username: str,
+    password: str,
+    vsys: str,
+    sdk: bool,
+    key_cache: Optional[APIKeyCache] = None,
+) -> IPTagManagerBase:
+    """Create the SDK or direct API manager for a device.
+
+    Args:
+        hostname: Firewall/Panorama hostname or IP
+        username: Username for authentication
+        password: Password for authentication
+        vsys: Virtual system
+        sdk: Use the SDK manager when True, direct API otherwise
+        key_cache: Optional API key cache for the direct API manager
+
+    Returns:
+        Unconnected manager instance
+    """
+    if sdk:
+        logger.info(f"Using PAN-OS Python SDK for API operations on {hostname}")
+        return IPTagManagerSDK(hostname, username, password, vsys)
+
+    logger.info(f"Using direct API calls for operations on {hostname}")
+    return IPTagManagerAPI(hostname, username, password, vsys, key_cache)
+
+
+def run_command(
+    manager: IPTagManagerBase,
+    args: argparse.Namespace,
+    ip_tags_map: Optional[Dict[str, List[str]]] = None,
+    display: bool = True,
+) -> str:
+    """Execute the requested subcommand against a connected manager.
+
+    Args:
+        manager: Connected IP tag manager
+        args: Parsed command-line arguments
+        ip_tags_map: IP/tag mapping loaded from the command's file argument
+        display: Render result tables to the console
+
+    Returns:
+        One-line summary of the outcome
+    """
+    if args.command == "list":
+        registered_ips = manager.get_all_registered_ips()
+        if display:
+            if registered_ips:
+                display_ip_tags_table(registered_ips)
+            else:
+                console.print("[yellow]No registered IP addresses found.[/]")
+        return f"{len(registered_ips)} registered IP(s)"
+
+    elif args.command == "register":
+        tags = [tag.strip() for tag in args.tags.split(",")]
+        manager.register_ip_tags(args.ip, tags, args.timeout)
+        return f"registered {len(tags)} tag(s) on {args.ip}"
+
+    elif args.command == "unregister":
+        tags = [tag.strip() for tag in args.tags.split(",")]
+        manager.unregister_ip_tags(args.ip, tags)
+        return f"unregistered {len(tags)} tag(s) from {args.ip}"
+
+    elif args.command in ("register-bulk", "unregister-bulk"):
+        if args.command == "register-bulk":
+            results = manager.register_ip_tags_bulk(ip_tags_map, args.timeout, args.chunk_size)
+        else:
+            results = manager.unregister_ip_tags_bulk(ip_tags_map, args.chunk_size)
+        if display:
+            display_chunk_results(results)
+        failed = sum(1 for result in results if not result["success"])
+        if failed:
+            raise RuntimeError(f"{failed} of {len(results)} chunk(s) failed")
+        return f"{sum(result['entries'] for result in results)} entries in {len(results)} chunk(s)"
+
+    elif args.command == "audit":
+        delta, results = manager.sync_ip_tags(
+            ip_tags_map,
+            args.timeout,
+            args.chunk_size,
+            dry_run=args.dry_run,
+            refresh_below=args.refresh_below,
+        )
+        if display:
+            display_tag_delta(delta)
+            if results:
+                display_chunk_results(results)
+        failed = sum(1 for result in results if not result["success"])
+        if failed:
+            raise RuntimeError(f"{failed} of {len(results)} chunk(s) failed")
+        operations = sum(len(tags) for changes in delta.values() for tags in changes.values())
+        return f"{operations} tag operation(s){' (dry run)' if args.dry_run else ''}"
+
+    elif args.command == "clear":
+        manager.clear_all_ip_tags()
+        return "cleared all IP tags"
+
+    return ""
+
+
+def run_device(
+    device: Dict[str, any],
+    args: argparse.Namespace,
+    ip_tags_map: Optional[Dict[str, List[str]]],
+) -> Dict[str, any]:
+    """Connect to one inventory device and run the command on it.
+
+    Args:
+        device: Device dict from load_inventory
+        args: Parsed command-line arguments
+        ip_tags_map: IP/tag mapping shared by all devices
+
+    Returns:
+        Dict with 'host', 'success', 'seconds' and 'detail' keys
+    """
+    started = time.perf_counter()
+    result = {"host": device["host"], "success": False, "detail": ""}
+
+    try:
+        manager = create_manager(
+            device["host"],
+            device["username"],
+            device["password"],
+            device["vsys"],
+            device["sdk"],
+            args.key_cache,
+        )
+        manager.connect()
+        result["detail"] = run_command(manager, args, ip_tags_map, display=False)
+        result["success"] = True
+    except SystemExit:
+        # connect() exits the process on failure; contain it to this device
+        result["detail"] = "connection failed"
+    except Exception as e:
+        result["detail"] = str(e)
+        logger.error(f"{device['host']}: {e}")
+
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def run_on_inventory(
+    devices: List[Dict[str, any]],
+    args: argparse.Namespace,
+    ip_tags_map: Optional[Dict[str, List[str]]],
+) -> List[Dict[str, any]]:
+    """Run the command on every inventory device with a bounded thread pool.
+
+    Args:
+        devices: Device dicts from load_inventory
+        args: Parsed command-line arguments
+        ip_tags_map: IP/tag mapping shared by all devices
+
+    Returns:
+        Per-device result dicts in inventory order
+    """
+    results = [None] * len(devices)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.max_workers)) as executor:
+        futures = {
+            executor.submit(run_device, device, args, ip_tags_map): index for index, device in enumerate(devices)
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            status = "done" if result["success"] else "failed"
+            logger.info(f"{result['host']}: {status} in {result['seconds']:.1f}s - {result['detail']}")
+
+    return results
+
+
+def display_device_results(results: List[Dict[str, any]], elapsed: float) -> None:
+    """Display per-device outcomes and aggregate timing in a rich table.
+
+    Args:
+        results: Per-device result dicts
+        elapsed: Wall-clock seconds for the whole run
+    """
+    table = Table(
+        title="Device Results",
+        box=box.ROUNDED,
+        show_header=True,
+        header_style="bold cyan",
+    )
+    table.add_column("Device", style="green")
+    table.add_column("Status")
+    table.add_column("Time (s)", justify="right")
+    table.add_column("Details", style="dim")
+
+    for result in results:
+        status = "[green]success[/]" if result["success"] else "[red]failed[/]"
+        table.add_row(result["host"], status, f"{result['seconds']:.1f}", result["detail"])
+
+    console.print(table)
+
+    succeeded = sum(1 for result in results if result["success"])
+    device_time = sum(result["seconds"] for result in results)
+    console.print(
+        f"[bold]{succeeded}/{len(results)} device(s) succeeded in {elapsed:.1f}s "
+        f"(sequential device time {device_time:.1f}s)[/]"
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Manage IP tags on PAN-OS devices",
@@ -658,6 +1573,27 @@ def main():
         dest="sdk",
         help="Use direct API calls instead of SDK",
     )
+    parser.add_argument(
+        "--no-key-cache",
+        action="store_true",
+        help="Always request a fresh API key instead of using the encrypted key cache",
+    )
+    parser.add_argument(
+        "--inventory",
+        help="JSON or CSV file of devices to run the command against concurrently",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help=f"Devices processed in parallel with --inventory (default: {DEFAULT_MAX_WORKERS}, env: PAN_MAX_WORKERS)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"IP entries per uid-message for bulk commands (default: {DEFAULT_CHUNK_SIZE})",
+    )
 
     # Add subparsers for different operations
     subparsers = parser.add_subparsers(
@@ -704,6 +1640,56 @@ def main():
         help="Comma-separated list of tags to remove",
     )
 
+    # Bulk register command
+    register_bulk_parser = subparsers.add_parser(
+        "register-bulk",
+        help="Register tags for many IPs from a JSON or CSV file",
+    )
+    register_bulk_parser.add_argument(
+        "file",
+        help="JSON object of IP -> tags, or CSV rows of ip,tag[,tag...]",
+    )
+    register_bulk_parser.add_argument(
+        "--timeout",
+        type=int,
+        help="Tag timeout in seconds",
+    )
+
+    # Bulk unregister command
+    unregister_bulk_parser = subparsers.add_parser(
+        "unregister-bulk",
+        help="Remove tags from many IPs listed in a JSON or CSV file",
+    )
+    unregister_bulk_parser.add_argument(
+        "file",
+        help="JSON object of IP -> tags, or CSV rows of ip,tag[,tag...]",
+    )
+
+    # Audit command
+    audit_parser = subparsers.add_parser(
+        "audit",
+        help="Make device tags match a JSON or CSV file, sending only the differences",
+    )
+    audit_parser.add_argument(
+        "file",
+        help="JSON object of IP -> tags, or CSV rows of ip,tag[,tag...]",
+    )
+    audit_parser.add_argument(
+        "--timeout",
+        type=int,
+        help="Tag timeout in seconds",
+    )
+    audit_parser.add_argument(
+        "--refresh-below",
+        type=int,
+        help="Re-register tags with fewer seconds remaining (default: half of --timeout)",
+    )
+    audit_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show the changes without applying them",
+    )
+
     # Clear command
     subparsers.add_parser(
         "clear",
@@ -713,60 +1699,60 @@ def main():
     args = parser.parse_args()
 
     # Validate required credentials
-    if not args.host:
+    if not args.host and not args.inventory:
         console.print(
-            "[bold red]Error:[/] Host is required. Use --host or set PAN_HOST environment variable."
+            "[bold red]Error:[/] Host is required. Use --host, --inventory or set PAN_HOST environment variable."
         )
         sys.exit(1)
-    if not args.username:
+
+    # Inventory rows carry their own credentials and are validated on load
+    devices = None
+    if args.inventory:
+        try:
+            devices = load_inventory(args.inventory, args)
+        except (OSError, ValueError) as e:
+            console.print(f"[bold red]Error:[/] Invalid inventory: {e}")
+            sys.exit(1)
+    elif not args.username:
         console.print(
             "[bold red]Error:[/] Username is required. Use --username or set PAN_USERNAME environment variable."
         )
         sys.exit(1)
-    if not args.password:
+    elif not args.password:
         console.print(
             "[bold red]Error:[/] Password is required. Use --password or set PAN_PASSWORD environment variable."
         )
         sys.exit(1)
 
-    # Create appropriate manager based on sdk flag
-    if args.sdk:
-        logger.info("Using PAN-OS Python SDK for API operations")
-        manager = IPTagManagerSDK(
-            args.host,
-            args.username,
-            args.password,
-            args.vsys,
-        )
-    else:
-        logger.info("Using direct API calls for operations")
-        manager = IPTagManagerAPI(
-            args.host,
-            args.username,
-            args.password,
-            args.vsys,
-        )
+    args.key_cache = None if args.no_key_cache else APIKeyCache()
 
-    manager.connect()
+    # Load the IP/tag file once, even when it is pushed to many devices
+    ip_tags_map = None
+    if hasattr(args, "file"):
+        try:
+            ip_tags_map = load_ip_tags_file(args.file)
+        except (OSError, ValueError) as e:
+            console.print(f"[bold red]Error:[/] Invalid IP/tag file: {e}")
+            sys.exit(1)
 
-    # Execute requested command
-    if args.command == "list":
-        registered_ips = manager.get_all_registered_ips()
-        if registered_ips:
-            display_ip_tags_table(registered_ips)
-        else:
-            console.print("[yellow]No registered IP addresses found.[/]")
+    if devices is not None:
+        logger.info(f"Running '{args.command}' on {len(devices)} device(s) with {args.max_workers} worker(s)")
 
-    elif args.command == "register":
-        tags = [tag.strip() for tag in args.tags.split(",")]
-        manager.register_ip_tags(args.ip, tags, args.timeout)
+        started = time.perf_counter()
+        results = run_on_inventory(devices, args, ip_tags_map)
+        display_device_results(results, time.perf_counter() - started)
 
-    elif args.command == "unregister":
-        tags = [tag.strip() for tag in args.tags.split(",")]
-        manager.unregister_ip_tags(args.ip, tags)
+        if not all(result["success"] for result in results):
+            sys.exit(1)
+        return
 
-    elif args.command == "clear":
-        manager.clear_all_ip_tags()
+    manager = create_manager(args.host, args.username, args.password, args.vsys, args.sdk, args.key_cache)
+    manager.connect()
+    try:
+        run_command(manager, args, ip_tags_map)
+    except RuntimeError as e:
+        console.print(f"[bold red]Error:[/] {e}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Converter Row Benchmark
+Measures convert_log_to_csv_row throughput on a synthetic dataset, comparing the
+precomputed column index against the original per-cell mapping scan.
+"""
+
+import argparse
+import csv
+import os
+import time
+
+from xml_to_csv_converter import (
+    CSV_HEADERS,
+    XML_TO_CSV_MAPPING,
+    convert_log_to_csv_row,
+)
+
+
+def legacy_convert_log_to_csv_row(log_dict):
+    """Original implementation: scan XML_TO_CSV_MAPPING for each header of each row."""
+    row = []
+
+    for header in CSV_HEADERS:
+        if header == "":
+            row.append("")
+        else:
+            xml_field = None
+            for xml_key, csv_key in XML_TO_CSV_MAPPING.items():
+                if csv_key == header:
+                    xml_field = xml_key
+                    break
+
+            if xml_field and xml_field in log_dict:
+                row.append(log_dict[xml_field])
+            else:
+                row.append("")
+
+    return row
+
+
+def generate_entries(count, fields_per_entry):
+    """
+    Yield synthetic log dictionaries.
+
+    Args:
+        count: Number of entries to generate
+        fields_per_entry: Number of mapped XML fields populated per entry
+
+    Yields:
+        dict: Synthetic log entry
+    """
+    fields = list(XML_TO_CSV_MAPPING)[:fields_per_entry]
+    template = {field: f"{field}-value" for field in fields}
+    for i in range(count):
+        entry = dict(template)
+        entry["sessionid"] = str(i)
+        yield entry
+
+
+def run(converter, rows, fields_per_entry):
+    """
+    Convert and write `rows` synthetic entries to os.devnull.
+
+    Returns:
+        float: Rows per second
+    """
+    with open(os.devnull, "w", newline="") as f:
+        writer = csv.writer(f)
+        start = time.perf_counter()
+        for entry in generate_entries(rows, fields_per_entry):
+            writer.writerow(converter(entry))
+        elapsed = time.perf_counter() - start
+    return rows / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=1_000_000,
+        help="Entries to convert (default: 1,000,000)",
+    )
+    parser.add_argument(
+        "--legacy-rows",
+        type=int,
+        default=None,
+        help="Entries for the original implementation (default: same as --rows)",
+    )
+    parser.add_argument(
+        "--fields",
+        type=int,
+        default=60,
+        help="Populated XML fields per entry (default: 60)",
+    )
+    args = parser.parse_args()
+
+    legacy_rows = args.legacy_rows or args.rows
+
+    before = run(legacy_convert_log_to_csv_row, legacy_rows, args.fields)
+    print(f"Before (mapping scan):  {before:>12,.0f} rows/sec  ({legacy_rows:,} rows)")
+
+    after = run(convert_log_to_csv_row, args.rows, args.fields)
+    print(f"After (column index):   {after:>12,.0f} rows/sec  ({args.rows:,} rows)")
+
+    print(f"Speedup: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
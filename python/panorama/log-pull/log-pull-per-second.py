@@ -4,18 +4,45 @@ Panorama Log Retrieval Script
 Queries Panorama XML API for traffic logs second-by-second and saves results to local files.
 Tracks queries that hit the 5000 log limit for manual review.
 Enhanced with progress tracking to log when jobs have incomplete progress during polling.
+Keeps up to CONCURRENT_JOBS log queries in flight so submission, polling and saving overlap.
+With ADAPTIVE_WINDOWS enabled, windows grow over quiet periods and are bisected when they hit
+MAX_LOGS; one-second windows that still hit the limit are paged with the skip parameter.
+Every finished window is recorded in a JSON-lines manifest so reruns skip completed windows.
+With DIRECT_OUTPUT set, job results are parsed once in memory and appended straight to a
+CSV or Parquet file using the converter's sinks; raw XML is kept only if SAVE_RAW_XML is set.
+All API calls share one pooled keep-alive HTTP session with retries; ASYNC_CLIENT switches the
+submit/poll loop to an aiohttp client running on a single asyncio event loop.
+Polling starts fast and backs off, using the job's progress trend to estimate completion;
+job status is read from the head of each response without building an XML tree.
 """
 
+import asyncio
+import bisect
+import io
+import json
 import logging
 import os
+import re
 import sys
+import threading
 import time
 import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from pathlib import Path
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import xml_to_csv_converter as converter
+
+try:
+    import aiohttp
+except ImportError:  # Only needed when ASYNC_CLIENT is enabled
+    aiohttp = None
 
 # Load environment variables from .env file
 load_dotenv()
@@ -40,11 +67,56 @@ MAX_LOGS = int(os.getenv("MAX_LOGS", "5000"))
 # Output Configuration
 OUTPUT_DIR = os.getenv("OUTPUT_DIR", "./panorama_logs")
 REVISIT_FILE = os.getenv("REVISIT_FILE", "revisit_manually.md")
+MANIFEST_FILE = os.getenv("MANIFEST_FILE", "manifest.jsonl")
+RESUME = os.getenv("RESUME", "true").lower() in ("true", "1", "yes")
+
+# Direct Conversion Configuration
+# "csv" or "parquet" to write rows straight to CSV_OUTPUT_DIR; empty to only save XML
+DIRECT_OUTPUT = os.getenv("DIRECT_OUTPUT", "").lower()
+SAVE_RAW_XML = os.getenv("SAVE_RAW_XML", "true").lower() in ("true", "1", "yes")
 
 # Polling Configuration
-POLL_INTERVAL = int(os.getenv("POLL_INTERVAL", "2"))
+# First poll waits POLL_INITIAL_INTERVAL; later delays grow by POLL_BACKOFF up to POLL_INTERVAL
+POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", "2"))
+POLL_INITIAL_INTERVAL = float(os.getenv("POLL_INITIAL_INTERVAL", "0.5"))
+POLL_BACKOFF = float(os.getenv("POLL_BACKOFF", "2"))
 MAX_POLL_ATTEMPTS = int(os.getenv("MAX_POLL_ATTEMPTS", "60"))
 
+# HTTP Client Configuration
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "60"))
+ASYNC_CLIENT = os.getenv("ASYNC_CLIENT", "false").lower() in ("true", "1", "yes")
+# Transient statuses retried with exponential backoff
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Job submission is also a GET, but retrying it after the request reached Panorama
+# could queue a duplicate job, so it is only retried when Panorama refused it outright
+SUBMIT_RETRY_STATUSES = (429, 503)
+
+# Job status and the logs count/progress attributes precede the entries in a log job
+# response, so only this many leading characters are scanned for them
+STATUS_SCAN_CHARS = 4096
+RESPONSE_STATUS_RE = re.compile(r"""<response\b[^>]*\bstatus\s*=\s*["']([^"']*)["']""")
+JOB_STATUS_RE = re.compile(r"<job>.*?<status>([^<]*)</status>", re.DOTALL)
+LOGS_ELEMENT_RE = re.compile(r"<logs\b([^>]*)>")
+PROGRESS_ATTR_RE = re.compile(r"""\bprogress\s*=\s*["'](\d+)["']""")
+COUNT_ATTR_RE = re.compile(r"""\bcount\s*=\s*["'](\d+)["']""")
+
+# Concurrency Configuration
+# Number of log jobs kept in flight at once, capped at Panorama's concurrent job limit
+CONCURRENT_JOBS = int(os.getenv("CONCURRENT_JOBS", "1"))
+PANORAMA_JOB_LIMIT = int(os.getenv("PANORAMA_JOB_LIMIT", "5"))
+
+# Adaptive Window Configuration
+ADAPTIVE_WINDOWS = os.getenv("ADAPTIVE_WINDOWS", "false").lower() in ("true", "1", "yes")
+INITIAL_WINDOW_SECONDS = int(os.getenv("INITIAL_WINDOW_SECONDS", "60"))
+MAX_WINDOW_SECONDS = int(os.getenv("MAX_WINDOW_SECONDS", "3600"))
+# Windows returning fewer than SPARSE_FRACTION * MAX_LOGS entries double the next window size
+SPARSE_FRACTION = float(os.getenv("SPARSE_FRACTION", "0.25"))
+# Pages fetched with skip for a saturated one-second window before it goes to the revisit file
+MAX_SKIP_PAGES = int(os.getenv("MAX_SKIP_PAGES", "20"))
+
 # Debug Configuration
 DEBUG = os.getenv("DEBUG", "false").lower() in ("true", "1", "yes")
 
@@ -81,48 +153,264 @@ def format_datetime(dt):
     return dt.strftime("%Y/%m/%d %H:%M:%S")
 
 
-def submit_log_query(start_dt, end_dt):
+def create_session(idempotent=True):
     """
-    Submit a log query to Panorama and return the job ID.
+    Create a shared HTTP session for Panorama API calls.
+
+    The session keeps connections alive across calls, holds up to HTTP_POOL_SIZE
+    connections for concurrent workers and retries transient failures with
+    exponential backoff.
+
+    Args:
+        idempotent: False for job submission, whose read errors and ambiguous
+            statuses are not retried so a lost response never queues a second job
+
+    Returns:
+        requests.Session: Configured session
+    """
+    retry = Retry(
+        total=HTTP_RETRIES,
+        read=None if idempotent else 0,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=RETRY_STATUSES if idempotent else SUBMIT_RETRY_STATUSES,
+        allowed_methods=["GET"],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.headers["X-PAN-KEY"] = API_KEY
+    return session
+
+
+HTTP_SESSION = create_session()
+HTTP_SUBMIT_SESSION = create_session(idempotent=False)
+
+
+def session_stats(session):
+    """
+    Summarise connection reuse for a requests session.
+
+    Args:
+        session: requests.Session to inspect
+
+    Returns:
+        tuple: (requests_sent, connections_opened)
+    """
+    requests_sent = 0
+    connections_opened = 0
+    for adapter in session.adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            requests_sent += pool.num_requests
+            connections_opened += pool.num_connections
+    return requests_sent, connections_opened
+
+
+def build_query_params(start_dt, end_dt, skip=0):
+    """
+    Build the request parameters for a log query.
 
     Args:
         start_dt: datetime object for query start
         end_dt: datetime object for query end
+        skip: Number of matching logs to skip
 
     Returns:
-        tuple: (job_id, query_string) or (None, None) on error
+        tuple: (params, query_string)
     """
     query = f"( receive_time geq '{format_datetime(start_dt)}' ) and ( receive_time leq '{format_datetime(end_dt)}' )"
 
     params = {"type": "log", "log-type": LOG_TYPE, "query": query, "nlogs": MAX_LOGS}
+    if skip:
+        params["skip"] = skip
+
+    return params, query
+
+
+def parse_submit_response(xml_text):
+    """
+    Extract the job ID from a log query submission response.
+
+    Args:
+        xml_text: XML response text
+
+    Returns:
+        str: Job ID, or None if the query was rejected
+
+    Raises:
+        ET.ParseError: If the response is not valid XML
+    """
+    root = ET.fromstring(xml_text)
+
+    # Check response status
+    status = root.get("status")
+    if status != "success":
+        logger.error(f"Query failed: {xml_text}")
+        return None
+
+    # Extract job ID
+    job_element = root.find(".//job")
+    if job_element is not None:
+        job_id = job_element.text
+        logger.info(f"Query submitted. Job ID: {job_id}")
+        return job_id
+
+    logger.error(f"No job ID in response: {xml_text}")
+    return None
+
+
+def parse_logs_attributes(xml_text):
+    """
+    Read the logs element attributes from the head of a response without parsing it.
+
+    Args:
+        xml_text: XML response text
+
+    Returns:
+        str: Raw attribute text of the logs element, or None if it is not present
+    """
+    match = LOGS_ELEMENT_RE.search(xml_text, 0, STATUS_SCAN_CHARS)
+    return match.group(1) if match else None
+
+
+def parse_poll_response(xml_text):
+    """
+    Classify a job polling response.
 
-    headers = {"X-PAN-KEY": API_KEY}
+    Only the first STATUS_SCAN_CHARS characters are scanned, so the cost does not
+    grow with the number of log entries in a finished job.
+
+    Args:
+        xml_text: XML response text
+
+    Returns:
+        tuple: (state, progress) where state is one of "done", "incomplete",
+            "no_logs", "running" or "failed", and progress is an int or None
+
+    Raises:
+        ET.ParseError: If the response has no response element
+    """
+    response_match = RESPONSE_STATUS_RE.search(xml_text, 0, STATUS_SCAN_CHARS)
+    if response_match is None:
+        raise ET.ParseError("no <response> element in poll response")
+
+    if response_match.group(1) != "success":
+        return "failed", None
+
+    logs_attributes = parse_logs_attributes(xml_text)
+    progress = None
+    if logs_attributes is not None:
+        progress_match = PROGRESS_ATTR_RE.search(logs_attributes)
+        if progress_match:
+            progress = int(progress_match.group(1))
+
+    # Check if job is complete
+    job_match = JOB_STATUS_RE.search(xml_text, 0, STATUS_SCAN_CHARS)
+    if job_match is None or job_match.group(1) != "FIN":
+        return "running", progress
+
+    # Check progress attribute in logs element
+    if logs_attributes is None:
+        return "no_logs", None
+
+    if progress == 100:
+        return "done", progress
+    return "incomplete", progress
+
+
+def next_poll_delay(delay, progress, previous_progress, elapsed):
+    """
+    Choose how long to wait before the next poll.
+
+    When progress is advancing, the remaining time is estimated from its rate and the
+    next poll is timed for the estimated completion. Otherwise the delay grows by
+    POLL_BACKOFF. The result always stays between POLL_INITIAL_INTERVAL and
+    POLL_INTERVAL.
+
+    Args:
+        delay: Delay used before the latest poll
+        progress: Progress percentage from the latest poll, or None
+        previous_progress: Progress percentage from the poll before, or None
+        elapsed: Seconds between those two polls
+
+    Returns:
+        float: Seconds to wait
+    """
+    lower = min(POLL_INITIAL_INTERVAL, POLL_INTERVAL)
+
+    if (
+        progress is not None
+        and previous_progress is not None
+        and progress > previous_progress
+        and elapsed > 0
+    ):
+        rate = (progress - previous_progress) / elapsed
+        estimate = (100 - progress) / rate
+        return min(max(estimate, lower), POLL_INTERVAL)
+
+    return min(max(delay * POLL_BACKOFF, lower), POLL_INTERVAL)
+
+
+def log_poll_state(job_id, state, progress, attempt, incomplete_count):
+    """
+    Log the outcome of a single poll, shared by the sync and async clients.
+
+    Args:
+        job_id: The job ID being polled
+        state: State returned by parse_poll_response
+        progress: Progress attribute value, if any
+        attempt: 0-based poll attempt
+        incomplete_count: Polls so far with progress < 100
+    """
+    if state == "done":
+        logger.info(f"Job {job_id} completed successfully (100% progress)")
+        if incomplete_count > 0:
+            logger.info(
+                f"Job {job_id} had {incomplete_count} poll(s) with progress < 100%"
+            )
+    elif state == "incomplete":
+        logger.info(
+            f"Job {job_id} at {progress}% progress (attempt {attempt + 1}/{MAX_POLL_ATTEMPTS}) - incomplete #{incomplete_count}"
+        )
+    elif state == "no_logs":
+        # No logs element yet, keep polling
+        logger.info(
+            f"Job {job_id} still processing (no logs yet)... (attempt {attempt + 1}/{MAX_POLL_ATTEMPTS})"
+        )
+    elif state == "running":
+        logger.info(
+            f"Job {job_id} still processing... (attempt {attempt + 1}/{MAX_POLL_ATTEMPTS})"
+        )
+
+
+def submit_log_query(start_dt, end_dt, skip=0):
+    """
+    Submit a log query to Panorama and return the job ID.
+
+    Args:
+        start_dt: datetime object for query start
+        end_dt: datetime object for query end
+        skip: Number of matching logs to skip, used to page through saturated windows
+
+    Returns:
+        tuple: (job_id, query_string) or (None, None) on error
+    """
+    params, query = build_query_params(start_dt, end_dt, skip=skip)
 
     try:
         logger.debug(f"Submitting query: {query}")
-        response = requests.get(
-            PANORAMA_URL, params=params, headers=headers, verify=False
+        response = HTTP_SUBMIT_SESSION.get(
+            PANORAMA_URL, params=params, timeout=HTTP_TIMEOUT, verify=False
         )
         response.raise_for_status()
 
-        # Parse XML response
-        root = ET.fromstring(response.text)
-
-        # Check response status
-        status = root.get("status")
-        if status != "success":
-            logger.error(f"Query failed: {response.text}")
-            return None, None
-
-        # Extract job ID
-        job_element = root.find(".//job")
-        if job_element is not None:
-            job_id = job_element.text
-            logger.info(f"Query submitted. Job ID: {job_id}")
+        job_id = parse_submit_response(response.text)
+        if job_id:
             return job_id, query
-        else:
-            logger.error(f"No job ID in response: {response.text}")
-            return None, None
+        return None, None
 
     except requests.exceptions.RequestException as e:
         logger.error(f"Request failed: {e}")
@@ -144,70 +432,236 @@ def poll_job_status(job_id):
     """
     params = {"type": "log", "action": "get", "job-id": job_id}
 
-    headers = {"X-PAN-KEY": API_KEY}
-
     incomplete_count = 0  # Track how many times we see progress < 100
+    delay = POLL_INITIAL_INTERVAL
+    previous_progress = None
+    previous_time = None
 
     for attempt in range(MAX_POLL_ATTEMPTS):
         try:
-            response = requests.get(
-                PANORAMA_URL, params=params, headers=headers, verify=False
+            response = HTTP_SESSION.get(
+                PANORAMA_URL, params=params, timeout=HTTP_TIMEOUT, verify=False
             )
             response.raise_for_status()
 
             # Parse XML to check status
-            root = ET.fromstring(response.text)
-            status = root.get("status")
-
-            if status == "success":
-                # Check if job is complete
-                job_status = root.find(".//status")
-                if job_status is not None and job_status.text == "FIN":
-                    # Check progress attribute in logs element
-                    logs_element = root.find(".//logs")
-                    if logs_element is not None:
-                        progress = logs_element.get("progress")
-                        if progress and int(progress) == 100:
-                            logger.info(
-                                f"Job {job_id} completed successfully (100% progress)"
-                            )
-                            if incomplete_count > 0:
-                                logger.info(
-                                    f"Job {job_id} had {incomplete_count} poll(s) with progress < 100%"
-                                )
-                            return response.text, incomplete_count
-                        else:
-                            incomplete_count += 1
-                            logger.info(
-                                f"Job {job_id} at {progress}% progress (attempt {attempt + 1}/{MAX_POLL_ATTEMPTS}) - incomplete #{incomplete_count}"
-                            )
-                            time.sleep(POLL_INTERVAL)
-                    else:
-                        # No logs element yet, keep polling
-                        logger.info(
-                            f"Job {job_id} still processing (no logs yet)... (attempt {attempt + 1}/{MAX_POLL_ATTEMPTS})"
-                        )
-                        time.sleep(POLL_INTERVAL)
-                else:
-                    logger.info(
-                        f"Job {job_id} still processing... (attempt {attempt + 1}/{MAX_POLL_ATTEMPTS})"
-                    )
-                    time.sleep(POLL_INTERVAL)
-            else:
-                logger.error(f"Job {job_id} failed: {response.text}")
-                return None, 0
+            state, progress = parse_poll_response(response.text)
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Polling request failed: {e}")
             time.sleep(POLL_INTERVAL)
+            continue
         except ET.ParseError as e:
             logger.error(f"XML parsing failed during polling: {e}")
             return None, 0
 
+        if state == "failed":
+            logger.error(f"Job {job_id} failed: {response.text}")
+            return None, 0
+
+        if state == "incomplete":
+            incomplete_count += 1
+
+        log_poll_state(job_id, state, progress, attempt, incomplete_count)
+
+        if state == "done":
+            return response.text, incomplete_count
+
+        # The first wait is POLL_INITIAL_INTERVAL; later waits adapt to progress
+        now = time.monotonic()
+        if previous_time is not None:
+            delay = next_poll_delay(delay, progress, previous_progress, now - previous_time)
+        previous_progress, previous_time = progress, now
+        time.sleep(delay)
+
     logger.error(f"Job {job_id} timed out after {MAX_POLL_ATTEMPTS} attempts")
     return None, 0
 
 
+class AsyncLogClient:
+    """
+    Run log job submit/poll loops on a background asyncio event loop with aiohttp.
+
+    Worker threads call run_log_job(), which blocks on its coroutine while every
+    submit and poll is multiplexed over one event loop and one aiohttp connection
+    pool of HTTP_POOL_SIZE keep-alive connections.
+    """
+
+    def __init__(self):
+        self.requests_sent = 0
+        self.connections_opened = 0
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.session = self._call(self._create_session())
+
+    def _call(self, coro):
+        """Run a coroutine on the client loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def _create_session(self):
+        async def on_request_start(session, context, params):
+            self.requests_sent += 1
+
+        async def on_connection_create_end(session, context, params):
+            self.connections_opened += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, ssl=False),
+            headers={"X-PAN-KEY": API_KEY},
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+            trace_configs=[trace_config],
+        )
+
+    async def _get(self, params, idempotent=True):
+        """
+        GET the API with the same retry policy as the sync sessions.
+
+        With idempotent=False (job submission) only connection failures and
+        SUBMIT_RETRY_STATUSES are retried, never a request that may have reached
+        Panorama.
+
+        Returns:
+            str: Response body
+
+        Raises:
+            aiohttp.ClientError: After HTTP_RETRIES failed retries
+        """
+        retry_statuses = RETRY_STATUSES if idempotent else SUBMIT_RETRY_STATUSES
+        retry_errors = (
+            (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+            if idempotent
+            else aiohttp.ClientConnectorError
+        )
+        for attempt in range(HTTP_RETRIES + 1):
+            try:
+                async with self.session.get(PANORAMA_URL, params=params) as response:
+                    if response.status in retry_statuses and attempt < HTTP_RETRIES:
+                        await asyncio.sleep(HTTP_BACKOFF * 2**attempt)
+                        continue
+                    response.raise_for_status()
+                    return await response.text()
+            except retry_errors:
+                if attempt == HTTP_RETRIES:
+                    raise
+                await asyncio.sleep(HTTP_BACKOFF * 2**attempt)
+
+    async def submit_log_query(self, start_dt, end_dt, skip=0):
+        """Async counterpart of submit_log_query."""
+        params, query = build_query_params(start_dt, end_dt, skip=skip)
+        # aiohttp only accepts str/int query values
+        params = {key: str(value) for key, value in params.items()}
+
+        try:
+            logger.debug(f"Submitting query: {query}")
+            job_id = parse_submit_response(await self._get(params, idempotent=False))
+            if job_id:
+                return job_id, query
+            return None, None
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Request failed: {e}")
+            return None, None
+        except ET.ParseError as e:
+            logger.error(f"XML parsing failed: {e}")
+            return None, None
+
+    async def poll_job_status(self, job_id):
+        """Async counterpart of poll_job_status."""
+        params = {"type": "log", "action": "get", "job-id": job_id}
+
+        incomplete_count = 0
+        delay = POLL_INITIAL_INTERVAL
+        previous_progress = None
+        previous_time = None
+
+        for attempt in range(MAX_POLL_ATTEMPTS):
+            try:
+                xml_text = await self._get(params)
+                state, progress = parse_poll_response(xml_text)
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"Polling request failed: {e}")
+                await asyncio.sleep(POLL_INTERVAL)
+                continue
+            except ET.ParseError as e:
+                logger.error(f"XML parsing failed during polling: {e}")
+                return None, 0
+
+            if state == "failed":
+                logger.error(f"Job {job_id} failed: {xml_text}")
+                return None, 0
+
+            if state == "incomplete":
+                incomplete_count += 1
+
+            log_poll_state(job_id, state, progress, attempt, incomplete_count)
+
+            if state == "done":
+                return xml_text, incomplete_count
+
+            # The first wait is POLL_INITIAL_INTERVAL; later waits adapt to progress
+            now = time.monotonic()
+            if previous_time is not None:
+                delay = next_poll_delay(delay, progress, previous_progress, now - previous_time)
+            previous_progress, previous_time = progress, now
+            await asyncio.sleep(delay)
+
+        logger.error(f"Job {job_id} timed out after {MAX_POLL_ATTEMPTS} attempts")
+        return None, 0
+
+    async def _run_log_job(self, start_dt, end_dt, skip=0):
+        job_id, query = await self.submit_log_query(start_dt, end_dt, skip=skip)
+        if not job_id:
+            return None, query, None, 0
+
+        xml_response, incomplete_count = await self.poll_job_status(job_id)
+        return xml_response, query, job_id, incomplete_count
+
+    def run_log_job(self, start_dt, end_dt, skip=0):
+        """Thread-safe drop-in for run_log_job that runs on the client event loop."""
+        return self._call(self._run_log_job(start_dt, end_dt, skip=skip))
+
+    def stats(self):
+        """
+        Returns:
+            tuple: (requests_sent, connections_opened)
+        """
+        return self.requests_sent, self.connections_opened
+
+    def close(self):
+        """Close the aiohttp session and stop the event loop."""
+        self._call(self.session.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+def get_log_count(xml_text):
+    """
+    Read the count attribute of the logs element.
+
+    Scans the head of the response rather than parsing every entry.
+
+    Args:
+        xml_text: XML response text
+
+    Returns:
+        int: Number of log entries in the response, 0 if it cannot be determined
+    """
+    logs_attributes = parse_logs_attributes(xml_text)
+    if logs_attributes is not None:
+        count_match = COUNT_ATTR_RE.search(logs_attributes)
+        if count_match:
+            return int(count_match.group(1))
+
+    logger.warning("Could not check log count: no logs count attribute in response")
+    return 0
+
+
 def check_log_count(xml_text):
     """
     Check if the logs element has count=5000.
@@ -218,32 +672,22 @@ def check_log_count(xml_text):
     Returns:
         bool: True if count is 5000, False otherwise
     """
-    try:
-        root = ET.fromstring(xml_text)
-        logs_element = root.find(".//result/log/logs")
-
-        if logs_element is not None:
-            count = logs_element.get("count")
-            if count and int(count) == MAX_LOGS:
-                return True
-        return False
-    except Exception as e:
-        logger.warning(f"Could not check log count: {e}")
-        return False
+    return get_log_count(xml_text) == MAX_LOGS
 
 
-def save_xml_response(xml_text, timestamp):
+def save_xml_response(xml_text, timestamp, suffix=""):
     """
     Save XML response to a timestamped file.
 
     Args:
         xml_text: XML response text
         timestamp: datetime object for the query
+        suffix: Optional filename suffix, e.g. window length or skip page
 
     Returns:
         str: Path to saved file
     """
-    filename = f"logs_{timestamp.strftime('%Y%m%d_%H%M%S')}.xml"
+    filename = f"logs_{timestamp.strftime('%Y%m%d_%H%M%S')}{suffix}.xml"
     filepath = os.path.join(OUTPUT_DIR, filename)
 
     try:
@@ -280,11 +724,426 @@ def append_to_revisit_file(query, timestamp):
         logger.error(f"Failed to write to {revisit_path}: {e}")
 
 
+def get_concurrency():
+    """
+    Resolve the number of log jobs to keep in flight.
+
+    Returns:
+        int: CONCURRENT_JOBS clamped between 1 and PANORAMA_JOB_LIMIT
+    """
+    concurrency = max(1, CONCURRENT_JOBS)
+    if concurrency > PANORAMA_JOB_LIMIT:
+        logger.warning(
+            f"CONCURRENT_JOBS={CONCURRENT_JOBS} exceeds PANORAMA_JOB_LIMIT={PANORAMA_JOB_LIMIT}, "
+            f"using {PANORAMA_JOB_LIMIT}"
+        )
+        concurrency = PANORAMA_JOB_LIMIT
+    return concurrency
+
+
+def run_log_job(start_dt, end_dt, skip=0):
+    """
+    Submit a log query and wait for its result.
+
+    Args:
+        start_dt: datetime object for query start
+        end_dt: datetime object for query end (inclusive)
+        skip: Number of matching logs to skip
+
+    Returns:
+        tuple: (xml_response_text, query_string, job_id, incomplete_progress_count);
+            xml_response_text is None on error
+    """
+    job_id, query = submit_log_query(start_dt, end_dt, skip=skip)
+    if not job_id:
+        return None, query, None, 0
+
+    xml_response, incomplete_count = poll_job_status(job_id)
+    return xml_response, query, job_id, incomplete_count
+
+
+def read_page(xml_response, name):
+    """
+    Count the entries in a job result, parsing them when converting directly.
+
+    Args:
+        xml_response: XML response text
+        name: Display name for log messages
+
+    Returns:
+        tuple: (log_count, entries); entries is None unless DIRECT_OUTPUT is set
+    """
+    if not DIRECT_OUTPUT:
+        return get_log_count(xml_response), None
+
+    # Single parse: the entries feed both the saturation check and the sink
+    entries = list(
+        converter.iter_log_entries(io.BytesIO(xml_response.encode("utf-8")), name)
+    )
+    return len(entries), entries
+
+
+def keep_page(xml_response, entries, window_start, suffix, result):
+    """
+    Save a job result as XML and/or hold its parsed entries for the output sink.
+
+    Args:
+        xml_response: XML response text
+        entries: Parsed entries from read_page, or None
+        window_start: datetime object for the window start
+        suffix: Filename suffix for the raw XML file
+        result: Outcome dict to update
+
+    Returns:
+        bool: True on success, False if the XML file could not be saved
+    """
+    if SAVE_RAW_XML or not DIRECT_OUTPUT:
+        saved_path = save_xml_response(xml_response, window_start, suffix=suffix)
+        if not saved_path:
+            return False
+        result["files"].append(saved_path)
+
+    if entries is not None:
+        result["entries"].extend(entries)
+
+    return True
+
+
+def process_window(index, total, window_start, window_end, skip=0, run_job=run_log_job):
+    """
+    Submit, poll and save a single query window.
+
+    Runs inside a worker thread so several windows can be in flight at once. In adaptive
+    mode a saturated multi-second window is reported back for splitting instead of being
+    saved, and a saturated one-second window is paged with skip.
+
+    Args:
+        index: 1-based position of the window, used for progress logging
+        total: Total number of windows, or None when it is not known up front
+        window_start: datetime object for the window start
+        window_end: datetime object for the window end (exclusive in adaptive mode)
+        skip: Rows of the window already saved by an earlier run; querying starts after them
+        run_job: Callable with the signature of run_log_job, e.g. AsyncLogClient.run_log_job
+
+    Returns:
+        dict: Outcome with keys timestamp, seconds, skip, success, split, revisit, count,
+            query, job_ids, files, entries and incomplete_count
+    """
+    seconds = int((window_end - window_start).total_seconds())
+    result = {
+        "timestamp": window_start,
+        "seconds": seconds,
+        "skip": skip,
+        "success": False,
+        "split": False,
+        "revisit": False,
+        "count": 0,
+        "query": None,
+        "job_ids": [],
+        "files": [],
+        "entries": [],
+        "incomplete_count": 0,
+    }
+
+    progress = f"{index}/{total}" if total else str(index)
+    continuing = f", continuing after {skip} rows" if skip else ""
+    logger.info(
+        f"[{progress}] Processing: {format_datetime(window_start)} ({seconds}s window{continuing})"
+    )
+
+    # Fixed mode keeps the original start/start+1s query; adaptive windows are half-open
+    query_end = window_end - timedelta(seconds=1) if ADAPTIVE_WINDOWS else window_end
+
+    xml_response, query, job_id, incomplete_count = run_job(window_start, query_end, skip=skip)
+    result["query"] = query
+    result["incomplete_count"] = incomplete_count
+    if job_id:
+        result["job_ids"].append(job_id)
+
+    if not xml_response:
+        return result
+
+    count, entries = read_page(xml_response, f"job {job_id}")
+    result["count"] = count
+
+    if ADAPTIVE_WINDOWS and count >= MAX_LOGS and seconds > 1:
+        logger.info(
+            f"Window {format_datetime(window_start)} ({seconds}s) hit {MAX_LOGS} logs, splitting"
+        )
+        result["split"] = True
+        return result
+
+    suffix = f"_{seconds}s" if seconds > 1 else ""
+    if skip:
+        # Keep the files saved by the run that stopped at this offset
+        suffix += f"_s{skip}"
+    if not keep_page(xml_response, entries, window_start, suffix, result):
+        return result
+
+    if count < MAX_LOGS:
+        result["success"] = True
+        return result
+
+    if not ADAPTIVE_WINDOWS:
+        result["success"] = True
+        result["revisit"] = True
+        return result
+
+    # One-second window still saturated: page through it with skip
+    page = 0
+    while count >= MAX_LOGS and page < MAX_SKIP_PAGES:
+        page += 1
+        xml_response, _, job_id, incomplete_count = run_job(
+            window_start, query_end, skip=skip + page * MAX_LOGS
+        )
+        result["incomplete_count"] += incomplete_count
+        if job_id:
+            result["job_ids"].append(job_id)
+
+        if not xml_response:
+            return result
+
+        count, entries = read_page(xml_response, f"job {job_id}")
+        if not keep_page(xml_response, entries, window_start, f"{suffix}_p{page}", result):
+            return result
+        result["count"] += count
+
+    result["success"] = True
+    result["revisit"] = count >= MAX_LOGS
+    return result
+
+
+class RunManifest:
+    """
+    Append-only JSON-lines record of every finished window.
+
+    Each line holds the window bounds, log type, status (done, truncated, failed or
+    split), job IDs, skip offset, entry count and saved files. Windows whose latest
+    record is "done" for the current LOG_TYPE count as covered, and reruns skip over
+    them. "truncated" windows were still saturated after paging, so rows past the
+    limit are missing. Reruns continue them from skip + count, never re-reading rows
+    an earlier run already saved.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.starts = []
+        self.ends = []
+        self.continuations = []
+
+    def load(self):
+        """
+        Read existing records and build the sorted list of covered intervals.
+
+        Returns:
+            int: Number of seconds already covered
+        """
+        latest = {}
+
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line_number, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash mid-write can leave a truncated last line
+                        logger.warning(
+                            f"Ignoring malformed manifest line {line_number} in {self.path}"
+                        )
+                        continue
+                    if record.get("log_type") != LOG_TYPE:
+                        continue
+                    latest[(record["start"], record["end"])] = record
+
+        # Windows with rows already saved resume at their offset, never from the top
+        self.continuations = []
+        for (start, end), record in latest.items():
+            offset = record.get("skip", 0)
+            if record["status"] == "truncated":
+                offset += record.get("count", 0)
+            if record["status"] in ("truncated", "failed") and offset:
+                self.continuations.append((parse_datetime(start), parse_datetime(end), offset))
+        self.continuations.sort()
+
+        continued = {(start, end) for start, end, _ in self.continuations}
+        intervals = sorted(
+            (parse_datetime(start), parse_datetime(end))
+            for (start, end), record in latest.items()
+            if record["status"] == "done"
+        )
+        intervals = sorted(intervals + list(continued))
+
+        # Merge overlapping and adjacent intervals
+        merged = []
+        for start, end in intervals:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+        return int(
+            sum((end - start).total_seconds() for start, end in zip(self.starts, self.ends))
+        )
+
+    def covered_until(self, dt):
+        """
+        Return the end of the covered interval containing dt, or None.
+
+        Args:
+            dt: datetime object to look up
+        """
+        index = bisect.bisect_right(self.starts, dt) - 1
+        if index >= 0 and dt < self.ends[index]:
+            return self.ends[index]
+        return None
+
+    def next_covered_start(self, dt):
+        """
+        Return the start of the first covered interval after dt, or None.
+
+        Args:
+            dt: datetime object to look up
+        """
+        index = bisect.bisect_right(self.starts, dt)
+        if index < len(self.starts):
+            return self.starts[index]
+        return None
+
+    def record(self, result, window_end):
+        """
+        Append a window outcome to the manifest.
+
+        Args:
+            result: Outcome dict returned by process_window
+            window_end: datetime object for the window end
+        """
+        if result["split"]:
+            status = "split"
+        elif result["success"]:
+            status = "truncated" if result["revisit"] else "done"
+        else:
+            status = "failed"
+
+        record = {
+            "start": format_datetime(result["timestamp"]),
+            "end": format_datetime(window_end),
+            "log_type": LOG_TYPE,
+            "status": status,
+            "job_ids": result["job_ids"],
+            "skip": result.get("skip", 0),
+            "count": result["count"],
+            "files": result["files"],
+            "output": result.get("output"),
+            "recorded_at": format_datetime(datetime.now()),
+        }
+
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        except IOError as e:
+            logger.error(f"Failed to write to {self.path}: {e}")
+
+
+class WindowPlanner:
+    """
+    Hand out query windows for the time range.
+
+    In fixed mode every window is one second long. In adaptive mode the window size
+    starts at INITIAL_WINDOW_SECONDS, doubles after sparse windows (up to
+    MAX_WINDOW_SECONDS) and halves after saturated ones, whose halves are queued
+    ahead of the rest of the range. Intervals already covered by the manifest are
+    never handed out; truncated windows it lists are handed out first, with the skip
+    offset to continue from.
+    """
+
+    def __init__(self, start_dt, end_dt, adaptive=False, manifest=None):
+        self.cursor = start_dt
+        self.end_dt = end_dt
+        self.adaptive = adaptive
+        self.manifest = manifest
+        self.window_seconds = max(1, INITIAL_WINDOW_SECONDS) if adaptive else 1
+        self.pending = deque(manifest.continuations if manifest is not None else ())
+
+    def next_window(self):
+        """
+        Return the next window to query.
+
+        Returns:
+            tuple: (window_start, window_end, skip), or None when done
+        """
+        if self.pending:
+            return self.pending.popleft()
+
+        window_end = self.end_dt
+
+        if self.manifest is not None:
+            covered_end = self.manifest.covered_until(self.cursor)
+            if covered_end is not None:
+                self.cursor = covered_end
+            next_covered = self.manifest.next_covered_start(self.cursor)
+            if next_covered is not None:
+                window_end = min(window_end, next_covered)
+
+        if self.cursor >= self.end_dt:
+            return None
+
+        window_end = min(
+            self.cursor + timedelta(seconds=self.window_seconds), window_end
+        )
+        window = (self.cursor, window_end, 0)
+        self.cursor = window_end
+        return window
+
+    def record(self, result):
+        """
+        Adapt the window size to a completed window and split it if it saturated.
+
+        Args:
+            result: Outcome dict returned by process_window
+        """
+        if not self.adaptive:
+            return
+
+        seconds = result["seconds"]
+
+        if result["split"]:
+            window_start = result["timestamp"]
+            midpoint = window_start + timedelta(seconds=seconds // 2)
+            window_end = window_start + timedelta(seconds=seconds)
+            self.pending.appendleft((midpoint, window_end, 0))
+            self.pending.appendleft((window_start, midpoint, 0))
+            self.window_seconds = max(1, min(self.window_seconds, seconds // 2))
+        elif result["success"] and result["count"] < MAX_LOGS * SPARSE_FRACTION:
+            self.window_seconds = min(
+                max(1, MAX_WINDOW_SECONDS), max(self.window_seconds, seconds) * 2
+            )
+
+
 # ============================================================================
 # MAIN PROCESSING
 # ============================================================================
 
 
+def unique_output_path(base, extension):
+    """
+    Return base + extension, adding a counter if that file already exists.
+
+    A resumed run can start within the same second (and even reuse the PID) of
+    the run it resumes; its rows must never overwrite that run's file.
+    """
+    path = f"{base}{extension}"
+    counter = 1
+    while os.path.exists(path):
+        path = f"{base}_{counter}{extension}"
+        counter += 1
+    return path
+
+
 def main():
     """Main processing loop."""
     logger.info("=" * 80)
@@ -296,6 +1155,20 @@ def main():
         logger.error("Please configure your API key in the .env file")
         sys.exit(1)
 
+    if DIRECT_OUTPUT and DIRECT_OUTPUT not in converter.OUTPUT_SINKS:
+        logger.error(
+            f"DIRECT_OUTPUT must be one of: {', '.join(sorted(converter.OUTPUT_SINKS))}"
+        )
+        sys.exit(1)
+
+    if ASYNC_CLIENT and aiohttp is None:
+        logger.error("ASYNC_CLIENT requires aiohttp: pip install aiohttp")
+        sys.exit(1)
+
+    if DIRECT_OUTPUT == "parquet" and converter.pa is None:
+        logger.error("Parquet output requires pyarrow: pip install pyarrow")
+        sys.exit(1)
+
     # Setup
     setup_output_directory()
 
@@ -310,57 +1183,141 @@ def main():
     logger.info(f"Time range: {START_TIME} to {END_TIME}")
     logger.info(f"Log type: {LOG_TYPE}")
     logger.info(f"Max logs per query: {MAX_LOGS}")
+    logger.info(f"Adaptive windows: {'enabled' if ADAPTIVE_WINDOWS else 'disabled'}")
+    logger.info(f"Direct output: {DIRECT_OUTPUT or 'disabled'}")
     logger.info(f"Debug mode: {'enabled' if DEBUG else 'disabled'}")
     logger.info("=" * 80)
 
     # Calculate total iterations
     total_seconds = int((end_dt - start_dt).total_seconds())
-    logger.info(f"Total queries to process: {total_seconds}")
+    if ADAPTIVE_WINDOWS:
+        logger.info(f"Total seconds to cover: {total_seconds}")
+    else:
+        logger.info(f"Total queries to process: {total_seconds}")
+
+    concurrency = get_concurrency()
+    logger.info(f"Concurrent jobs: {concurrency}")
+    client_name = "aiohttp (async)" if ASYNC_CLIENT else "requests"
+    logger.info(f"HTTP client: {client_name}, pool size {HTTP_POOL_SIZE}")
+
+    async_client = AsyncLogClient() if ASYNC_CLIENT else None
+    run_job = async_client.run_log_job if async_client else run_log_job
 
     # Counters
     successful = 0
     failed = 0
     revisit_count = 0
+    split_count = 0
+    total_logs = 0
     total_incomplete_polls = 0  # Track total incomplete progress events
 
-    # Iterate second by second
-    current_dt = start_dt
-
-    while current_dt < end_dt:
-        next_dt = current_dt + timedelta(seconds=1)
+    manifest = RunManifest(os.path.join(OUTPUT_DIR, MANIFEST_FILE))
+    skipped_seconds = 0
+    if RESUME:
+        skipped_seconds = manifest.load()
+        if skipped_seconds:
+            logger.info(
+                f"Resuming: {skipped_seconds} second(s) already covered in {MANIFEST_FILE}"
+            )
+        if manifest.continuations:
+            logger.info(
+                f"Resuming: continuing {len(manifest.continuations)} truncated window(s) "
+                "after the rows already saved"
+            )
 
-        logger.info(
-            f"[{successful + failed + 1}/{total_seconds}] Processing: {format_datetime(current_dt)}"
+    planner = WindowPlanner(start_dt, end_dt, adaptive=ADAPTIVE_WINDOWS, manifest=manifest)
+    total_windows = None if ADAPTIVE_WINDOWS or skipped_seconds else total_seconds
+    submitted = 0
+    in_flight = set()
+    window_ends = {}
+
+    # One output file per run, so resumed runs never overwrite earlier rows
+    sink = None
+    if DIRECT_OUTPUT:
+        converter.setup_output_directory()
+        sink_class = converter.OUTPUT_SINKS[DIRECT_OUTPUT]
+        output_path = unique_output_path(
+            os.path.join(
+                converter.CSV_OUTPUT_DIR,
+                f"logs_{start_dt.strftime('%Y%m%d_%H%M%S')}_{end_dt.strftime('%Y%m%d_%H%M%S')}"
+                f"_run{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}",
+            ),
+            sink_class.extension,
         )
+        sink = sink_class(output_path)
+        logger.info(f"Writing rows to: {output_path}")
 
-        # Submit query
-        job_id, query = submit_log_query(current_dt, next_dt)
+    # Manifest records for windows whose rows are not yet safely on disk
+    deferred_records = []
 
-        if job_id:
-            # Poll for completion (now returns incomplete_count too)
-            xml_response, incomplete_count = poll_job_status(job_id)
-            total_incomplete_polls += incomplete_count
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            while True:
+                # Top up the pool so at most `concurrency` jobs exist on Panorama at once
+                while len(in_flight) < concurrency:
+                    window = planner.next_window()
+                    if window is None:
+                        break
+                    submitted += 1
+                    future = executor.submit(
+                        process_window, submitted, total_windows, *window, run_job=run_job
+                    )
+                    window_ends[future] = window[1]
+                    in_flight.add(future)
+
+                if not in_flight:
+                    break
+
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    result = future.result()
+                    total_incomplete_polls += result["incomplete_count"]
+                    window_end = window_ends.pop(future)
+                    planner.record(result)
+
+                    if sink is not None and result["success"]:
+                        sink.write(result.pop("entries"))
+                        result["output"] = sink.path
+                        deferred_records.append((result, window_end))
+                        # Only mark windows done once their rows can survive a crash
+                        if sink.durable_writes:
+                            for record in deferred_records:
+                                manifest.record(*record)
+                            deferred_records.clear()
+                    else:
+                        manifest.record(result, window_end)
 
-            if xml_response:
-                # Save the response
-                saved_path = save_xml_response(xml_response, current_dt)
+                    if result["split"]:
+                        split_count += 1
+                        continue
 
-                if saved_path:
-                    successful += 1
+                    if not result["success"]:
+                        failed += 1
+                        continue
 
-                    # Check if we hit the log limit
-                    if check_log_count(xml_response):
-                        append_to_revisit_file(query, current_dt)
+                    successful += 1
+                    total_logs += result["count"]
+                    if result["revisit"]:
+                        # Continuations were listed when the window first saturated
+                        if not result["skip"]:
+                            append_to_revisit_file(result["query"], result["timestamp"])
                         revisit_count += 1
-                else:
-                    failed += 1
-            else:
-                failed += 1
+    finally:
+        if sink is not None:
+            sink.close()
+            for record in deferred_records:
+                manifest.record(*record)
+        if async_client is not None:
+            requests_sent, connections_opened = async_client.stats()
+            async_client.close()
         else:
-            failed += 1
-
-        # Move to next second
-        current_dt = next_dt
+            requests_sent, connections_opened = (
+                sum(counts)
+                for counts in zip(
+                    session_stats(HTTP_SESSION), session_stats(HTTP_SUBMIT_SESSION)
+                )
+            )
 
     # Summary
     logger.info("\n" + "=" * 80)
@@ -369,8 +1326,19 @@ def main():
     logger.info(f"Total queries: {successful + failed}")
     logger.info(f"Successful: {successful}")
     logger.info(f"Failed: {failed}")
-    logger.info(f"Queries requiring manual review: {revisit_count}")
+    logger.info(f"Logs retrieved: {total_logs}")
+    if skipped_seconds:
+        logger.info(f"Seconds skipped from previous runs: {skipped_seconds}")
+    if ADAPTIVE_WINDOWS:
+        logger.info(f"Windows split: {split_count}")
+    logger.info(f"Truncated windows (manual review, continued on resume): {revisit_count}")
     logger.info(f"Total incomplete progress polls: {total_incomplete_polls}")
+    reused = max(0, requests_sent - connections_opened)
+    reuse_rate = reused / requests_sent * 100 if requests_sent else 0
+    logger.info(
+        f"HTTP requests: {requests_sent}, connections opened: {connections_opened}, "
+        f"reused: {reuse_rate:.1f}%"
+    )
 
     if total_incomplete_polls > 0:
         logger.warning("=" * 80)
@@ -380,7 +1348,8 @@ def main():
 
     if revisit_count > 0:
         logger.warning(
-            f"Check {REVISIT_FILE} for queries that hit the {MAX_LOGS} log limit"
+            f"Check {REVISIT_FILE} for queries that hit the {MAX_LOGS} log limit; "
+            "resuming continues them after the rows already saved"
         )
 
     logger.info("=" * 80)
@@ -2,18 +2,35 @@
 """
 Panorama XML to CSV Converter
 Converts XML log files retrieved from Panorama into CSV format.
+Entries are streamed with iterparse and written as they are read, so memory use stays
+flat regardless of file size or file count.
+With --workers N, files are converted in parallel by a process pool; combined output is
+written as per-worker shards and merged in timestamp order.
+With --format parquet (requires pyarrow), output is written as typed, compressed Parquet.
 """
 
+import argparse
 import csv
+import itertools
 import logging
 import os
+import shutil
 import sys
+import tempfile
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 from dotenv import load_dotenv
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = None
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -28,6 +45,16 @@ XML_INPUT_DIR = os.getenv("XML_INPUT_DIR", "./panorama_logs")
 CSV_OUTPUT_DIR = os.getenv("CSV_OUTPUT_DIR", "./panorama_csv")
 CREATE_INDIVIDUAL_CSV = os.getenv("CREATE_INDIVIDUAL_CSV", "true").lower() in ("true", "1", "yes")
 
+# Output format: "csv" or "parquet" (overridden by --format)
+OUTPUT_FORMAT = os.getenv("OUTPUT_FORMAT", "csv").lower()
+PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "zstd")
+PARQUET_ROW_GROUP_SIZE = int(os.getenv("PARQUET_ROW_GROUP_SIZE", "100000"))
+
+# Parallelism configuration (overridden by --workers)
+CONVERTER_WORKERS = int(os.getenv("CONVERTER_WORKERS", "1"))
+# Shards per worker in combined mode; more shards balance uneven file sizes better
+SHARDS_PER_WORKER = int(os.getenv("SHARDS_PER_WORKER", "4"))
+
 # Debug Configuration
 DEBUG = os.getenv("DEBUG", "false").lower() in ("true", "1", "yes")
 
@@ -285,6 +312,110 @@ XML_TO_CSV_MAPPING = {
 }
 
 
+def build_column_index(headers, mapping):
+    """
+    Resolve the XML field feeding each CSV column.
+
+    Args:
+        headers: Ordered CSV column headers
+        mapping: Dictionary of XML field name to CSV header
+
+    Returns:
+        tuple: XML field name per column, None for empty or unmapped columns
+    """
+    csv_to_xml = {}
+    for xml_key, csv_key in mapping.items():
+        # Keep the first XML field mapped to a header, matching the original lookup
+        csv_to_xml.setdefault(csv_key, xml_key)
+
+    return tuple(csv_to_xml.get(header) if header else None for header in headers)
+
+
+# XML field per CSV column, computed once instead of scanning the mapping for every cell
+CSV_COLUMN_FIELDS = build_column_index(CSV_HEADERS, XML_TO_CSV_MAPPING)
+CSV_EMPTY_ROW = ('',) * len(CSV_COLUMN_FIELDS)
+
+# Parquet column types; columns not listed here are stored as plain strings.
+# Empty CSV columns are dropped since Parquet needs unique column names.
+PARQUET_TIMESTAMP_FORMAT = '%Y/%m/%d %H:%M:%S'
+
+PARQUET_TIMESTAMP_COLUMNS = {
+    'Receive Time',
+    'Generate Time',
+    'Time Logged',
+    'Start Time',
+    'Parent Session Start Time',
+}
+
+PARQUET_INTEGER_COLUMNS = {
+    'Config Version',
+    'Session ID',
+    'Repeat Count',
+    'Source Port',
+    'Destination Port',
+    'NAT Source Port',
+    'NAT Destination Port',
+    'Bytes',
+    'Bytes Sent',
+    'Bytes Received',
+    'Packets',
+    'Elapsed Time (sec)',
+    'Sequence Number',
+    'Packets Sent',
+    'Packets Received',
+    'DG Hierarchy Level 1',
+    'DG Hierarchy Level 2',
+    'DG Hierarchy Level 3',
+    'DG Hierarchy Level 4',
+    'Parent Session ID',
+    'SCTP Association ID',
+    'SCTP Chunks',
+    'SCTP Chunks Sent',
+    'SCTP Chunks Received',
+    'link_change_count',
+    'link_switches',
+    'Risk of app',
+}
+
+PARQUET_CATEGORY_COLUMNS = {
+    'Domain',
+    'Serial #',
+    'Type',
+    'Threat/Content Type',
+    'Rule',
+    'Application',
+    'Virtual System',
+    'Source Zone',
+    'Destination Zone',
+    'Inbound Interface',
+    'Outbound Interface',
+    'Log Action',
+    'IP Protocol',
+    'Action',
+    'Category',
+    'Source Country',
+    'Destination Country',
+    'Session End Reason',
+    'Virtual System Name',
+    'Device Name',
+    'Action Source',
+    'Tunnel',
+    'Subcategory of app',
+    'Category of app',
+    'Technology of app',
+    'Container of app',
+    'Tunneled app',
+    'SaaS of app',
+    'Sanctioned State of app',
+    'flow_type',
+}
+
+# (header, xml_field) for every named column, in CSV order
+PARQUET_COLUMNS = tuple(
+    (header, field) for header, field in zip(CSV_HEADERS, CSV_COLUMN_FIELDS) if header
+)
+
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -313,51 +444,75 @@ def get_xml_files(directory):
     return xml_files
 
 
-def parse_xml_log(xml_file):
+def iter_log_entries(xml_source, name=None):
     """
-    Parse XML file and extract log entries.
-    
+    Stream log entries out of a Panorama XML log response.
+
+    Uses incremental parsing and discards each entry once it has been yielded, so only
+    one entry is held in memory at a time.
+
     Args:
-        xml_file: Path to XML file
-        
-    Returns:
-        list: List of dictionaries, each representing a log entry
+        xml_source: Path to XML file, or a binary file-like object
+        name: Display name for log messages (defaults to the file name)
+
+    Yields:
+        dict: One dictionary per log entry, mapping element tag to text
     """
-    try:
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
-        
-        # Find all log entries
-        # Path: response/result/log/logs/entry
-        entries = root.findall('.//result/log/logs/entry')
+    if name is None:
+        name = getattr(xml_source, 'name', 'XML response')
 
-        if not entries:
-            logger.warning(f"No log entries found in {xml_file}")
-            return []
+    # Path: response/result/log/logs/entry
+    entry_path = ['result', 'log', 'logs', 'entry']
+    tags = []
+    elements = []
+    count = 0
 
-        log_entries = []
+    try:
+        for event, element in ET.iterparse(xml_source, events=('start', 'end')):
+            if event == 'start':
+                tags.append(element.tag)
+                elements.append(element)
+                continue
+
+            if element.tag == 'entry' and tags[-4:] == entry_path:
+                # Extract all elements from the entry
+                log_dict = {}
+                for child in element:
+                    log_dict[child.tag] = child.text if child.text else ''
+                count += 1
+                yield log_dict
+
+                # Drop the processed entry so the tree never grows
+                element.clear()
+                elements[-2].remove(element)
+
+            tags.pop()
+            elements.pop()
 
-        for entry in entries:
-            log_dict = {}
+    except ET.ParseError as e:
+        logger.error(f"Failed to parse {name}: {e}")
+        return
 
-            # Extract all elements from the entry
-            for element in entry:
-                # Get the tag name and text content
-                tag = element.tag
-                text = element.text if element.text else ''
-                log_dict[tag] = text
+    if count:
+        logger.info(f"Parsed {count} entries from {name}")
+    else:
+        logger.warning(f"No log entries found in {name}")
 
-            log_entries.append(log_dict)
 
-        logger.info(f"Parsed {len(log_entries)} entries from {xml_file.name}")
-        return log_entries
+def peek_entries(log_entries):
+    """
+    Check whether an entry stream is empty without losing its first entry.
 
-    except ET.ParseError as e:
-        logger.error(f"Failed to parse {xml_file}: {e}")
-        return []
-    except Exception as e:
-        logger.error(f"Unexpected error parsing {xml_file}: {e}")
-        return []
+    Args:
+        log_entries: Iterator of log dictionaries
+
+    Returns:
+        iterator: Equivalent iterator, or None if the stream has no entries
+    """
+    first = next(log_entries, None)
+    if first is None:
+        return None
+    return itertools.chain([first], log_entries)
 
 
 def convert_log_to_csv_row(log_dict):
@@ -370,115 +525,374 @@ def convert_log_to_csv_row(log_dict):
     Returns:
         list: Ordered list of values matching CSV_HEADERS
     """
-    row = []
-    
-    for header in CSV_HEADERS:
-        if header == '':
-            # Empty columns
-            row.append('')
+    # Empty and unmapped columns hold None, which is never a key in log_dict
+    return list(map(log_dict.get, CSV_COLUMN_FIELDS, CSV_EMPTY_ROW))
+
+
+def write_rows(writer, log_entries):
+    """
+    Convert log entries and write them through a CSV writer.
+
+    Args:
+        writer: csv.writer instance
+        log_entries: Iterable of log dictionaries
+
+    Returns:
+        int: Number of rows written
+    """
+    count = 0
+    for log_entry in log_entries:
+        writer.writerow(convert_log_to_csv_row(log_entry))
+        count += 1
+    return count
+
+
+def parse_int(value):
+    """Convert a log field to int, returning None for empty or non-numeric values."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parquet_schema():
+    """
+    Build the Arrow schema for Parquet output.
+
+    Returns:
+        pyarrow.Schema: Typed schema covering PARQUET_COLUMNS
+    """
+    fields = []
+    for header, _ in PARQUET_COLUMNS:
+        if header in PARQUET_TIMESTAMP_COLUMNS:
+            # Parquet has no seconds unit, so store milliseconds to round-trip exactly
+            fields.append(pa.field(header, pa.timestamp('ms')))
+        elif header in PARQUET_INTEGER_COLUMNS:
+            fields.append(pa.field(header, pa.int64()))
+        elif header in PARQUET_CATEGORY_COLUMNS:
+            fields.append(pa.field(header, pa.dictionary(pa.int32(), pa.string())))
         else:
-            # Find the corresponding XML field
-            xml_field = None
-            for xml_key, csv_key in XML_TO_CSV_MAPPING.items():
-                if csv_key == header:
-                    xml_field = xml_key
-                    break
-            
-            if xml_field and xml_field in log_dict:
-                row.append(log_dict[xml_field])
+            fields.append(pa.field(header, pa.string()))
+    return pa.schema(fields)
+
+
+class CsvSink:
+    """Write converted log entries to a CSV file."""
+
+    extension = '.csv'
+    # Rows reach the OS after every write() call
+    durable_writes = True
+
+    def __init__(self, path, header=True):
+        self.path = path
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        if header:
+            self.writer.writerow(CSV_HEADERS)
+
+    def write(self, log_entries):
+        """Write an iterable of log dictionaries and return the number of rows."""
+        count = write_rows(self.writer, log_entries)
+        self.file.flush()
+        return count
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """
+    Write converted log entries to a Parquet file.
+
+    Entries are buffered column by column and flushed as one row group every
+    PARQUET_ROW_GROUP_SIZE rows, so memory is bounded by the row group size.
+    """
+
+    extension = '.parquet'
+    # The file footer is only written on close(), so nothing is readable before then
+    durable_writes = False
+
+    def __init__(self, path, header=True):
+        self.path = path
+        self.schema = parquet_schema()
+        self.writer = pq.ParquetWriter(path, self.schema, compression=PARQUET_COMPRESSION)
+        self.columns = [[] for _ in PARQUET_COLUMNS]
+        self.buffered = 0
+
+    def write(self, log_entries):
+        """Write an iterable of log dictionaries and return the number of rows."""
+        count = 0
+        for log_entry in log_entries:
+            for column, (_, field) in zip(self.columns, PARQUET_COLUMNS):
+                column.append(log_entry.get(field, '') if field else '')
+            count += 1
+            self.buffered += 1
+            if self.buffered >= PARQUET_ROW_GROUP_SIZE:
+                self.flush()
+        return count
+
+    def flush(self):
+        """Convert buffered columns to typed Arrow arrays and write a row group."""
+        if not self.buffered:
+            return
+
+        arrays = []
+        for values, schema_field in zip(self.columns, self.schema):
+            if pa.types.is_timestamp(schema_field.type):
+                arrays.append(
+                    pc.strptime(
+                        pa.array(values, pa.string()),
+                        format=PARQUET_TIMESTAMP_FORMAT,
+                        unit='ms',
+                        error_is_null=True,
+                    )
+                )
+            elif pa.types.is_integer(schema_field.type):
+                arrays.append(pa.array([parse_int(value) for value in values], pa.int64()))
+            elif pa.types.is_dictionary(schema_field.type):
+                arrays.append(
+                    pa.array(values, pa.string()).dictionary_encode().cast(schema_field.type)
+                )
             else:
-                row.append('')
-    
-    return row
+                arrays.append(pa.array(values, pa.string()))
 
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self.columns = [[] for _ in PARQUET_COLUMNS]
+        self.buffered = 0
 
-def write_csv(csv_file, log_entries, mode='w'):
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+OUTPUT_SINKS = {
+    'csv': CsvSink,
+    'parquet': ParquetSink,
+}
+
+
+def convert_xml_file(xml_file, output_format='csv'):
     """
-    Write log entries to CSV file.
-    
+    Convert one XML file into an individual output file with the same base name.
+
     Args:
-        csv_file: Path to output CSV file
-        log_entries: List of log dictionaries
-        mode: File mode ('w' for write, 'a' for append)
+        xml_file: Path to XML file
+        output_format: Key of OUTPUT_SINKS
+
+    Returns:
+        tuple: (output_path, rows_written); output_path is None if nothing was written
     """
-    try:
-        write_header = mode == 'w' or not os.path.exists(csv_file)
-        
-        with open(csv_file, mode, newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            
-            # Write header if needed
-            if write_header:
-                writer.writerow(CSV_HEADERS)
-            
-            # Write data rows
-            for log_entry in log_entries:
-                row = convert_log_to_csv_row(log_entry)
-                writer.writerow(row)
-        
-        return True
+    # Stream XML entries, skipping files with none
+    log_entries = peek_entries(iter_log_entries(xml_file, xml_file.name))
+
+    if not log_entries:
+        return None, 0
+
+    sink_class = OUTPUT_SINKS[output_format]
+    output_path = os.path.join(CSV_OUTPUT_DIR, xml_file.stem + sink_class.extension)
 
+    try:
+        sink = sink_class(output_path)
+        try:
+            written = sink.write(log_entries)
+        finally:
+            sink.close()
     except IOError as e:
-        logger.error(f"Failed to write CSV {csv_file}: {e}")
-        return False
+        logger.error(f"Failed to write {output_path}: {e}")
+        return None, 0
+
+    logger.info(f"Created: {output_path}")
+    return output_path, written
 
 
-def process_xml_to_csv(xml_files, individual=True):
+def write_shard(xml_files, shard_path, output_format='csv'):
     """
-    Process XML files and convert to CSV.
+    Convert a run of XML files into one shard (headerless for CSV).
+
+    Args:
+        xml_files: List of XML file paths, already in timestamp order
+        shard_path: Path of the shard to write
+        output_format: Key of OUTPUT_SINKS
+
+    Returns:
+        int: Number of rows written
+    """
+    total = 0
+    sink = OUTPUT_SINKS[output_format](shard_path, header=False)
+    try:
+        for xml_file in xml_files:
+            total += sink.write(iter_log_entries(xml_file, xml_file.name))
+    finally:
+        sink.close()
+    return total
+
+
+def merge_shards(shard_paths, output_path, output_format='csv'):
+    """
+    Concatenate shards, in order, into the combined output file.
+
+    Args:
+        shard_paths: Shard file paths in timestamp order
+        output_path: Path of the combined output file
+        output_format: Key of OUTPUT_SINKS
+    """
+    if output_format == 'parquet':
+        # Copy row groups one at a time to keep memory bounded
+        with pq.ParquetWriter(output_path, parquet_schema(), compression=PARQUET_COMPRESSION) as writer:
+            for shard_path in shard_paths:
+                shard = pq.ParquetFile(shard_path)
+                for index in range(shard.num_row_groups):
+                    writer.write_table(shard.read_row_group(index))
+        return
+
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerow(CSV_HEADERS)
+        for shard_path in shard_paths:
+            with open(shard_path, 'r', newline='', encoding='utf-8') as shard:
+                shutil.copyfileobj(shard, f)
+
+
+def split_into_shards(xml_files, shard_count):
+    """
+    Split files into contiguous runs so concatenating the shards preserves file order.
+
+    Args:
+        xml_files: Sorted list of XML file paths
+        shard_count: Desired number of shards
+
+    Returns:
+        list: Non-empty lists of XML file paths
+    """
+    shard_count = max(1, min(shard_count, len(xml_files)))
+    size, remainder = divmod(len(xml_files), shard_count)
+
+    shards = []
+    start = 0
+    for index in range(shard_count):
+        end = start + size + (1 if index < remainder else 0)
+        shards.append(xml_files[start:end])
+        start = end
+    return shards
+
+
+def process_xml_to_csv_parallel(xml_files, individual, workers, output_format='csv'):
+    """
+    Convert XML files with a process pool.
+
+    Individual mode converts each file in its own task. Combined mode converts
+    contiguous runs of files into shards and concatenates them in order, so the
+    result matches a serial run.
 
     Args:
         xml_files: List of XML file paths
-        individual: If True, create individual CSVs; if False, create one combined CSV
+        individual: If True, create individual files; if False, create one combined file
+        workers: Number of worker processes
+        output_format: Key of OUTPUT_SINKS
     """
     total_logs = 0
     total_files = 0
+    extension = OUTPUT_SINKS[output_format].extension
 
     if individual:
-        # Individual CSV mode (default)
-        logger.info(f"Creating individual CSV file for each XML file")
+        logger.info(f"Creating individual {output_format.upper()} file for each XML file ({workers} workers)")
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                convert_xml_file, xml_files, itertools.repeat(output_format), chunksize=16
+            )
+            for output_path, written in results:
+                if output_path:
+                    total_logs += written
+                    total_files += 1
 
-        for idx, xml_file in enumerate(xml_files, 1):
-            logger.info(f"[{idx}/{len(xml_files)}] Processing: {xml_file.name}")
+        logger.info(f"Total {output_format.upper()} files created: {total_files}")
+        logger.info(f"Total log entries processed: {total_logs}")
+        return
 
-            # Parse XML
-            log_entries = parse_xml_log(xml_file)
+    combined_path = os.path.join(CSV_OUTPUT_DIR, "combined_logs" + extension)
+    logger.info(f"Creating combined {output_format.upper()}: {combined_path} ({workers} workers)")
 
-            if log_entries:
-                # Create individual CSV with same base name
-                csv_filename = xml_file.stem + '.csv'
-                csv_path = os.path.join(CSV_OUTPUT_DIR, csv_filename)
+    shards = split_into_shards(xml_files, workers * SHARDS_PER_WORKER)
+    shard_dir = tempfile.mkdtemp(prefix='shards_', dir=CSV_OUTPUT_DIR)
+    shard_paths = [
+        os.path.join(shard_dir, f"shard_{index:05d}{extension}") for index in range(len(shards))
+    ]
 
-                if write_csv(csv_path, log_entries):
-                    total_logs += len(log_entries)
-                    total_files += 1
-                    logger.info(f"Created: {csv_path}")
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                write_shard, shards, shard_paths, itertools.repeat(output_format)
+            )
+            for index, written in enumerate(results, 1):
+                total_logs += written
+                logger.info(f"[{index}/{len(shards)}] Shard complete: {written} entries")
 
-        logger.info(f"Total CSV files created: {total_files}")
-        logger.info(f"Total log entries processed: {total_logs}")
+        # Merge shards in file (timestamp) order
+        merge_shards(shard_paths, combined_path, output_format)
 
-    else:
-        # Combined CSV mode
-        combined_csv_path = os.path.join(CSV_OUTPUT_DIR, "combined_logs.csv")
-        logger.info(f"Creating combined CSV: {combined_csv_path}")
+    except IOError as e:
+        logger.error(f"Failed to write {combined_path}: {e}")
+        return
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+    logger.info(f"Combined {output_format.upper()} created: {combined_path}")
+    logger.info(f"Total log entries: {total_logs}")
 
-        # Remove existing file if it exists
-        if os.path.exists(combined_csv_path):
-            os.remove(combined_csv_path)
+
+def process_xml_to_csv(xml_files, individual=True, workers=1, output_format='csv'):
+    """
+    Process XML files and convert to CSV or Parquet.
+
+    Args:
+        xml_files: List of XML file paths
+        individual: If True, create individual files; if False, create one combined file
+        workers: Number of worker processes; 1 converts in this process
+        output_format: Key of OUTPUT_SINKS
+    """
+    if workers > 1 and len(xml_files) > 1:
+        process_xml_to_csv_parallel(xml_files, individual, workers, output_format)
+        return
+
+    total_logs = 0
+    total_files = 0
+
+    if individual:
+        # Individual file mode (default)
+        logger.info(f"Creating individual {output_format.upper()} file for each XML file")
 
         for idx, xml_file in enumerate(xml_files, 1):
             logger.info(f"[{idx}/{len(xml_files)}] Processing: {xml_file.name}")
 
-            # Parse XML
-            log_entries = parse_xml_log(xml_file)
+            output_path, written = convert_xml_file(xml_file, output_format)
+            if output_path:
+                total_logs += written
+                total_files += 1
 
-            if log_entries:
-                # Append to combined CSV
-                mode = 'w' if idx == 1 else 'a'
-                if write_csv(combined_csv_path, log_entries, mode=mode):
-                    total_logs += len(log_entries)
+        logger.info(f"Total {output_format.upper()} files created: {total_files}")
+        logger.info(f"Total log entries processed: {total_logs}")
 
-        logger.info(f"Combined CSV created: {combined_csv_path}")
+    else:
+        # Combined file mode
+        sink_class = OUTPUT_SINKS[output_format]
+        combined_path = os.path.join(CSV_OUTPUT_DIR, "combined_logs" + sink_class.extension)
+        logger.info(f"Creating combined {output_format.upper()}: {combined_path}")
+
+        try:
+            # Keep a single sink open for the whole run instead of reopening per file
+            sink = sink_class(combined_path)
+            try:
+                for idx, xml_file in enumerate(xml_files, 1):
+                    logger.info(f"[{idx}/{len(xml_files)}] Processing: {xml_file.name}")
+                    total_logs += sink.write(iter_log_entries(xml_file, xml_file.name))
+            finally:
+                sink.close()
+
+        except IOError as e:
+            logger.error(f"Failed to write {combined_path}: {e}")
+            return
+
+        logger.info(f"Combined {output_format.upper()} created: {combined_path}")
         logger.info(f"Total log entries: {total_logs}")
 
 
@@ -486,8 +900,30 @@ def process_xml_to_csv(xml_files, individual=True):
 # MAIN PROCESSING
 # ============================================================================
 
+def parse_args():
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Convert Panorama XML log files to CSV")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=CONVERTER_WORKERS,
+        help=f"Number of worker processes (default: CONVERTER_WORKERS or {CONVERTER_WORKERS})",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(OUTPUT_SINKS),
+        default=OUTPUT_FORMAT,
+        help=f"Output format (default: OUTPUT_FORMAT or {OUTPUT_FORMAT})",
+    )
+    return parser.parse_args()
+
+
 def main():
     """Main processing function."""
+    args = parse_args()
+    workers = max(1, args.workers)
+    output_format = args.format
+
     logger.info("=" * 80)
     logger.info("Panorama XML to CSV Converter")
     logger.info("=" * 80)
@@ -495,6 +931,10 @@ def main():
     # Setup
     setup_output_directory()
 
+    if output_format == 'parquet' and pa is None:
+        logger.error("Parquet output requires pyarrow: pip install pyarrow")
+        sys.exit(1)
+
     # Check if input directory exists
     if not os.path.exists(XML_INPUT_DIR):
         logger.error(f"XML input directory not found: {XML_INPUT_DIR}")
@@ -509,11 +949,15 @@ def main():
 
     logger.info(f"Found {len(xml_files)} XML files to process")
     logger.info(f"Debug mode: {'enabled' if DEBUG else 'disabled'}")
-    logger.info(f"Mode: {'Individual CSV files' if CREATE_INDIVIDUAL_CSV else 'Combined CSV file'}")
+    label = output_format.upper()
+    logger.info(f"Mode: {f'Individual {label} files' if CREATE_INDIVIDUAL_CSV else f'Combined {label} file'}")
+    logger.info(f"Workers: {workers}")
     logger.info("=" * 80)
 
     # Process files
-    process_xml_to_csv(xml_files, individual=CREATE_INDIVIDUAL_CSV)
+    process_xml_to_csv(
+        xml_files, individual=CREATE_INDIVIDUAL_CSV, workers=workers, output_format=output_format
+    )
 
     logger.info("\n" + "=" * 80)
     logger.info("CONVERSION COMPLETE")
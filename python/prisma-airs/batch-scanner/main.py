@@ -15,12 +15,27 @@ from __future__ import annotations
 import argparse
 import asyncio
 import csv
+import hashlib
 import json
 import logging
 import os
 import pathlib
+import random
+import sqlite3
 import sys
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
 import dotenv
 import yaml  # PyYAML
@@ -34,15 +49,21 @@ from aisecurity.generated_openapi_client import (
     ScanRequestContentsInner,
     ScanIdResult,
 )
+from aisecurity.generated_openapi_client.models.scan_response import ScanResponse
+from aisecurity.constants.base import MAX_NUMBER_OF_SCAN_IDS
+from aisecurity.exceptions import AISecSDKException
 from aisecurity.scan.asyncio.scanner import Scanner
 
 # --------------------------------------------------------------------------- #
 #                               Constants                                     #
 # --------------------------------------------------------------------------- #
 
-# Polling configuration
+# Polling configuration: interval grows by POLL_BACKOFF_FACTOR after rounds with
+# no new results, and harvesting stops after DEFAULT_POLL_ATTEMPTS such rounds
 DEFAULT_POLL_ATTEMPTS = 20
 POLL_INTERVAL_SECONDS = 2
+POLL_BACKOFF_FACTOR = 1.5
+POLL_MAX_INTERVAL_SECONDS = 30
 
 # Display configuration
 TEXT_TRUNCATE_LENGTH = 80
@@ -53,6 +74,21 @@ SUBDIV = "-" * DISPLAY_WIDTH
 # Batch configuration
 DEFAULT_BATCH_SIZE = 1000
 
+# Submission concurrency and rate-limit (HTTP 429) backoff
+DEFAULT_CONCURRENCY = 10
+RATE_LIMIT_MAX_RETRIES = 8
+RATE_LIMIT_BASE_DELAY_SECONDS = 1.0
+RATE_LIMIT_MAX_DELAY_SECONDS = 60.0
+
+# Characters read per chunk when streaming a JSON array input file
+JSON_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Local scan result cache: completed results are reused for identical
+# prompt/response/profile rows until they are older than the TTL
+DEFAULT_CACHE_FILE = ".airs_scan_cache.db"
+DEFAULT_CACHE_TTL_HOURS = 24.0
+CACHE_COMMIT_INTERVAL = 500
+
 # Violation type mappings
 PROMPT_VIOLATION_FIELDS = [
     "agent",
@@ -122,32 +158,87 @@ def batched(iterable, n: int):
         yield batch
 
 
-def load_input_file(path: pathlib.Path) -> List[Dict[str, Optional[str]]]:
+def iter_input_file(path: pathlib.Path) -> Iterator[Dict[str, Optional[str]]]:
     """
-    Parse CSV, JSON, or YAML into a list of {'prompt': ..., 'response': ...}.
+    Stream CSV, JSON, JSON Lines, or YAML rows as {'prompt': ..., 'response': ...}.
+
+    CSV, JSON Lines and top-level JSON arrays are read incrementally, so input
+    size does not bound memory. YAML and JSON objects are loaded whole.
     """
     log.info("Loading input file: %s", path)
     ext = path.suffix.lower()
     if ext == ".csv":
         with path.open(newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            rows = [
-                {"prompt": r.get("prompt"), "response": r.get("response")}
-                for r in reader
-            ]
+            for r in csv.DictReader(f):
+                yield {"prompt": r.get("prompt"), "response": r.get("response")}
     elif ext in (".yml", ".yaml"):
         with path.open(encoding="utf-8") as f:
             data = yaml.safe_load(f)
-        rows = _normalise_yaml_json(data)
+        yield from _normalise_yaml_json(data)
+    elif ext == ".jsonl":
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield _normalise_item(json.loads(line))
     elif ext == ".json":
         with path.open(encoding="utf-8") as f:
-            data = json.load(f)
-        rows = _normalise_yaml_json(data)
+            yield from (_normalise_item(item) for item in _iter_json_array(f))
     else:
         raise ValueError(f"Unsupported file type: {ext}")
 
-    log.debug("Loaded %d row(s) from %s", len(rows), path)
-    return rows
+
+def _iter_json_array(f) -> Iterator[Any]:
+    """
+    Yield the items of a top-level JSON array while reading the file in chunks.
+
+    A top-level JSON object is loaded whole and its values are yielded instead.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(JSON_STREAM_CHUNK_SIZE).lstrip()
+    if not buffer.startswith("["):
+        data = json.loads(buffer + f.read())
+        yield from (data.values() if isinstance(data, dict) else [data])
+        return
+
+    pos = 1
+    eof = False
+    while True:
+        # Skip whitespace and separators between items
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            if pos >= len(buffer):
+                raise ValueError("need more data")
+            item, pos = decoder.raw_decode(buffer, pos)
+        except ValueError:
+            if eof:
+                raise ValueError("Truncated or invalid JSON array in input file")
+            chunk = f.read(JSON_STREAM_CHUNK_SIZE)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        yield item
+
+
+def _normalise_item(item: Any) -> Dict[str, Optional[str]]:
+    """
+    Normalise one YAML/JSON item to dict(prompt, response).
+    """
+    if isinstance(item, (list, tuple)):
+        prompt, *rest = item
+        return {"prompt": prompt, "response": rest[0] if rest else None}
+    if isinstance(item, dict):
+        return {
+            "prompt": item.get("prompt") or item.get("input") or item.get("question"),
+            "response": item.get("response")
+            or item.get("output")
+            or item.get("answer"),
+        }
+    # bare string
+    return {"prompt": str(item), "response": None}
 
 
 def _normalise_yaml_json(data: Any) -> List[Dict[str, Optional[str]]]:
@@ -156,80 +247,440 @@ def _normalise_yaml_json(data: Any) -> List[Dict[str, Optional[str]]]:
     """
     if isinstance(data, dict):
         data = list(data.values())
-    normalised: List[Dict[str, Optional[str]]] = []
-    for item in data:
-        if isinstance(item, (list, tuple)):
-            prompt, *rest = item
-            normalised.append({"prompt": prompt, "response": rest[0] if rest else None})
-        elif isinstance(item, dict):
-            normalised.append(
-                {
-                    "prompt": item.get("prompt")
-                    or item.get("input")
-                    or item.get("question"),
-                    "response": item.get("response")
-                    or item.get("output")
-                    or item.get("answer"),
-                }
-            )
-        else:  # bare string
-            normalised.append({"prompt": str(item), "response": None})
-    return normalised
+    return [_normalise_item(item) for item in data]
 
 
-def build_scan_objects(
-    scan_contents: List[Dict[str, Optional[str]]],
+def build_scan_object(
+    req_id: int,
+    sc: Dict[str, Optional[str]],
     ai_profile: AiProfile,
-) -> Tuple[List[AsyncScanObject], Dict[int, Dict[str, Optional[str]]]]:
-    """Build AsyncScanObject list and content mapping."""
-    async_objects: List[AsyncScanObject] = []
-    req_id = 0
-    content_map = {}
-    for sc in scan_contents:
-        req_id += 1
-        content_map[req_id] = sc
-        async_objects.append(
-            AsyncScanObject(
+) -> AsyncScanObject:
+    """Build one AsyncScanObject for a prompt/response row."""
+    return AsyncScanObject(
+        req_id=req_id,
+        scan_req=ScanRequest(
+            ai_profile=ai_profile,
+            contents=[
+                ScanRequestContentsInner(
+                    prompt=sc["prompt"],
+                    response=sc["response"],
+                )
+            ],
+        ),
+    )
+
+
+def profile_cache_key(ai_profile: AiProfile) -> str:
+    """Identify an AI profile for cache keys (name and ID are kept distinct)."""
+    if ai_profile.profile_name:
+        return f"name:{ai_profile.profile_name}"
+    return f"id:{ai_profile.profile_id}"
+
+
+def content_hash(profile_key: str, sc: Dict[str, Optional[str]]) -> str:
+    """Hash a prompt/response row together with the AI profile it is scanned with."""
+    payload = json.dumps(
+        [profile_key, sc.get("prompt"), sc.get("response")], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ScanCache:
+    """
+    Content-hash deduplication and result cache for scan rows.
+
+    Rows are keyed by a SHA-256 of the AI profile, prompt and response. Within a
+    run only the first row with a given key is submitted; later copies are
+    answered from its result once harvested. Across runs, completed results are
+    kept in a SQLite file and reused until they are older than the TTL. With no
+    path only the in-run deduplication is done.
+
+    The in-run index lives in a temporary SQLite table rather than in memory, so
+    memory stays flat however many unique rows the input has.
+    """
+
+    def __init__(
+        self,
+        path: Optional[pathlib.Path],
+        ttl_hours: float,
+        profile_key: str,
+        keep_results: bool = True,
+    ) -> None:
+        self.ttl_seconds = ttl_hours * 3600
+        self.profile_key = profile_key
+        self.keep_results = keep_results
+        self.persist = path is not None
+        # An unnamed database is a private temporary file, deleted on close
+        self.db: Optional[sqlite3.Connection] = sqlite3.connect(
+            path if path is not None else ""
+        )
+        self.db.execute("PRAGMA temp_store = FILE")
+        self.db.execute(
+            "CREATE TEMP TABLE pending (key TEXT PRIMARY KEY, req_id INTEGER NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX temp.pending_req_id ON pending (req_id)")
+        if self.persist:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS scan_results ("
+                "key TEXT PRIMARY KEY, scan_id TEXT, result TEXT NOT NULL, "
+                "stored_at REAL NOT NULL)"
+            )
+            self.db.execute(
+                "DELETE FROM scan_results WHERE stored_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+            self.db.commit()
+
+        self._duplicates: Dict[int, List[int]] = {}  # req_id -> copies waiting
+        self._cached: List[Tuple[int, str, str]] = []  # (req_id, scan_id, result)
+        self._unsaved = 0
+
+        self.rows = 0
+        self.hits = 0
+        self.duplicates = 0
+
+    def claim(self, req_id: int, sc: Dict[str, Optional[str]]) -> bool:
+        """Return True if the row must be submitted, False if it is answered already."""
+        self.rows += 1
+        key = content_hash(self.profile_key, sc)
+
+        row = self.db.execute(
+            "SELECT req_id FROM pending WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None:
+            self.duplicates += 1
+            if self.keep_results:
+                self._duplicates.setdefault(row[0], []).append(req_id)
+            return False
+
+        if self.persist:
+            row = self.db.execute(
+                "SELECT scan_id, result FROM scan_results "
+                "WHERE key = ? AND stored_at >= ?",
+                (key, time.time() - self.ttl_seconds),
+            ).fetchone()
+            if row is not None:
+                self.hits += 1
+                if self.keep_results:
+                    self._cached.append((req_id, row[0], row[1]))
+                return False
+
+        self.db.execute("INSERT INTO pending VALUES (?, ?)", (key, req_id))
+        self._saved()
+        return True
+
+    def cached_results(self) -> Iterator[ScanIdResult]:
+        """Yield the results served from the cache file, rebuilt as ScanIdResults."""
+        for req_id, scan_id, result in self._cached:
+            yield ScanIdResult(
                 req_id=req_id,
-                scan_req=ScanRequest(
-                    ai_profile=ai_profile,
-                    contents=[
-                        ScanRequestContentsInner(
-                            prompt=sc["prompt"],
-                            response=sc["response"],
-                        )
-                    ],
+                status="complete",
+                scan_id=scan_id,
+                result=ScanResponse.model_validate_json(result),
+            )
+        self._cached = []
+
+    def resolve(self, result: ScanIdResult) -> List[ScanIdResult]:
+        """
+        Store a harvested result and return copies for its in-run duplicates.
+        """
+        row = None
+        if self.persist:
+            row = self.db.execute(
+                "SELECT key FROM pending WHERE req_id = ?", (result.req_id,)
+            ).fetchone()
+        if row is not None:
+            self.db.execute(
+                "INSERT OR REPLACE INTO scan_results VALUES (?, ?, ?, ?)",
+                (
+                    row[0],
+                    result.scan_id,
+                    result.result.model_dump_json(by_alias=True, exclude_none=True),
+                    time.time(),
                 ),
             )
+            self._saved()
+        return [
+            result.model_copy(update={"req_id": req_id})
+            for req_id in self._duplicates.pop(result.req_id, [])
+        ]
+
+    def _saved(self) -> None:
+        """Commit every CACHE_COMMIT_INTERVAL writes."""
+        self._unsaved += 1
+        if self._unsaved >= CACHE_COMMIT_INTERVAL:
+            self.db.commit()
+            self._unsaved = 0
+
+    def close(self) -> None:
+        """Commit outstanding results and close the cache file."""
+        if self.db is not None:
+            self.db.commit()
+            self.db.close()
+            self.db = None
+
+    def log_stats(self) -> None:
+        """Log how many rows were answered without being submitted."""
+        saved = self.hits + self.duplicates
+        rate = 100.0 * saved / self.rows if self.rows else 0.0
+        log.info(
+            "Scan cache: %d row(s), %d cache hit(s), %d in-run duplicate(s), "
+            "%d submitted – %.1f%% not sent",
+            self.rows,
+            self.hits,
+            self.duplicates,
+            self.rows - saved,
+            rate,
         )
-    log.debug("Constructed %d AsyncScanObject(s)", len(async_objects))
-    return async_objects, content_map
 
 
-async def run_batches(
-    async_objects: List[AsyncScanObject],
+def end_with_newline(path: pathlib.Path) -> None:
+    """Terminate a partly written last line so appended JSON lines stay readable."""
+    with path.open("rb+") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+
+class ScanJournal:
+    """
+    Write-ahead journal of submitted batches, stored as JSON Lines.
+
+    The first line describes the run (input file and AI profile). A "batch"
+    line with the batch's req_ids, scan_id and report_id is appended and synced
+    to disk as soon as each submission succeeds, and a "harvested" line once all
+    results for a scan ID have been retrieved. A resumed run reads the journal
+    back to find the rows already sent and the scan IDs still to harvest.
+    Rows are matched by position, so resuming against a changed input file is
+    refused unless forced.
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path,
+        header: Dict[str, Any],
+        resume: bool = False,
+        force: bool = False,
+    ) -> None:
+        self.path = path
+        self.sent: Set[int] = set()
+        self.scan_ids: List[str] = []
+        self.harvested: Set[str] = set()
+
+        if resume and path.exists():
+            self._load(header, force)
+            log.info(
+                "Resuming from journal %s: %d row(s) in %d batch(es) already "
+                "submitted, %d scan ID(s) already harvested",
+                path,
+                len(self.sent),
+                len(self.scan_ids),
+                len(self.harvested),
+            )
+            self._fp = path.open("a", encoding="utf-8")
+        else:
+            if resume:
+                log.warning("No journal at %s – starting a new run", path)
+            elif path.exists():
+                log.warning(
+                    "Replacing existing journal %s (use --resume to continue it)", path
+                )
+            self._fp = path.open("w", encoding="utf-8")
+            self._write({"type": "run", **header})
+
+    def _load(self, header: Dict[str, Any], force: bool = False) -> None:
+        """Read an existing journal, checking it matches this input and profile."""
+        with self.path.open(encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a partly written last line behind
+                    log.warning("Skipping unreadable journal line %d", line_no)
+                    continue
+                kind = record.get("type")
+                if kind == "run":
+                    if record.get("profile") != header["profile"]:
+                        raise ValueError(
+                            f"Journal {self.path} was written for AI profile "
+                            f"{record.get('profile')}, not {header['profile']}"
+                        )
+                    if (record.get("file"), record.get("size")) != (
+                        header["file"],
+                        header["size"],
+                    ):
+                        message = (
+                            f"Input file differs from the journalled run "
+                            f"({record.get('file')}, {record.get('size')} bytes); "
+                            "rows are matched by position"
+                        )
+                        if not force:
+                            raise ValueError(
+                                f"{message}. Use --force-resume to resume anyway."
+                            )
+                        log.warning(message)
+                elif kind == "batch":
+                    self.sent.update(record["req_ids"])
+                    self.scan_ids.append(record["scan_id"])
+                elif kind == "harvested":
+                    self.harvested.add(record["scan_id"])
+
+        end_with_newline(self.path)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._fp.write(json.dumps(record, default=str) + "\n")
+        self._fp.flush()
+        os.fsync(self._fp.fileno())
+
+    def record_batch(self, batch: List[AsyncScanObject], response: Any) -> None:
+        """Journal a successfully submitted batch."""
+        self.scan_ids.append(response.scan_id)
+        self._write(
+            {
+                "type": "batch",
+                "req_ids": [obj.req_id for obj in batch],
+                "scan_id": response.scan_id,
+                "report_id": response.report_id,
+            }
+        )
+
+    def record_harvested(self, scan_id: str) -> None:
+        """Journal a scan ID whose results have all been retrieved."""
+        self.harvested.add(scan_id)
+        self._write({"type": "harvested", "scan_id": scan_id})
+
+    def pending_scan_ids(self) -> List[str]:
+        """Return the journalled scan IDs that have not been harvested yet."""
+        return [sid for sid in self.scan_ids if sid not in self.harvested]
+
+    def close(self) -> None:
+        self._fp.close()
+
+
+def read_result_req_ids(path: pathlib.Path) -> Set[int]:
+    """Return the req_ids already present in a JSON Lines results file."""
+    req_ids: Set[int] = set()
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                req_ids.add(json.loads(line)["req_id"])
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+    return req_ids
+
+
+def iter_scan_batches(
+    rows: Iterable[Dict[str, Optional[str]]],
+    ai_profile: AiProfile,
     batch_size: int,
+    content_map: Optional[Dict[int, Dict[str, Optional[str]]]] = None,
+    cache: Optional[ScanCache] = None,
+    skip_req_ids: AbstractSet[int] = frozenset(),
+) -> Iterator[List[AsyncScanObject]]:
+    """
+    Lazily turn rows into batches of AsyncScanObject.
+
+    Objects for a batch are only built when the submitter asks for it. Rows are
+    recorded in content_map by req_id when one is given (needed only for result
+    display). Rows the cache already answers, and rows in skip_req_ids (already
+    submitted by a previous run), are left out of the batches.
+    """
+    batch: List[AsyncScanObject] = []
+    for req_id, sc in enumerate(rows, 1):
+        if content_map is not None:
+            content_map[req_id] = sc
+        if cache is not None and not cache.claim(req_id, sc):
+            continue
+        if req_id in skip_req_ids:
+            continue
+        batch.append(build_scan_object(req_id, sc, ai_profile))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """Return True when an SDK error was caused by an HTTP 429 response."""
+    cause = exc.__cause__ or exc.__context__
+    if getattr(cause, "status", None) == 429:
+        return True
+    return "(429)" in str(exc) or "Too Many Requests" in str(exc)
+
+
+async def run_batches(
+    batches: Iterable[List[AsyncScanObject]],
+    concurrency: int = DEFAULT_CONCURRENCY,
     endpoint_override: Optional[str] = None,
+    on_submitted: Optional[Callable[[List[AsyncScanObject], Any], None]] = None,
 ) -> List[Any]:
     """
-    Submit batches concurrently and return list of AsyncScanResponse.
+    Submit batches with at most `concurrency` requests in flight.
+
+    Batches are pulled from the iterable only when a slot frees up, so input
+    size does not bound memory. HTTP 429 responses pause all submitters and the
+    batch is retried with exponential backoff and jitter. `on_submitted` is
+    called with each batch and its response as soon as the submission succeeds.
+
+    Returns the AsyncScanResponse list in submission order.
     """
     scanner = Scanner()
     if endpoint_override:
         scanner.api_endpoint = endpoint_override  # type: ignore[attr-defined]
 
-    batches = list(batched(async_objects, batch_size))
-    log.info("Submitting %d batch(es)…", len(batches))
-    for i, b in enumerate(batches, 1):
-        log.debug(" Batch %d: %d object(s)", i, len(b))
+    semaphore = asyncio.Semaphore(concurrency)
+    responses: Dict[int, Any] = {}
+    # Monotonic time before which nobody submits, shared after a 429
+    paused_until = 0.0
+
+    async def submit(index: int, batch: List[AsyncScanObject]) -> None:
+        nonlocal paused_until
+        try:
+            for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+                wait = paused_until - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                try:
+                    responses[index] = await scanner.async_scan(batch)
+                    log.debug(" Batch %d: %d object(s) submitted", index, len(batch))
+                    if on_submitted:
+                        on_submitted(batch, responses[index])
+                    return
+                except AISecSDKException as exc:
+                    if not is_rate_limited(exc) or attempt == RATE_LIMIT_MAX_RETRIES:
+                        raise
+                    delay = min(
+                        RATE_LIMIT_MAX_DELAY_SECONDS,
+                        RATE_LIMIT_BASE_DELAY_SECONDS * 2**attempt,
+                    ) * random.uniform(0.5, 1.0)
+                    paused_until = max(paused_until, time.monotonic() + delay)
+                    log.warning(
+                        "Batch %d rate limited (429); retry in %.1fs (attempt %d/%d)",
+                        index,
+                        delay,
+                        attempt + 1,
+                        RATE_LIMIT_MAX_RETRIES,
+                    )
+        finally:
+            semaphore.release()
 
-    coroutines = [scanner.async_scan(batch) for batch in batches]
+    log.info("Submitting batches with concurrency %d…", concurrency)
     try:
-        responses = await asyncio.gather(*coroutines)
+        async with asyncio.TaskGroup() as group:
+            for index, batch in enumerate(batches, 1):
+                await semaphore.acquire()
+                group.create_task(submit(index, batch))
+    except ExceptionGroup as group_error:
+        # Surface the first failed batch's error rather than the group wrapper
+        raise group_error.exceptions[0] from None
     finally:
         await scanner.close()
 
-    return responses
+    log.info("Submitted %d batch(es)", len(responses))
+    return [responses[index] for index in sorted(responses)]
 
 
 def pretty_print_batch_results(batch_results: List[Any]) -> None:
@@ -251,159 +702,299 @@ def get_violations(detected_obj: Any, violation_fields: List[str]) -> List[str]:
     return violations
 
 
-async def retrieve_and_display_results(
-    scanner: Scanner,
-    batch_results: List[Any],
+def new_result_summary() -> Dict[str, Any]:
+    """Create the accumulator used to categorise harvested scan results."""
+    return {
+        "malicious_prompts": [],
+        "benign_prompts": [],
+        "malicious_responses": [],
+        "benign_responses": [],
+        "violation_types": {
+            vtype: 0 for vtype in PROMPT_VIOLATION_FIELDS + RESPONSE_VIOLATION_FIELDS
+        },
+    }
+
+
+def categorise_result(
+    result: ScanIdResult,
     content_map: Dict[int, Dict[str, Optional[str]]],
-) -> Dict[str, List[Dict[str, Any]]]:
-    """
-    Retrieve scan results and display them in a tabular format.
-    Returns a dictionary with detailed categorization of prompts and responses.
+    summary: Dict[str, Any],
+) -> None:
+    """Add one completed scan result to the summary lists and violation counts."""
+    scan_res = result.result
+    original_content = content_map.get(result.req_id, {})
+
+    prompt_text = original_content.get("prompt", "N/A") or "N/A"
+    response_text = original_content.get("response", "N/A") or "N/A"
+    category = scan_res.category
+    action = scan_res.action
+
+    # Get violation details
+    prompt_detected = scan_res.prompt_detected
+    response_detected = scan_res.response_detected
+
+    # Count violations
+    violation_types = summary["violation_types"]
+    for key in PROMPT_VIOLATION_FIELDS:
+        if getattr(prompt_detected, key, False):
+            violation_types[key] += 1
+
+    for key in RESPONSE_VIOLATION_FIELDS:
+        if getattr(response_detected, key, False):
+            violation_types[key] += 1
+
+    # Build violation lists
+    prompt_violations = get_violations(prompt_detected, PROMPT_VIOLATION_FIELDS)
+    response_violations = get_violations(response_detected, RESPONSE_VIOLATION_FIELDS)
+
+    # Truncate text for display
+    prompt_display = (
+        prompt_text[:TEXT_TRUNCATE_LENGTH] + "..."
+        if len(prompt_text) > TEXT_TRUNCATE_LENGTH
+        else prompt_text
+    )
+    response_display = (
+        response_text[:TEXT_TRUNCATE_LENGTH] + "..."
+        if len(response_text) > TEXT_TRUNCATE_LENGTH
+        else response_text
+    )
+
+    # Categorize based on overall scan result category
+    if category == "malicious":
+        summary["malicious_prompts"].append(
+            {
+                "prompt": prompt_display,
+                "violations": ", ".join(prompt_violations)
+                if prompt_violations
+                else "policy violation",
+                "action": action,
+            }
+        )
+        summary["malicious_responses"].append(
+            {
+                "response": response_display,
+                "violations": ", ".join(response_violations)
+                if response_violations
+                else "policy violation",
+                "action": action,
+            }
+        )
+    else:
+        summary["benign_prompts"].append({"prompt": prompt_display, "action": action})
+        summary["benign_responses"].append(
+            {"response": response_display, "action": action}
+        )
+
+
+def is_result_complete(result: ScanIdResult) -> bool:
+    """Return True once a scan result has finished processing."""
+    status = (result.status or "").lower()
+    return result.result is not None and status != "pending"
+
+
+async def harvest_results(
+    scanner: Scanner,
+    scan_ids: Iterable[str],
+    on_result,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    on_scan_done: Optional[Callable[[str], None]] = None,
+) -> int:
     """
-    # Collect all scan IDs
-    scan_ids = [res.scan_id for res in batch_results]
+    Poll for scan results until every scan ID is complete or polling gives up.
 
-    log.info("Retrieving scan results for %d scan(s)...", len(scan_ids))
+    Only outstanding scan IDs are queried, in chunks of the API's per-call
+    limit with at most `concurrency` calls in flight. Each completed result is
+    passed to `on_result` exactly once, as soon as it arrives, and
+    `on_scan_done` is called once all results for a scan ID are in. The poll
+    interval grows after rounds without progress and resets when results
+    arrive.
 
-    # Query for scan results with polling to wait for all results
-    total_expected = len(content_map)
-    scan_results: List[ScanIdResult] = []
+    Returns the number of results harvested.
+    """
+    pending = set(scan_ids)
+    seen: set = set()
+    semaphore = asyncio.Semaphore(concurrency)
+    interval = POLL_INTERVAL_SECONDS
+    idle_rounds = 0
+
+    async def query(chunk: List[str]) -> List[ScanIdResult]:
+        async with semaphore:
+            for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+                try:
+                    return await scanner.query_by_scan_ids(scan_ids=chunk)
+                except AISecSDKException as exc:
+                    if not is_rate_limited(exc) or attempt == RATE_LIMIT_MAX_RETRIES:
+                        raise
+                    await asyncio.sleep(
+                        min(
+                            RATE_LIMIT_MAX_DELAY_SECONDS,
+                            RATE_LIMIT_BASE_DELAY_SECONDS * 2**attempt,
+                        )
+                    )
+        return []
+
+    while pending and idle_rounds < DEFAULT_POLL_ATTEMPTS:
+        chunks = list(batched(sorted(pending), MAX_NUMBER_OF_SCAN_IDS))
+        responses = await asyncio.gather(*(query(list(chunk)) for chunk in chunks))
+
+        new_results = 0
+        incomplete_ids = set()
+        for results in responses:
+            for result in results:
+                if not is_result_complete(result):
+                    incomplete_ids.add(result.scan_id)
+                    continue
+                key = (result.scan_id, result.req_id)
+                if key in seen:
+                    continue
+                seen.add(key)
+                new_results += 1
+                on_result(result)
+
+        # A scan ID is done once it returned results and none are still pending
+        returned_ids = {result.scan_id for results in responses for result in results}
+        done_ids = (returned_ids - incomplete_ids) & pending
+        pending -= done_ids
+        if on_scan_done:
+            for scan_id in done_ids:
+                on_scan_done(scan_id)
 
-    for attempt in range(DEFAULT_POLL_ATTEMPTS):
-        scan_results = await scanner.query_by_scan_ids(scan_ids=scan_ids)
         log.debug(
-            "Polling attempt %d: Retrieved %d/%d scan results",
-            attempt + 1,
-            len(scan_results),
-            total_expected,
+            "Harvest round: %d new result(s), %d total, %d scan ID(s) outstanding",
+            new_results,
+            len(seen),
+            len(pending),
         )
 
-        if len(scan_results) >= total_expected:
-            log.info("All %d results received", len(scan_results))
+        if not pending:
             break
-
-        if attempt < DEFAULT_POLL_ATTEMPTS - 1:
-            await asyncio.sleep(POLL_INTERVAL_SECONDS)
-
-    if len(scan_results) < total_expected:
+        if new_results:
+            idle_rounds = 0
+            interval = POLL_INTERVAL_SECONDS
+        else:
+            idle_rounds += 1
+            interval = min(POLL_MAX_INTERVAL_SECONDS, interval * POLL_BACKOFF_FACTOR)
+        await asyncio.sleep(interval)
+
+    if pending:
         log.warning(
-            "Only received %d out of %d expected results after %d attempts",
-            len(scan_results),
-            total_expected,
+            "Gave up on %d scan ID(s) after %d polls without progress",
+            len(pending),
             DEFAULT_POLL_ATTEMPTS,
         )
+    return len(seen)
 
-    # Process results
-    malicious_prompts = []
-    benign_prompts = []
-    malicious_responses = []
-    benign_responses = []
-
-    # Track violation types
-    violation_types = {
-        vtype: 0 for vtype in PROMPT_VIOLATION_FIELDS + RESPONSE_VIOLATION_FIELDS
-    }
 
-    log.debug("Processing %d scan results", len(scan_results))
-    for idx, result in enumerate(scan_results):
-        # Check if this is a ScanIdResult with a nested result
-        if hasattr(result, "result") and result.result:
-            scan_res = result.result
-            req_id = result.req_id
-            original_content = content_map.get(req_id, {})
-
-            if idx < 5:
-                log.debug(
-                    "Result %d: req_id=%s, category=%s, action=%s, prompt_detected=%s, response_detected=%s",
-                    idx,
-                    req_id,
-                    scan_res.category,
-                    scan_res.action,
-                    scan_res.prompt_detected,
-                    scan_res.response_detected,
-                )
+def serialise_result(
+    result: ScanIdResult,
+    content_map: Dict[int, Dict[str, Optional[str]]],
+) -> Dict[str, Any]:
+    """Convert a scan result to a JSON-safe dict including the scanned content."""
+    data = result.to_dict()
+    data.update(content_map.get(result.req_id, {}))
+    return data
 
-            prompt_text = original_content.get("prompt", "N/A")
-            response_text = original_content.get("response", "N/A") or "N/A"
-            category = scan_res.category
-            action = scan_res.action
 
-            # Get violation details
-            prompt_detected = scan_res.prompt_detected
-            response_detected = scan_res.response_detected
+async def retrieve_and_display_results(
+    scanner: Scanner,
+    scan_ids: List[str],
+    content_map: Dict[int, Dict[str, Optional[str]]],
+    results_file: Optional[pathlib.Path] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache: Optional[ScanCache] = None,
+    journal: Optional[ScanJournal] = None,
+    resume: bool = False,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Retrieve scan results and display them in a tabular format.
 
-            # Count violations
-            for key in PROMPT_VIOLATION_FIELDS:
-                if getattr(prompt_detected, key, False):
-                    violation_types[key] += 1
+    Results are harvested incrementally; when results_file is given, each
+    completed result is appended to it as a JSON line as soon as it arrives.
+    With a cache, rows it answered are reported alongside the harvested ones
+    and harvested results are stored in it. Fully harvested scan IDs are
+    recorded in the journal. When resuming, results_file is appended to and
+    rows it already holds are not written again.
+    Returns a dictionary with detailed categorization of prompts and responses.
+    """
+    log.info("Retrieving scan results for %d scan(s)...", len(scan_ids))
 
-            for key in RESPONSE_VIOLATION_FIELDS:
-                if getattr(response_detected, key, False):
-                    violation_types[key] += 1
+    summary = new_result_summary()
+    recorded: Set[int] = set()
+    expected: Optional[int] = len(content_map)
+    if resume and results_file and results_file.exists():
+        recorded = read_result_req_ids(results_file)
+        end_with_newline(results_file)
+        expected -= len(recorded)
+    elif resume and journal is not None and journal.harvested:
+        # Rows harvested by the resumed run are not retrieved again, and with
+        # no results file there is no record of how many there were
+        expected = None
+    out = (
+        results_file.open("a" if resume else "w", encoding="utf-8")
+        if results_file
+        else None
+    )
+    total = 0
 
-            # Build violation lists
-            prompt_violations = get_violations(prompt_detected, PROMPT_VIOLATION_FIELDS)
-            response_violations = get_violations(
-                response_detected, RESPONSE_VIOLATION_FIELDS
+    def record(result: ScanIdResult) -> None:
+        nonlocal total
+        if result.req_id in recorded:
+            return
+        recorded.add(result.req_id)
+        total += 1
+        categorise_result(result, content_map, summary)
+        if out:
+            out.write(
+                json.dumps(serialise_result(result, content_map), default=str) + "\n"
             )
 
-            # Truncate text for display
-            prompt_display = (
-                prompt_text[:TEXT_TRUNCATE_LENGTH] + "..."
-                if len(prompt_text) > TEXT_TRUNCATE_LENGTH
-                else prompt_text
-            )
-            response_display = (
-                response_text[:TEXT_TRUNCATE_LENGTH] + "..."
-                if len(response_text) > TEXT_TRUNCATE_LENGTH
-                else response_text
-            )
+    def on_result(result: ScanIdResult) -> None:
+        record(result)
+        if cache is not None:
+            for duplicate in cache.resolve(result):
+                record(duplicate)
 
-            # Categorize based on overall scan result category
-            if category == "malicious":
-                # For malicious scans, add to malicious lists
-                malicious_prompts.append(
-                    {
-                        "prompt": prompt_display,
-                        "violations": ", ".join(prompt_violations)
-                        if prompt_violations
-                        else "policy violation",
-                        "action": action,
-                    }
-                )
-                malicious_responses.append(
-                    {
-                        "response": response_display,
-                        "violations": ", ".join(response_violations)
-                        if response_violations
-                        else "policy violation",
-                        "action": action,
-                    }
-                )
-            else:
-                # Benign category
-                benign_prompts.append({"prompt": prompt_display, "action": action})
-                benign_responses.append(
-                    {"response": response_display, "action": action}
-                )
+    def on_scan_done(scan_id: str) -> None:
+        # Results must be on disk before the journal says they need no harvesting
+        if out:
+            out.flush()
+            os.fsync(out.fileno())
+        journal.record_harvested(scan_id)
+
+    try:
+        if cache is not None:
+            for result in cache.cached_results():
+                on_result(result)
+        await harvest_results(
+            scanner,
+            scan_ids,
+            on_result,
+            concurrency,
+            on_scan_done=on_scan_done if journal else None,
+        )
+    finally:
+        if out:
+            out.close()
+
+    if expected is None:
+        log.info("%d result(s) received for scans not harvested before", total)
+    elif total < expected:
+        log.warning("Only received %d out of %d expected results", total, expected)
+    else:
+        log.info("All %d results received", total)
+    if results_file:
+        log.info("Scan results written to %s", results_file)
 
-    # Display results
     display_scan_results(
-        malicious_prompts,
-        benign_prompts,
-        malicious_responses,
-        benign_responses,
-        violation_types,
-        len(scan_results),
+        summary["malicious_prompts"],
+        summary["benign_prompts"],
+        summary["malicious_responses"],
+        summary["benign_responses"],
+        summary["violation_types"],
+        total,
     )
 
-    return {
-        "malicious_prompts": malicious_prompts,
-        "benign_prompts": benign_prompts,
-        "malicious_responses": malicious_responses,
-        "benign_responses": benign_responses,
-        "violation_types": violation_types,
-    }
+    return summary
 
 
 def display_scan_results(
@@ -563,6 +1154,62 @@ def main() -> None:
         default=DEFAULT_BATCH_SIZE,
         help=f"Number of items per batch (default: {DEFAULT_BATCH_SIZE})",
     )
+    parser.add_argument(
+        "--results-file",
+        type=pathlib.Path,
+        help=(
+            "Stream each completed scan result to this file as JSON Lines "
+            "(with --retrieve-results)"
+        ),
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum batches in flight at once (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=pathlib.Path,
+        default=pathlib.Path(os.getenv("PANW_AI_SCAN_CACHE_FILE", DEFAULT_CACHE_FILE)),
+        help=f"SQLite file caching completed results (default: {DEFAULT_CACHE_FILE})",
+    )
+    parser.add_argument(
+        "--cache-ttl-hours",
+        type=float,
+        default=float(
+            os.getenv("PANW_AI_SCAN_CACHE_TTL_HOURS", DEFAULT_CACHE_TTL_HOURS)
+        ),
+        help=(
+            "Reuse cached results for this many hours "
+            f"(default: {DEFAULT_CACHE_TTL_HOURS:g})"
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=(
+            "Do not read or write the cache file "
+            "(duplicates within the run are still sent once)"
+        ),
+    )
+    parser.add_argument(
+        "--journal",
+        type=pathlib.Path,
+        help="Write-ahead journal of submitted batches (default: <file>.journal.jsonl)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the run recorded in the journal: submit only unsent rows and "
+        "harvest only unharvested scan IDs",
+    )
+    parser.add_argument(
+        "--force-resume",
+        action="store_true",
+        help="With --resume, continue even if the input file changed since the "
+        "journal was written (rows are matched by position)",
+    )
     parser.add_argument(
         "--log-level",
         default="INFO",
@@ -593,6 +1240,10 @@ def _run(args: argparse.Namespace) -> None:
     """Run the batch scanner with the provided arguments."""
     if args.batch_size < 1:
         raise ValueError("--batch-size must be at least 1")
+    if args.concurrency < 1:
+        raise ValueError("--concurrency must be at least 1")
+    if args.cache_ttl_hours < 0:
+        raise ValueError("--cache-ttl-hours must not be negative")
 
     api_key = os.getenv("PANW_AI_SEC_API_KEY")
     if not api_key:
@@ -620,20 +1271,62 @@ def _run(args: argparse.Namespace) -> None:
     )
     log.debug("Using AI profile: %s", profile_name or profile_id)
 
-    scan_contents = load_input_file(args.file)
-    if not scan_contents:
-        log.warning("Input file contained zero prompts – nothing to do.")
-        return
+    # Rows are only kept in memory when results are displayed afterwards
+    content_map: Optional[Dict[int, Dict[str, Optional[str]]]] = (
+        {} if args.retrieve_results else None
+    )
+    cache = ScanCache(
+        None if args.no_cache else args.cache_file,
+        args.cache_ttl_hours,
+        profile_cache_key(ai_profile),
+        keep_results=args.retrieve_results,
+    )
+    journal = ScanJournal(
+        args.journal or args.file.with_name(args.file.name + ".journal.jsonl"),
+        {
+            "file": str(args.file.resolve()),
+            "size": args.file.stat().st_size,
+            "profile": profile_cache_key(ai_profile),
+        },
+        resume=args.resume,
+        force=args.force_resume,
+    )
+    try:
+        _scan(args, ai_profile, content_map, cache, journal)
+    finally:
+        journal.close()
+        cache.close()
 
-    async_objects, content_map = build_scan_objects(scan_contents, ai_profile)
+
+def _scan(
+    args: argparse.Namespace,
+    ai_profile: AiProfile,
+    content_map: Optional[Dict[int, Dict[str, Optional[str]]]],
+    cache: ScanCache,
+    journal: ScanJournal,
+) -> None:
+    """Submit the input file, then retrieve results and write output as requested."""
+    batches = iter_scan_batches(
+        iter_input_file(args.file),
+        ai_profile,
+        args.batch_size,
+        content_map,
+        cache,
+        skip_req_ids=journal.sent,
+    )
 
     batch_results = asyncio.run(
         run_batches(
-            async_objects,
-            batch_size=args.batch_size,
+            batches,
+            concurrency=args.concurrency,
             endpoint_override=args.endpoint,
+            on_submitted=journal.record_batch,
         )
     )
+    if not cache.rows:
+        log.warning("Input file contained zero prompts – nothing to do.")
+        return
+    cache.log_stats()
     pretty_print_batch_results(batch_results)
 
     # Retrieve and display detailed results if requested
@@ -644,7 +1337,16 @@ def _run(args: argparse.Namespace) -> None:
 
         try:
             detailed_results = asyncio.run(
-                retrieve_and_display_results(scanner, batch_results, content_map)
+                retrieve_and_display_results(
+                    scanner,
+                    journal.pending_scan_ids(),
+                    content_map,
+                    results_file=args.results_file,
+                    concurrency=args.concurrency,
+                    cache=cache,
+                    journal=journal,
+                    resume=args.resume,
+                )
             )
 
             # Optionally save detailed results to output file
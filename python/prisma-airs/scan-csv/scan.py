@@ -2,11 +2,18 @@ import requests
 import json
 import csv
 import argparse
+import asyncio
 import logging
 import time
 import sys
 import os
 import tomllib
+from collections import deque
+
+try:
+    import aiohttp
+except ImportError:  # Only needed for concurrent mode
+    aiohttp = None
 
 # Default configuration values
 DEFAULT_CONFIG = {
@@ -17,7 +24,9 @@ DEFAULT_CONFIG = {
     'api': {
         'endpoint': 'https://service.api.aisecurity.paloaltonetworks.com/v1/scan/sync/request',
         'max_retries': 3,
-        'retry_delay': 1
+        'retry_delay': 1,
+        'concurrency': 1,
+        'timeout': 30
     },
     'logging': {
         'level': 'INFO',
@@ -27,7 +36,8 @@ DEFAULT_CONFIG = {
 
 def load_config(config_file):
     """Load configuration from TOML file."""
-    config = DEFAULT_CONFIG.copy()
+    # Copy nested sections too, so TOML values never overwrite their defaults
+    config = {key: dict(value) if isinstance(value, dict) else value for key, value in DEFAULT_CONFIG.items()}
     
     if not os.path.exists(config_file):
         print(f"Error: Configuration file '{config_file}' not found.")
@@ -35,13 +45,12 @@ def load_config(config_file):
     
     with open(config_file, 'rb') as f:
         toml_config = tomllib.load(f)
-        # Update with values from TOML file
-        config.update(toml_config)
-        # Handle nested dictionaries
-        if 'api' in toml_config:
-            config['api'].update(toml_config['api'])
-        if 'logging' in toml_config:
-            config['logging'].update(toml_config['logging'])
+        # Update with values from TOML file, merging nested dictionaries
+        for key, value in toml_config.items():
+            if isinstance(config.get(key), dict):
+                config[key].update(value)
+            else:
+                config[key] = value
     
     return config
 
@@ -55,8 +64,56 @@ def parse_arguments():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description='Process prompts from CSV and scan with Palo Alto Networks AI Security Service')
     parser.add_argument('--config', type=str, default='config.toml', help='Path to TOML configuration file (default: config.toml)')
+    parser.add_argument('--concurrency', type=int, help='Requests in flight at once; above 1 uses the async client (overrides api.concurrency)')
     return parser.parse_args()
 
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+def log_run_stats(scanned, round_trips, duration):
+    """Log throughput and request latency percentiles for a finished run."""
+    latencies = sorted(round_trips)
+    throughput = scanned / duration if duration > 0 else 0.0
+    logger.info("Throughput: %d prompts in %.2f seconds (%.2f prompts/s)", scanned, duration, throughput)
+    if not latencies:
+        logger.info("Latency: no successful requests")
+        return
+    logger.info("Latency: p50 %.3fs, p95 %.3fs, p99 %.3fs",
+                percentile(latencies, 50), percentile(latencies, 95), percentile(latencies, 99))
+
+def build_payload(index, prompt, profile_id):
+    """Build the sync scan request body for one prompt."""
+    return {
+        "tr_id": str(index),
+        "ai_profile": {
+            "profile_id": profile_id
+        },
+        "contents": [
+            {
+                "prompt": prompt
+            }
+        ]
+    }
+
+def result_row(prompt, status_code, data, round_trip):
+    """Build an output CSV row from a scan response."""
+    if status_code != 200:
+        data = {}
+    return [prompt, data.get('action', ''), data.get('category', ''), data.get('scan_id', ''),
+            data.get('report_id', ''), data.get('profile_name', ''), round_trip, status_code]
+
+def iter_prompts(infile):
+    """Yield (row number, prompt) for each non-empty row, reading lazily."""
+    for index, row in enumerate(csv.reader(infile), start=1):
+        # Skip empty rows
+        if not row or not row[0].strip():
+            continue
+        yield index, row[0].strip()
+
 def send_request_with_retry(payload, max_retries=None):
     """Send request with retry mechanism for client errors."""
     if max_retries is None:
@@ -90,6 +147,102 @@ def send_request_with_retry(payload, max_retries=None):
                 raise
             time.sleep(1)
 
+async def send_request_async(session, semaphore, payload):
+    """Async counterpart of send_request_with_retry, sharing its retry rules."""
+    max_retries = config['api']['max_retries']
+
+    async with semaphore:
+        for attempt in range(max_retries):
+            try:
+                start_time = time.perf_counter()
+                async with session.post(url, data=json.dumps(payload)) as response:
+                    body = await response.read()
+                round_trip = round(time.perf_counter() - start_time, 3)
+
+                # If successful or server error (5xx), return response
+                if response.status < 400 or response.status >= 500:
+                    return response.status, body, round_trip
+
+                # For client errors (4xx), retry if not the last attempt
+                if attempt < max_retries - 1:
+                    logger.warning("Request failed with status %d. Retrying... (Attempt %d/%d)", response.status, attempt + 2, max_retries)
+                    await asyncio.sleep(config['api']['retry_delay'])
+                else:
+                    return response.status, body, round_trip
+
+            except Exception as e:
+                logger.error("Request exception: %s", str(e))
+                if attempt == max_retries - 1:
+                    raise
+                await asyncio.sleep(1)
+
+async def scan_prompt_async(session, semaphore, index, prompt, profile_id):
+    """Scan one prompt and return its output CSV row and round trip time."""
+    logger.debug("Processing row %d: %s...", index, prompt[:50])
+    try:
+        status_code, body, round_trip = await send_request_async(session, semaphore, build_payload(index, prompt, profile_id))
+        data = json.loads(body) if status_code == 200 else {}
+        logger.debug("Row %d processed successfully (Status: %d)", index, status_code)
+        return result_row(prompt, status_code, data, round_trip), round_trip
+    except Exception as e:
+        logger.error("Failed to process row %d: %s", index, str(e))
+        return [prompt, '', '', '', '', '', 0, 'ERROR'], None
+
+async def process_prompts_async(csv_file, profile_id, output_file, concurrency):
+    """
+    Scan prompts concurrently and save results in input order.
+
+    One pooled aiohttp session keeps at most `concurrency` requests in flight.
+    Rows are read lazily and at most a few times `concurrency` results are held
+    back waiting for earlier rows, so memory stays flat for large files.
+    """
+    process_start_time = time.time()
+    logger.info("Processing started at %s with concurrency %d", time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(process_start_time)), concurrency)
+
+    if not os.path.exists(csv_file):
+        logger.error("CSV file '%s' not found", csv_file)
+        sys.exit(1)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=config['api']['timeout'])
+    window = concurrency * 4
+    round_trips = []
+    scanned = 0
+
+    async with aiohttp.ClientSession(headers=headers, connector=connector, timeout=timeout) as session:
+        with open(csv_file, 'r', encoding='utf-8') as infile, \
+                open(output_file, 'w', newline='', encoding='utf-8') as outfile:
+            writer = csv.writer(outfile)
+            writer.writerow(['prompt', 'action', 'category', 'scan_id', 'report_id', 'profile_name', 'round_trip', 'status_code'])
+
+            pending = deque()
+
+            async def write_next():
+                nonlocal scanned
+                row, round_trip = await pending.popleft()
+                writer.writerow(row)
+                scanned += 1
+                if round_trip is not None:
+                    round_trips.append(round_trip)
+                if scanned % 1000 == 0:
+                    logger.info("%d prompts processed", scanned)
+
+            for index, prompt in iter_prompts(infile):
+                pending.append(asyncio.ensure_future(scan_prompt_async(session, semaphore, index, prompt, profile_id)))
+                if len(pending) >= window:
+                    await write_next()
+            while pending:
+                await write_next()
+
+    process_end_time = time.time()
+    total_duration = process_end_time - process_start_time
+
+    logger.info("Processing complete! Results saved to '%s'", output_file)
+    logger.info("Processing ended at %s", time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(process_end_time)))
+    logger.info("Total execution time: %.2f seconds (%.2f minutes)", total_duration, total_duration/60)
+    log_run_stats(scanned, round_trips, total_duration)
+
 def process_prompts(csv_file, profile_id, output_file):
     """Process prompts from CSV file and save results."""
     
@@ -102,72 +255,39 @@ def process_prompts(csv_file, profile_id, output_file):
         logger.error("CSV file '%s' not found", csv_file)
         sys.exit(1)
     
-    # Create output CSV with headers
-    with open(output_file, 'w', newline='', encoding='utf-8') as outfile:
+    round_trips = []
+    scanned = 0
+
+    # Open the output once and write every row through the same writer
+    with open(csv_file, 'r', encoding='utf-8') as infile, \
+            open(output_file, 'w', newline='', encoding='utf-8') as outfile:
         writer = csv.writer(outfile)
         writer.writerow(['prompt', 'action', 'category', 'scan_id', 'report_id', 'profile_name', 'round_trip', 'status_code'])
-    
-    # Read and process prompts
-    with open(csv_file, 'r', encoding='utf-8') as infile:
-        reader = csv.reader(infile)
-        
-        # Skip header if present
-        rows = list(reader)
-        
-        for index, row in enumerate(rows, start=1):
-            # Skip empty rows
-            if not row or not row[0].strip():
-                continue
-                
-            prompt = row[0].strip()
+
+        for index, prompt in iter_prompts(infile):
             logger.info("Processing row %d: %s...", index, prompt[:50])
             
             # Prepare payload
-            payload = {
-                "tr_id": str(index),
-                "ai_profile": {
-                    "profile_id": profile_id
-                },
-                "contents": [
-                    {
-                        "prompt": prompt
-                    }
-                ]
-            }
+            payload = build_payload(index, prompt, profile_id)
             
             try:
                 # Send request with retry
                 response, round_trip = send_request_with_retry(payload)
                 
                 # Extract values from response
-                if response.status_code == 200:
-                    data = response.json()
-                    action = data.get('action', '')
-                    category = data.get('category', '')
-                    scan_id = data.get('scan_id', '')
-                    report_id = data.get('report_id', '')
-                    profile_name = data.get('profile_name', '')
-                else:
-                    # For error responses, use empty values
-                    action = ''
-                    category = ''
-                    scan_id = ''
-                    report_id = ''
-                    profile_name = ''
+                data = response.json() if response.status_code == 200 else {}
                 
-                # Append results to CSV
-                with open(output_file, 'a', newline='', encoding='utf-8') as outfile:
-                    writer = csv.writer(outfile)
-                    writer.writerow([prompt, action, category, scan_id, report_id, profile_name, round_trip, response.status_code])
+                writer.writerow(result_row(prompt, response.status_code, data, round_trip))
                 
                 logger.info("Row %d processed successfully (Status: %d)", index, response.status_code)
+                round_trips.append(round_trip)
+                scanned += 1
                 
             except Exception as e:
                 logger.error("Failed to process row %d: %s", index, str(e))
                 # Write error entry to CSV
-                with open(output_file, 'a', newline='', encoding='utf-8') as outfile:
-                    writer = csv.writer(outfile)
-                    writer.writerow([prompt, '', '', '', '', '', 0, 'ERROR'])
+                writer.writerow([prompt, '', '', '', '', '', 0, 'ERROR'])
+                scanned += 1
     
     # Calculate and log total execution time
     process_end_time = time.time()
@@ -176,6 +296,7 @@ def process_prompts(csv_file, profile_id, output_file):
     logger.info("Processing complete! Results saved to '%s'", output_file)
     logger.info("Processing ended at %s", time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(process_end_time)))
     logger.info("Total execution time: %.2f seconds (%.2f minutes)", total_duration, total_duration/60)
+    log_run_stats(scanned, round_trips, total_duration)
 
 def main():
     """Main function."""
@@ -211,7 +332,20 @@ def main():
     
     logger.info("Starting prompt processing from '%s' with profile ID '%s'", config['input_csv'], config['profile_id'])
     logger.info("Configuration loaded from: %s", args.config)
-    process_prompts(config['input_csv'], config['profile_id'], config['output_csv'])
+
+    concurrency = args.concurrency
+    if concurrency is None:
+        concurrency = config['api']['concurrency']
+    if concurrency < 1:
+        logger.error("Concurrency must be at least 1.")
+        sys.exit(1)
+    if concurrency == 1:
+        process_prompts(config['input_csv'], config['profile_id'], config['output_csv'])
+        return
+    if aiohttp is None:
+        logger.error("Concurrent mode requires aiohttp. Install it with 'pip install aiohttp'.")
+        sys.exit(1)
+    asyncio.run(process_prompts_async(config['input_csv'], config['profile_id'], config['output_csv'], concurrency))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
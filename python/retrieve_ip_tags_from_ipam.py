@@ -6,10 +6,17 @@ as IP tags with the values of "test", "python", "ipam".
 
 import os
 import sys
+import json
+import codecs
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
 import argparse
 import ipaddress
 import requests
-from typing import Dict, List, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Iterable, Iterator, Optional
 from urllib.parse import urljoin
 
 from dotenv import load_dotenv
@@ -17,6 +24,22 @@ from panos.panorama import Panorama
 from panos.userid import UserId
 
 
+# Records requested per IPAM page and pages fetched in parallel
+DEFAULT_PAGE_SIZE = int(os.getenv("IPAM_PAGE_SIZE", "1000"))
+DEFAULT_PAGE_WORKERS = int(os.getenv("IPAM_PAGE_WORKERS", "4"))
+
+# Bytes read per chunk when streaming a JSON array response
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Addresses sent to Panorama per User-ID batch
+DEFAULT_BATCH_SIZE = int(os.getenv("IPAM_BATCH_SIZE", "1000"))
+
+# Incremental sync: snapshot location, IPAM change filter and full reconciliation interval
+SNAPSHOT_FILE = os.getenv("IPAM_SNAPSHOT_FILE")
+UPDATED_FILTER = os.getenv("IPAM_UPDATED_FILTER", "last_updated__gte")
+FULL_SYNC_HOURS = float(os.getenv("IPAM_FULL_SYNC_HOURS", "24"))
+
+
 def load_credentials() -> Dict[str, str]:
     """Load credentials from environment variables."""
     load_dotenv()
@@ -68,23 +91,161 @@ def create_panorama_connection(credentials: Dict[str, str]) -> Panorama:
         sys.exit(1)
 
 
+def mock_ipam_records(endpoint: str) -> List[Dict[str, Any]]:
+    """Return sample IPAM records used when debugging without a reachable API."""
+    if endpoint == "prefixes":
+        return [
+            {"prefix": "10.0.0.0/8", "status": "active", "description": "Test Prefix 1"},
+            {"prefix": "192.168.0.0/16", "status": "active", "description": "Test Prefix 2"},
+            {"prefix": "172.16.0.0/12", "status": "active", "description": "Private Network"}
+        ]
+    return [
+        {"address": "10.0.0.1/32", "status": "active", "description": "Test IP 1"},
+        {"address": "10.0.0.2/32", "status": "active", "description": "Test IP 2"},
+        {"address": "192.168.1.1/24", "status": "active", "description": "Gateway"}
+    ]
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """
+    Decode a top-level JSON array item by item while it downloads.
+    
+    Only the current chunk and the item being decoded are held in memory,
+    so very large unpaged responses never need to be loaded at once.
+    
+    Args:
+        chunks: Byte chunks of a JSON array document
+    
+    Yields:
+        Each decoded array element
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    started = False
+    
+    for chunk in chunks:
+        buffer = buffer[pos:] + text.decode(chunk)
+        pos = 0
+        
+        while True:
+            # Skip whitespace and separators between items
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("Expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                # Item continues in the next chunk
+                break
+            if end == len(buffer):
+                # A number at the end of the buffer may continue in the next chunk;
+                # a complete array always has a separator or "]" after each item
+                break
+            pos = end
+            yield item
+    
+    raise ValueError("Truncated JSON array in response")
+
+
+def _stream_array(response: requests.Response, head: bytes) -> Iterator[Any]:
+    """Stream-decode an array response whose first byte was already read."""
+    def chunks() -> Iterator[bytes]:
+        yield head
+        while True:
+            chunk = response.raw.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    
+    try:
+        yield from iter_json_array(chunks())
+    finally:
+        response.close()
+
+
+def fetch_page(
+    session: requests.Session,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    debug: bool = False
+) -> Any:
+    """
+    Fetch one IPAM page.
+    
+    Args:
+        session: Shared HTTP session
+        url: Page URL
+        params: Optional query parameters
+        debug: Enable debug output
+    
+    Returns:
+        The decoded page object, or an item iterator when the body is a bare JSON array
+    """
+    response = session.get(url, params=params, verify=True, stream=True)
+    
+    if debug:
+        print(f"DEBUG: Requesting URL: {response.url}")
+        print(f"DEBUG: Response status code: {response.status_code}")
+        print(f"DEBUG: Response content type: {response.headers.get('Content-Type', 'unknown')}")
+    
+    response.raise_for_status()
+    response.raw.decode_content = True
+    
+    # Peek at the first byte to choose streaming array decoding or a bounded page
+    first = response.raw.read(1)
+    while first and first.isspace():
+        first = response.raw.read(1)
+    
+    if first == b"[":
+        return _stream_array(response, first)
+    
+    with response:
+        return json.loads(first + response.raw.read())
+
+
 def fetch_ip_addresses(
     credentials: Dict[str, str], 
     vrf_id: str = None, 
     debug: bool = False,
-    endpoint: str = "ip-addresses"
-) -> List[Dict[str, Any]]:
+    endpoint: str = "ip-addresses",
+    page_size: int = DEFAULT_PAGE_SIZE,
+    page_workers: int = DEFAULT_PAGE_WORKERS,
+    filters: Optional[Dict[str, str]] = None,
+    mock_fallback: bool = True
+) -> Iterator[Dict[str, Any]]:
     """
-    Fetch data from the IPAM API.
+    Fetch data from the IPAM API, following pagination.
+    
+    Pages are requested with limit/offset. When the first page reports a total
+    count, the remaining pages are fetched concurrently and yielded in order;
+    otherwise `next` links are followed. Unpaged JSON array responses are
+    decoded as they stream in. With debug, mock records stand in only when the
+    first page fails; a failure after real records were yielded always exits.
     
     Args:
         credentials: Dictionary containing API credentials
         vrf_id: Optional VRF ID to filter results by
         debug: Enable debug output
         endpoint: API endpoint to query (default: "ip-addresses", can also be "prefixes")
+        page_size: Records requested per page
+        page_workers: Pages fetched in parallel when the total count is known
+        filters: Extra query parameters, e.g. a last-updated filter
+        mock_fallback: Allow the debug mock fallback; disable it when the
+            records drive reconciliation, so mocks never replace real data
     
-    Returns:
-        List of dictionaries containing IP information
+    Yields:
+        Dictionaries containing IP information
     """
     ipam_url = credentials["ipam_baseurl"]
     
@@ -92,132 +253,208 @@ def fetch_ip_addresses(
     if endpoint.startswith('/'):
         endpoint = endpoint[1:]
     
-    # Add VRF filter if specified
-    if vrf_id:
-        endpoint += f"?vrf_id={vrf_id}"
-    
     # Ensure the URL has a trailing slash
     if not ipam_url.endswith('/'):
         ipam_url += '/'
     
     url = urljoin(ipam_url, endpoint)
     
-    headers = {
-        "Accept": "application/json"
-    }
+    params = {"limit": page_size, "offset": 0}
+    # Add VRF filter if specified
+    if vrf_id:
+        params["vrf_id"] = vrf_id
+    if filters:
+        params.update(filters)
     
+    session = requests.Session()
+    session.headers["Accept"] = "application/json"
     if credentials.get("ipam_token"):
-        headers["Authorization"] = f"Bearer {credentials['ipam_token']}"
-    
-    if debug:
-        print(f"DEBUG: Requesting URL: {url}")
-        print(f"DEBUG: Headers: {headers}")
+        session.headers["Authorization"] = f"Bearer {credentials['ipam_token']}"
     
+    first_page_done = False
     try:
-        # Make the API request
-        response = requests.get(url, headers=headers, verify=True)
+        page = fetch_page(session, url, params, debug)
+        first_page_done = True
         
-        if debug:
-            print(f"DEBUG: Response status code: {response.status_code}")
-            print(f"DEBUG: Response headers: {response.headers}")
-            print(f"DEBUG: Response content type: {response.headers.get('Content-Type', 'unknown')}")
-            print(f"DEBUG: Response content preview: {response.text[:200]}...")
+        # A bare JSON array is the whole dataset
+        if not isinstance(page, dict):
+            yield from page
+            return
         
-        # Check if response is successful
-        response.raise_for_status()
+        if "results" not in page:
+            # A single object
+            yield page
+            return
         
-        # Attempt to parse JSON - based on your curl examples, the API returns a JSON array directly
-        try:
-            data = response.json()
-            
-            if debug:
-                print(f"DEBUG: Successfully parsed JSON response")
-                print(f"DEBUG: Number of items in response: {len(data) if isinstance(data, list) else 'Not a list'}")
-                print(f"DEBUG: Data type: {type(data)}")
-                if isinstance(data, list) and len(data) > 0:
-                    print(f"DEBUG: First item keys: {data[0].keys()}")
-            
-            # Handle the response format - from your curl example, it returns a JSON array directly
-            if isinstance(data, list):
-                return data
-            # If it's a single object, wrap it in a list
-            elif isinstance(data, dict):
-                return [data]
-            # Check if there's a results key
-            elif isinstance(data, dict) and 'results' in data:
-                return data['results']
-            # Fallback
-            else:
-                print(f"WARNING: Unexpected response format from IPAM API: {type(data)}")
-                return []
-            
-        except ValueError as e:
-            print(f"Error parsing JSON response: {e}")
-            print(f"Response content: {response.text[:200]}...")
+        results = page["results"]
+        yield from results
+        
+        count = page.get("count")
+        if isinstance(count, int) and results and count > len(results):
+            # Known total: fetch the remaining offsets concurrently, in order
+            step = len(results)
+            offsets = iter(range(step, count, step))
             
-            # Fallback to mock data if debug is enabled
-            if debug:
-                print("DEBUG: Using mock data for testing since API response failed")
-                if endpoint == "prefixes":
-                    return [
-                        {"prefix": "10.0.0.0/8", "status": "active", "description": "Test Prefix 1"},
-                        {"prefix": "192.168.0.0/16", "status": "active", "description": "Test Prefix 2"},
-                        {"prefix": "172.16.0.0/12", "status": "active", "description": "Private Network"}
-                    ]
-                else:
-                    return [
-                        {"address": "10.0.0.1/32", "status": "active", "description": "Test IP 1"},
-                        {"address": "10.0.0.2/32", "status": "active", "description": "Test IP 2"},
-                        {"address": "192.168.1.1/24", "status": "active", "description": "Gateway"}
-                    ]
-            sys.exit(1)
+            with ThreadPoolExecutor(max_workers=max(1, page_workers)) as executor:
+                pending = deque()
+                
+                def submit_next() -> None:
+                    offset = next(offsets, None)
+                    if offset is not None:
+                        pending.append(executor.submit(fetch_page, session, url, {**params, "offset": offset}, debug))
+                
+                # Keep a bounded window of pages in flight
+                for _ in range(max(1, page_workers) * 2):
+                    submit_next()
+                
+                while pending:
+                    page = pending.popleft().result()
+                    submit_next()
+                    yield from page.get("results", []) if isinstance(page, dict) else page
+        else:
+            # Unknown total: follow next links
+            next_url = page.get("next")
+            while next_url:
+                page = fetch_page(session, next_url, debug=debug)
+                yield from page.get("results", [])
+                next_url = page.get("next")
+    
+    except ValueError as e:
+        print(f"Error parsing JSON response from IPAM API endpoint '{endpoint}': {e}")
+        
+        # Fallback to mock data if debug is enabled and nothing real was yielded
+        if debug and mock_fallback and not first_page_done:
+            print("DEBUG: Using mock data for testing since API response failed")
+            yield from mock_ipam_records(endpoint)
+            return
+        sys.exit(1)
     
     except requests.exceptions.RequestException as e:
         print(f"Error fetching data from IPAM API endpoint '{endpoint}': {e}")
-        if debug:
+        if debug and mock_fallback and not first_page_done:
             print("DEBUG: Using mock data for testing since API connection failed")
-            if endpoint == "prefixes":
-                return [
-                    {"prefix": "10.0.0.0/8", "status": "active", "description": "Test Prefix 1"},
-                    {"prefix": "192.168.0.0/16", "status": "active", "description": "Test Prefix 2"},
-                    {"prefix": "172.16.0.0/12", "status": "active", "description": "Private Network"}
-                ]
-            else:
-                return [
-                    {"address": "10.0.0.1/32", "status": "active", "description": "Test IP 1"},
-                    {"address": "10.0.0.2/32", "status": "active", "description": "Test IP 2"},
-                    {"address": "192.168.1.1/24", "status": "active", "description": "Gateway"}
-                ]
+            yield from mock_ipam_records(endpoint)
+            return
         sys.exit(1)
 
 
-def register_ip_tags(panorama: Panorama, ip_addresses: List[Dict[str, Any]], 
+def resolve_tags(
+    ip_data: Dict[str, Any],
+    default_tags: Optional[List[str]],
+    use_payload_tags_only: bool
+) -> List[str]:
+    """
+    Determine the tags to apply to an IPAM record.
+    
+    Args:
+        ip_data: IPAM record
+        default_tags: Default tags used when the payload has none
+        use_payload_tags_only: If True, never fall back to default tags
+    
+    Returns:
+        List of tags, empty if there is nothing to apply
+    """
+    payload_tags = ip_data.get('tags', None)
+    
+    if payload_tags and isinstance(payload_tags, list):
+        # Use tags from the payload
+        return payload_tags
+    if payload_tags and isinstance(payload_tags, str):
+        # Handle case where tags might be a comma-separated string
+        return [tag.strip() for tag in payload_tags.split(',') if tag.strip()]
+    if not use_payload_tags_only and default_tags:
+        # Use default tags if allowed and available
+        return list(default_tags)
+    return []
+
+
+def flush_registrations(
+    userid: UserId,
+    pending: Dict[str, List[str]],
+    timeout: Optional[int],
+    stats: Dict[str, Any],
+    on_registered: Optional[Callable[[Iterable[str]], None]] = None
+) -> None:
+    """
+    Send the accumulated IP-to-tags map to Panorama as one User-ID batch.
+    
+    Args:
+        userid: The User-ID object
+        pending: Dict mapping addresses to tags; cleared after sending
+        timeout: Optional timeout in seconds
+        stats: Running counters updated in place
+        on_registered: Called with the batch's addresses once Panorama accepted it
+    """
+    if not pending:
+        return
+    
+    tag_count = sum(len(tags) for tags in pending.values())
+    started = time.perf_counter()
+    
+    try:
+        userid.batch_start()
+        for address, tags in pending.items():
+            userid.register(address, tags, timeout=timeout)
+        userid.batch_end()
+        if on_registered is not None:
+            on_registered(pending.keys())
+        
+        elapsed = time.perf_counter() - started
+        stats["batches"] += 1
+        stats["addresses"] += len(pending)
+        stats["tags"] += tag_count
+        stats["seconds"] += elapsed
+        print(
+            f"Registered batch {stats['batches']}: {len(pending)} addresses, {tag_count} tags "
+            f"in {elapsed:.2f}s ({len(pending) / max(elapsed, 1e-6):.0f} addresses/s)"
+        )
+    except Exception as e:
+        stats["failed"] += len(pending)
+        print(f"Error registering batch of {len(pending)} addresses: {e}")
+    finally:
+        pending.clear()
+
+
+def register_ip_tags(panorama: Panorama, ip_addresses: Iterable[Dict[str, Any]], 
                     default_tags: List[str] = None, timeout: int = None, 
                     simulation: bool = False, debug: bool = False, 
-                    use_payload_tags_only: bool = True) -> None:
+                    use_payload_tags_only: bool = True,
+                    batch_size: int = DEFAULT_BATCH_SIZE,
+                    on_registered: Optional[Callable[[Iterable[str]], None]] = None) -> Dict[str, Any]:
     """
     Register IP addresses with Panorama as IP tags.
     
+    Tags are accumulated per address and sent in User-ID batches of
+    `batch_size` addresses instead of one API call per address and tag.
+    
     Args:
         panorama: The Panorama connection object
-        ip_addresses: List of IP address dictionaries from IPAM API
+        ip_addresses: Iterable of IP address dictionaries from IPAM API (may be a generator)
         default_tags: List of default tags to use if no tags in payload (only used if use_payload_tags_only=False)
         timeout: Optional timeout in seconds (None = persists until cleared)
         simulation: Whether to simulate the operation without making changes
         debug: Enable debug output
         use_payload_tags_only: If True, only use tags from the API payload
+        batch_size: Addresses per User-ID batch
+        on_registered: Called with each batch's addresses once Panorama accepted it
+    
+    Returns:
+        Registration counters, including 'failed' addresses
     """
     # Create a User-ID object if not in simulation mode
     userid = None
     if not simulation:
         userid = UserId(panorama)
     
+    # Desired address -> tags map waiting to be flushed
+    pending: Dict[str, List[str]] = {}
+    stats = {"batches": 0, "addresses": 0, "tags": 0, "seconds": 0.0, "failed": 0}
+    
     registered_count = 0
     skipped_count = 0
     no_tags_count = 0
     
     if debug:
-        print(f"DEBUG: Processing {len(ip_addresses)} IP addresses")
         print(f"DEBUG: Using tags from payload only: {use_payload_tags_only}")
     
     for ip_data in ip_addresses:
@@ -242,33 +479,8 @@ def register_ip_tags(panorama: Panorama, ip_addresses: List[Dict[str, Any]],
             description = ip_data.get('description', 'No description')
             status = ip_data.get('status', 'unknown')
             
-            # Extract tags from the IP data payload
-            payload_tags = ip_data.get('tags', None)
-            
             # Determine which tags to use
-            tags_to_apply = []
-            
-            if payload_tags and isinstance(payload_tags, list):
-                # Use tags from the payload
-                tags_to_apply = payload_tags
-                if debug:
-                    print(f"DEBUG: Using {len(tags_to_apply)} tags from payload: {tags_to_apply}")
-            elif payload_tags and isinstance(payload_tags, str):
-                # Handle case where tags might be a comma-separated string
-                tags_to_apply = [tag.strip() for tag in payload_tags.split(',')]
-                if debug:
-                    print(f"DEBUG: Parsed {len(tags_to_apply)} tags from string: {tags_to_apply}")
-            elif not use_payload_tags_only and default_tags:
-                # Use default tags if allowed and available
-                tags_to_apply = default_tags
-                if debug:
-                    print(f"DEBUG: Using {len(tags_to_apply)} default tags: {tags_to_apply}")
-            else:
-                # No tags to apply
-                if debug:
-                    print(f"DEBUG: No tags found in payload for {full_address}, skipping tag registration")
-                no_tags_count += 1
-                continue
+            tags_to_apply = resolve_tags(ip_data, default_tags, use_payload_tags_only)
             
             if debug:
                 print(f"DEBUG: Using address: {full_address}, Status: {status}, Description: {description}")
@@ -305,19 +517,14 @@ def register_ip_tags(panorama: Panorama, ip_addresses: List[Dict[str, Any]],
                 registered_count += 1
                 continue
                 
-            # Register each tag for the IP address
-            for tag in tags_to_apply:
-                try:
-                    # Use the full address including CIDR notation if present
-                    userid.register(full_address, tag, timeout=timeout)
-                    print(f"Successfully registered {full_address} with tag '{tag}'")
-                    if debug:
-                        if is_prefix:
-                            print(f"  - Network prefix detected, registered entire subnet")
-                        if description:
-                            print(f"  - Description: {description}")
-                except Exception as e:
-                    print(f"Error registering {full_address} with tag '{tag}': {e}")
+            # Queue the tags for the full address including CIDR notation if present
+            queued = pending.setdefault(full_address, [])
+            queued.extend(tag for tag in tags_to_apply if tag not in queued)
+            if debug:
+                print(f"DEBUG: Queued {full_address} with tags {tags_to_apply}")
+            
+            if len(pending) >= batch_size:
+                flush_registrations(userid, pending, timeout, stats, on_registered)
                     
             registered_count += 1
             
@@ -328,10 +535,225 @@ def register_ip_tags(panorama: Panorama, ip_addresses: List[Dict[str, Any]],
                 traceback.print_exc()
             skipped_count += 1
     
+    if userid is not None:
+        flush_registrations(userid, pending, timeout, stats, on_registered)
+    
     print(f"\nRegistration complete:")
     print(f"  - Successfully processed: {registered_count} IP addresses/networks")
     print(f"  - Skipped (invalid/missing data): {skipped_count} IP addresses/networks")
     print(f"  - Skipped (no tags): {no_tags_count} IP addresses/networks")
+    if stats["batches"] or stats["failed"]:
+        print(
+            f"  - Sent {stats['addresses']} addresses / {stats['tags']} tags in {stats['batches']} batches "
+            f"({stats['addresses'] / max(stats['seconds'], 1e-6):.0f} addresses/s, "
+            f"{stats['tags'] / max(stats['seconds'], 1e-6):.0f} tags/s)"
+        )
+    if stats["failed"]:
+        print(f"  - Failed to register: {stats['failed']} IP addresses/networks")
+    
+    return stats
+
+
+def unregister_ip_tags(
+    panorama: Panorama,
+    removals: Dict[str, List[str]],
+    simulation: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> int:
+    """
+    Remove tags from addresses in User-ID batches.
+    
+    Args:
+        panorama: The Panorama connection object
+        removals: Dict mapping addresses to tags to remove
+        simulation: Whether to simulate the operation without making changes
+        batch_size: Addresses per User-ID batch
+    
+    Returns:
+        Number of addresses that failed to unregister
+    """
+    if simulation:
+        for address, tags in removals.items():
+            print(f"SIMULATION: Would unregister tags {tags} from {address}")
+        return 0
+    
+    userid = UserId(panorama)
+    items = list(removals.items())
+    failed = 0
+    
+    for start in range(0, len(items), batch_size):
+        chunk = items[start:start + batch_size]
+        try:
+            userid.batch_start()
+            for address, tags in chunk:
+                userid.unregister(address, tags)
+            userid.batch_end()
+            print(f"Unregistered tags from {len(chunk)} addresses")
+        except Exception as e:
+            failed += len(chunk)
+            print(f"Error unregistering batch of {len(chunk)} addresses: {e}")
+    
+    return failed
+
+
+def entry_hash(tags: List[str], status: str, timeout: Optional[int]) -> str:
+    """Hash the fields that decide what is registered for an address."""
+    payload = json.dumps([sorted(set(tags)), status, timeout])
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class IncrementalSync:
+    """
+    Track IPAM state between runs so only changed addresses are sent to Panorama.
+    
+    The snapshot stores a hash of tags, status and timeout per address plus the
+    tags last registered, so removed tags can be unregistered. Incremental runs
+    only see records IPAM reports as updated since the last sync; deletions are
+    picked up by the periodic full reconciliation, which also re-registers every
+    kept address so tags removed on the device are pushed back. A snapshot
+    written for a different scope (endpoint, VRF, IPAM URL) is ignored.
+    Changed addresses only enter the snapshot once Panorama accepted them, so
+    rejected or invalid addresses are retried instead of being marked synced.
+    """
+    
+    def __init__(self, path: str, scope: str, full_interval_hours: float = FULL_SYNC_HOURS):
+        self.path = path
+        self.scope = scope
+        self.full_interval = timedelta(hours=full_interval_hours)
+        self.started = datetime.now(timezone.utc)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.pending: Dict[str, Dict[str, Any]] = {}  # changed, not yet registered
+        self.last_sync: Optional[datetime] = None
+        self.last_full: Optional[datetime] = None
+        self.removals: Dict[str, List[str]] = {}
+        self.seen = set()
+        self.full = True
+        
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("scope") != scope:
+                raise ValueError(f"snapshot scope {data.get('scope')!r} does not match {scope!r}")
+            self.entries = data.get("entries", {})
+            self.last_sync = datetime.fromisoformat(data["last_sync"])
+            self.last_full = datetime.fromisoformat(data["last_full"])
+        except (OSError, ValueError, KeyError):
+            self.entries = {}
+    
+    def plan(self, timeout: Optional[int] = None) -> Optional[Dict[str, str]]:
+        """
+        Decide between an incremental and a full run.
+        
+        Args:
+            timeout: Registration timeout; tags must be refreshed before they expire
+        
+        Returns:
+            IPAM query filters for an incremental run, or None for a full run
+        """
+        interval = self.full_interval
+        if timeout:
+            # Unchanged entries are only re-registered on full runs
+            interval = min(interval, timedelta(seconds=timeout / 2))
+        
+        if self.last_sync is None or self.last_full is None or self.started - self.last_full >= interval:
+            self.full = True
+            return None
+        
+        self.full = False
+        # Overlap the window slightly to tolerate clock skew between hosts
+        since = self.last_sync - timedelta(minutes=1)
+        return {UPDATED_FILTER: since.isoformat()}
+    
+    def changed(
+        self,
+        records: Iterable[Dict[str, Any]],
+        default_tags: Optional[List[str]],
+        use_payload_tags_only: bool,
+        timeout: Optional[int]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield only records whose tags, status or timeout changed since the snapshot.
+        
+        Tags dropped from an address are collected in `removals`. New snapshot
+        entries wait in `pending` until `accept` is called for their address.
+        
+        Args:
+            records: IPAM records
+            default_tags: Default tags used when the payload has none
+            use_payload_tags_only: If True, never fall back to default tags
+            timeout: Registration timeout in seconds
+        
+        Yields:
+            Records that need to be registered
+        """
+        for ip_data in records:
+            address = ip_data.get('address')
+            if not address:
+                yield ip_data
+                continue
+            
+            self.seen.add(address)
+            tags = resolve_tags(ip_data, default_tags, use_payload_tags_only)
+            digest = entry_hash(tags, ip_data.get('status', 'unknown'), timeout)
+            previous = self.entries.get(address)
+            
+            # Full runs re-register everything, restoring tags removed on the
+            # device and refreshing timeouts
+            if previous and previous["hash"] == digest and not self.full:
+                continue
+            
+            dropped = sorted(set(previous["tags"]) - set(tags)) if previous else []
+            if dropped:
+                self.removals[address] = dropped
+            
+            if tags:
+                self.pending[address] = {"hash": digest, "tags": sorted(set(tags))}
+                yield ip_data
+            else:
+                self.entries.pop(address, None)
+    
+    def accept(self, addresses: Iterable[str]) -> None:
+        """Record addresses Panorama accepted in the snapshot."""
+        for address in addresses:
+            entry = self.pending.pop(address, None)
+            if entry is not None:
+                self.entries[address] = entry
+    
+    def finish(self) -> Dict[str, List[str]]:
+        """
+        Complete the pass and return all tags to unregister.
+        
+        On a full run, addresses missing from IPAM lose all their tags.
+        """
+        if self.full:
+            for address in list(self.entries):
+                if address not in self.seen:
+                    self.removals[address] = self.entries.pop(address)["tags"]
+        return self.removals
+    
+    def save(self) -> None:
+        """Write the snapshot atomically."""
+        data = {
+            "scope": self.scope,
+            "last_sync": self.started.isoformat(),
+            "last_full": (self.started if self.full else self.last_full).isoformat(),
+            "entries": self.entries,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+
+def snapshot_scope(endpoint: str, vrf_id: Optional[str], ipam_url: str) -> str:
+    """Describe what a snapshot covers, so runs for other VRFs or IPAMs never share one."""
+    return json.dumps([endpoint, vrf_id or "", ipam_url.rstrip("/")])
+
+
+def default_snapshot_path(scope: str, endpoint: str) -> str:
+    """Snapshot file name unique to the endpoint, VRF and IPAM URL."""
+    digest = hashlib.sha256(scope.encode()).hexdigest()[:12]
+    return f".ipam_snapshot_{endpoint}_{digest}.json"
 
 
 def main() -> None:
@@ -405,6 +827,46 @@ def main() -> None:
         help="Fetch and process prefixes from the API instead of IP addresses"
     )
     
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only register/unregister addresses changed since the last run, using a local snapshot"
+    )
+    
+    parser.add_argument(
+        "--snapshot",
+        default=SNAPSHOT_FILE,
+        help="Snapshot file for --incremental (default: .ipam_snapshot_<endpoint>_<scope hash>.json, unique per endpoint, VRF and IPAM URL; env: IPAM_SNAPSHOT_FILE)"
+    )
+    
+    parser.add_argument(
+        "--full-sync-hours",
+        type=float,
+        default=FULL_SYNC_HOURS,
+        help=f"Hours between full reconciliations in --incremental mode (default: {FULL_SYNC_HOURS:g}, env: IPAM_FULL_SYNC_HOURS)"
+    )
+    
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Addresses per User-ID registration batch (default: {DEFAULT_BATCH_SIZE}, env: IPAM_BATCH_SIZE)"
+    )
+    
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=DEFAULT_PAGE_SIZE,
+        help=f"Records requested per IPAM page (default: {DEFAULT_PAGE_SIZE}, env: IPAM_PAGE_SIZE)"
+    )
+    
+    parser.add_argument(
+        "--page-workers",
+        type=int,
+        default=DEFAULT_PAGE_WORKERS,
+        help=f"IPAM pages fetched in parallel (default: {DEFAULT_PAGE_WORKERS}, env: IPAM_PAGE_WORKERS)"
+    )
+    
     args = parser.parse_args()
     
     # Convert tags to a list
@@ -434,6 +896,24 @@ def main() -> None:
             print("Connecting to Panorama...")
             panorama = create_panorama_connection(credentials)
         
+        endpoint = "prefixes" if args.prefixes else "ip-addresses"
+        
+        # Incremental mode narrows the IPAM query and filters unchanged records
+        sync = None
+        filters = None
+        if args.incremental and args.mock:
+            print("Incremental mode ignored with --mock; mock data never updates the snapshot")
+        elif args.incremental and not args.ip_only:
+            scope = snapshot_scope(endpoint, args.vrf, credentials["ipam_baseurl"])
+            sync = IncrementalSync(
+                args.snapshot or default_snapshot_path(scope, endpoint), scope, args.full_sync_hours
+            )
+            filters = sync.plan(args.timeout)
+            if sync.full:
+                print(f"Incremental mode: running full reconciliation (snapshot: {sync.path})")
+            else:
+                print(f"Incremental mode: fetching records updated since {sync.last_sync.isoformat()}")
+        
         # Use mock data if requested
         if args.mock:
             print("Using mock IP address data with tags...")
@@ -450,25 +930,38 @@ def main() -> None:
             # Choose which endpoint to use based on arguments
             if args.prefixes:
                 print("Fetching prefixes from IPAM API...")
-                endpoint = "prefixes"
-                # Use the prefix field as the address field for consistent processing
-                ip_addresses = fetch_ip_addresses(credentials, args.vrf, args.debug, endpoint=endpoint)
-                
-                # Convert the "prefix" field to "address" for consistent processing
-                for ip_data in ip_addresses:
-                    if 'prefix' in ip_data and 'address' not in ip_data:
-                        ip_data['address'] = ip_data['prefix']
-                
-                print(f"Retrieved {len(ip_addresses)} prefixes")
             else:
                 print("Fetching IP addresses from IPAM API...")
-                ip_addresses = fetch_ip_addresses(credentials, args.vrf, args.debug)
-                print(f"Retrieved {len(ip_addresses)} IP addresses")
+            
+            # Records are streamed page by page and consumed lazily below
+            ip_addresses = fetch_ip_addresses(
+                credentials,
+                args.vrf,
+                args.debug,
+                endpoint=endpoint,
+                page_size=args.page_size,
+                page_workers=args.page_workers,
+                filters=filters,
+                # Reconciling against mock records would unregister real addresses
+                mock_fallback=sync is None
+            )
+            
+            if args.prefixes:
+                # Use the prefix field as the address field for consistent processing
+                ip_addresses = (
+                    {**ip_data, 'address': ip_data['prefix']}
+                    if 'prefix' in ip_data and 'address' not in ip_data else ip_data
+                    for ip_data in ip_addresses
+                )
         
         # Display IP addresses if requested
-        if args.ip_only or args.debug:
+        if args.ip_only:
             print("\nIP Addresses/Networks retrieved:")
-            for i, ip_data in enumerate(ip_addresses[:20], 1):  # Limit to first 20 for display
+            total = 0
+            for i, ip_data in enumerate(ip_addresses, 1):
+                total = i
+                if i > 20:  # Limit to first 20 for display
+                    continue
                 ip = ip_data.get('address', ip_data.get('prefix', 'Unknown'))
                 desc = ip_data.get('description', '')
                 status = ip_data.get('status', '')
@@ -481,13 +974,16 @@ def main() -> None:
                 tags_info = f" - Tags: {tags}" if tags else " - No tags"
                 print(f"  {i}. {ip}{prefix_info} - Status: {status}" + (f" - {desc}" if desc else "") + tags_info)
             
-            if len(ip_addresses) > 20:
-                print(f"  ... and {len(ip_addresses) - 20} more")
-                
+            if total > 20:
+                print(f"  ... and {total - 20} more")
+            print(f"Retrieved {total} IP addresses/networks")
+            
             # Exit if only displaying IPs
-            if args.ip_only:
-                print("\nRetrieved IP addresses/networks only. Exiting without registering tags.")
-                return
+            print("\nRetrieved IP addresses/networks only. Exiting without registering tags.")
+            return
+        
+        if sync:
+            ip_addresses = sync.changed(ip_addresses, default_tags, use_payload_tags_only, args.timeout)
         
         # Tag usage message
         if use_payload_tags_only:
@@ -496,7 +992,7 @@ def main() -> None:
             print(f"\nUsing tags from API payload. For addresses without tags, using default tags: {', '.join(default_tags)}")
         
         if args.simulate:
-            register_ip_tags(
+            stats = register_ip_tags(
                 panorama=None, 
                 ip_addresses=ip_addresses, 
                 default_tags=default_tags, 
@@ -507,15 +1003,32 @@ def main() -> None:
             )
         else:
             print("\nRegistering IP addresses/networks with Panorama...")
-            register_ip_tags(
+            stats = register_ip_tags(
                 panorama=panorama, 
                 ip_addresses=ip_addresses, 
                 default_tags=default_tags, 
                 timeout=args.timeout, 
                 debug=args.debug,
-                use_payload_tags_only=use_payload_tags_only
+                use_payload_tags_only=use_payload_tags_only,
+                batch_size=args.batch_size,
+                on_registered=sync.accept if sync else None
             )
         
+        if sync:
+            removals = sync.finish()
+            if removals:
+                print(f"\nRemoving stale tags from {len(removals)} IP addresses/networks...")
+                stats["failed"] += unregister_ip_tags(panorama, removals, args.simulate, args.batch_size)
+            
+            # Only advance the snapshot once every change has been applied
+            if args.simulate:
+                print("Simulation mode: snapshot not updated")
+            elif stats["failed"]:
+                print("Some changes failed; snapshot not updated so they are retried next run")
+            else:
+                sync.save()
+                print(f"Snapshot updated: {sync.path}")
+        
     except Exception as e:
         print(f"Error: {e}")
         if args.debug:
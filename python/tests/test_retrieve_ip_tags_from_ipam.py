@@ -0,0 +1,33 @@
+"""
+Tests for the streaming JSON array decoder in retrieve_ip_tags_from_ipam.
+"""
+
+import pytest
+
+from retrieve_ip_tags_from_ipam import iter_json_array
+
+
+def test_iter_json_array_single_chunk() -> None:
+    """Test decoding an array delivered in one chunk."""
+    assert list(iter_json_array([b'[1, "a", {"b": 2}]'])) == [1, "a", {"b": 2}]
+
+
+def test_iter_json_array_number_split_across_chunks() -> None:
+    """Test that a number split across two chunks is decoded whole."""
+    assert list(iter_json_array([b"[1, 23", b"4, 5]"])) == [1, 234, 5]
+
+
+def test_iter_json_array_byte_chunks() -> None:
+    """Test decoding when every byte, including multibyte UTF-8, is its own chunk."""
+    data = '[{"address": "10.0.0.1/32", "description": "caf\\u00e9 é"}, 42, true]'
+    chunks = [bytes([byte]) for byte in data.encode("utf-8")]
+    assert list(iter_json_array(chunks)) == list(
+        iter_json_array([data.encode("utf-8")])
+    )
+    assert list(iter_json_array(chunks))[1:] == [42, True]
+
+
+def test_iter_json_array_truncated() -> None:
+    """Test that a response cut off before the closing bracket raises ValueError."""
+    with pytest.raises(ValueError):
+        list(iter_json_array([b"[1, 2"]))